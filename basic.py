@@ -1,4 +1,5 @@
 import sqlite3
+
 import pandas as pd
 
 # Load the CSV data into a DataFrame
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('basic', '0002_rename_bioactive_compound_med_basic_scientific_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='med_basic',
+            name='Scientific_Name',
+            field=models.TextField(db_index=True),
+        ),
+    ]
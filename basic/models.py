@@ -4,7 +4,7 @@ from django.db import connections
 # Create your models here.
 class med_basic(models.Model):
     Plant_Name = models.TextField()
-    Scientific_Name = models.TextField()
+    Scientific_Name = models.TextField(db_index=True)
     Description = models.TextField()
     Parts_Used = models.TextField()
     Weather_Conditions_Required_to_Grow = models.TextField()
@@ -1,12 +1,21 @@
 from django.db.models import Q
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView
 
+from pages.decorators import cached_response, dataset_conditional
+from pages.mixins import FacetedSearchMixin
+from pages.services.catalogue import catalogue_count
+from pages.services.fuzzy import PLANT, did_you_mean
+from pages.services.timing import phase
+
 from .models import med_basic
 
 
-class basic_view(ListView):
+@method_decorator([dataset_conditional, cached_response], name="dispatch")
+class basic_view(FacetedSearchMixin, ListView):
     template_name = "basic.html"
     model = med_basic
+    facet_dataset = "basic"
 
     def get_queryset(self):
         query = self.request.GET.get("q", "").strip()
@@ -19,29 +28,14 @@ class basic_view(ListView):
             | Q(Scientific_Name__icontains=query)
             | Q(Description__icontains=query)
         )
-        return med_basic.objects.filter(filters).order_by("Plant_Name")
+        results = med_basic.objects.filter(filters).order_by("Plant_Name")
+        return self.narrow_by_facets(results)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["query"] = getattr(self, "search_term", "")
-        context["catalogue"] = (
-            med_basic.objects.all()
-            .order_by("Plant_Name")
-            .values_list("Plant_Name", "Scientific_Name")
-        )
-        context["result_count"] = context["object_list"].count()
+        with phase("catalogue"):
+            context["catalogue_count"] = catalogue_count(med_basic)
+        if context["query"] and not context["result_count"]:
+            context["suggestions"] = did_you_mean(context["query"], kinds=(PLANT,))
         return context
-
-from django.views.generic import ListView
-from django.shortcuts import render
-from django.db.models import Q
-from .models import med_basic
-
-#basic_view
-class basic_view(ListView):
-    template_name= "basic.html"
-
-    def get_queryset(self):
-        query = self.request.GET.get("q", default=".")
-        object_list = med_basic.objects.filter(Q(Plant_Name=query))
-        return object_list
@@ -1,9 +1,14 @@
 import sqlite3
+
 import pandas as pd
 
 df1 = pd.read_csv('class.csv')
 conn = sqlite3.connect("db.sqlite3")
 
+# Remove all data from the existing table so reloads do not duplicate rows
+conn.execute("DELETE FROM classification_med_class")
+conn.commit()
+
 df1.to_sql('classification_med_class', conn, if_exists='append', index=False, method='multi', chunksize=1000,)
 
-conn.close()
\ No newline at end of file
+conn.close()
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classification', '0003_med_class_ncbi_link'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaxonNode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.CharField(max_length=16)),
+                ('name', models.TextField()),
+                ('lft', models.IntegerField(unique=True)),
+                ('rgt', models.IntegerField()),
+                ('depth', models.IntegerField()),
+                ('plant_count', models.IntegerField(default=0)),
+                ('compound_count', models.IntegerField(default=0)),
+                ('parent', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='classification.taxonnode')),
+                ('plant', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='classification.med_class')),
+            ],
+            options={
+                'ordering': ['lft'],
+                'indexes': [models.Index(fields=['rank', 'name'], name='classificat_rank_2a463e_idx'), models.Index(fields=['rank', 'lft'], name='classificat_rank_21fc3b_idx')],
+            },
+        ),
+    ]
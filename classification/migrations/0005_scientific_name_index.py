@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classification', '0004_taxonnode'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='med_class',
+            name='Scientific_Name',
+            field=models.TextField(db_index=True),
+        ),
+    ]
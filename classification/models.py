@@ -4,10 +4,42 @@ from django.db import connections
 
 class med_class(models.Model):
     Plant_Name =models.TextField()
-    Scientific_Name = models.TextField()
+    Scientific_Name = models.TextField(db_index=True)
     NCBI_Taxonomy_ID = models.TextField()
     Order = models.TextField()
     Family = models.TextField()
     Genus = models.TextField()
     Species = models.TextField()
-    NCBI_link = models.URLField(default = "")
\ No newline at end of file
+    NCBI_link = models.URLField(default = "")
+
+class TaxonNode(models.Model):
+    """
+    Nested-set taxonomy tree (Order → Family → Genus → Species) built at
+    ingest from ``med_class``. Every node covers the ``lft``..``rgt`` range
+    of its descendants, so a whole subtree is one indexed range lookup.
+    Species leaves point back at their ``med_class`` row.
+    """
+
+    RANKS = ("Order", "Family", "Genus", "Species")
+
+    rank = models.CharField(max_length=16)
+    name = models.TextField()
+    parent = models.ForeignKey(
+        "self", null=True, on_delete=models.CASCADE, related_name="children"
+    )
+    lft = models.IntegerField(unique=True)
+    rgt = models.IntegerField()
+    depth = models.IntegerField()
+    plant = models.ForeignKey(med_class, null=True, on_delete=models.SET_NULL)
+    plant_count = models.IntegerField(default=0)
+    compound_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["lft"]
+        indexes = [
+            models.Index(fields=["rank", "name"]),
+            models.Index(fields=["rank", "lft"]),
+        ]
+
+    def __str__(self):
+        return f"{self.rank} {self.name}"
@@ -0,0 +1,115 @@
+from collections import defaultdict
+
+from django.db import transaction
+
+from pages.services.names import name_keys
+from phytochem.models import med_phytochem
+
+from .models import TaxonNode, med_class
+
+
+UNCLASSIFIED = "Unclassified"
+
+
+def _compounds_by_plant():
+    """
+    Map every normalised plant key to the set of compounds recorded for it,
+    so taxonomy rows can pick up phytochemicals under any of their aliases.
+    """
+    compounds = defaultdict(set)
+    rows = med_phytochem.objects.values_list(
+        "Plant_Name", "Scientific_Name", "Phytochemicals"
+    )
+    for plant_name, scientific_name, compound in rows.iterator():
+        compound = (compound or "").strip()
+        if not compound:
+            continue
+        for key in name_keys(plant_name, scientific_name):
+            compounds[key].add(compound.lower())
+    return compounds
+
+
+def _plant_compounds(plant, compounds_by_plant):
+    for key in name_keys(plant.Plant_Name, plant.Scientific_Name):
+        found = compounds_by_plant.get(key)
+        if found:
+            return found
+    return set()
+
+
+@transaction.atomic
+def rebuild_taxonomy_tree():
+    """
+    Rebuild the nested-set taxonomy tree from ``med_class`` with plant and
+    compound counts precomputed for every node. Returns the node count.
+    """
+    compounds_by_plant = _compounds_by_plant()
+
+    tree = {}
+    for plant in med_class.objects.order_by("Order", "Family", "Genus", "Species"):
+        lineage = [
+            (getattr(plant, rank) or "").strip() or UNCLASSIFIED
+            for rank in TaxonNode.RANKS[:-1]
+        ]
+        branch = tree
+        for name in lineage:
+            branch = branch.setdefault(name, {})
+        branch.setdefault(None, []).append(plant)
+
+    nodes = []
+    counter = 0
+
+    def visit(name, children, depth, parent_id):
+        nonlocal counter
+        counter += 1
+        node = TaxonNode(
+            id=len(nodes) + 1,
+            rank=TaxonNode.RANKS[depth],
+            name=name,
+            parent_id=parent_id,
+            lft=counter,
+            depth=depth,
+        )
+        nodes.append(node)
+
+        compounds = set()
+        if depth == len(TaxonNode.RANKS) - 2:
+            # Genus level: one Species leaf per curated plant row.
+            for plant in children.get(None, []):
+                found = _plant_compounds(plant, compounds_by_plant)
+                counter += 1
+                leaf = TaxonNode(
+                    id=len(nodes) + 1,
+                    rank="Species",
+                    name=(plant.Scientific_Name or "").strip() or plant.Species,
+                    parent_id=node.id,
+                    lft=counter,
+                    rgt=counter + 1,
+                    depth=depth + 1,
+                    plant=plant,
+                    plant_count=1,
+                    compound_count=len(found),
+                )
+                counter += 1
+                nodes.append(leaf)
+                node.plant_count += 1
+                compounds |= found
+        else:
+            for child_name in sorted(key for key in children if key is not None):
+                child_count, child_compounds = visit(
+                    child_name, children[child_name], depth + 1, node.id
+                )
+                node.plant_count += child_count
+                compounds |= child_compounds
+
+        counter += 1
+        node.rgt = counter
+        node.compound_count = len(compounds)
+        return node.plant_count, compounds
+
+    for order_name in sorted(tree):
+        visit(order_name, tree[order_name], 0, None)
+
+    TaxonNode.objects.all().delete()
+    TaxonNode.objects.bulk_create(nodes, batch_size=500)
+    return len(nodes)
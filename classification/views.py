@@ -1,12 +1,24 @@
 from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView
 from django.shortcuts import render
-from .models import med_class
+
+from pages.decorators import cached_response, dataset_conditional
+from pages.mixins import FacetedSearchMixin
+from pages.services.catalogue import catalogue_count
+from pages.services.fuzzy import PLANT, did_you_mean
+from pages.services.timing import phase
+
+from .models import TaxonNode, med_class
+from .taxonomy import UNCLASSIFIED
 
 
-class classification_view(ListView):
+@method_decorator([dataset_conditional, cached_response], name="dispatch")
+class classification_view(FacetedSearchMixin, ListView):
     template_name = "classification.html"
     model = med_class
+    facet_dataset = "classification"
 
     def get_queryset(self):
         query = self.request.GET.get("q", "").strip()
@@ -22,17 +34,16 @@ class classification_view(ListView):
             | Q(Genus__icontains=query)
             | Q(Species__icontains=query)
         )
-        return med_class.objects.filter(filters).order_by("Plant_Name")
+        results = med_class.objects.filter(filters).order_by("Plant_Name")
+        return self.narrow_by_facets(results)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["query"] = getattr(self, "search_term", "")
-        context["catalogue"] = (
-            med_class.objects.all()
-            .order_by("Plant_Name")
-            .values_list("Plant_Name", "Scientific_Name")
-        )
-        context["result_count"] = context["object_list"].count()
+        with phase("catalogue"):
+            context["catalogue_count"] = catalogue_count(med_class)
+        if context["query"] and not context["result_count"]:
+            context["suggestions"] = did_you_mean(context["query"], kinds=(PLANT,))
         return context
 
 from django.views.generic import ListView
@@ -40,3 +51,102 @@ from django.shortcuts import render
 from django.db.models import Q
 from .models import med_class
 
+
+
+def _find_node(params):
+    """
+    The node a request names, or None for the roots. The browser links to
+    nodes by ``?node=<lft>``; search results, which only know a row's
+    names, link by lineage (``?order=&family=&genus=``, stopping at any
+    rank) walked down from the root, because a name alone is ambiguous:
+    "Unclassified" occurs under every order and family.
+    """
+    if "node" in params:
+        try:
+            lft = int(params["node"])
+        except ValueError:
+            raise Http404("Unknown taxon")
+        node = TaxonNode.objects.filter(lft=lft).first()
+        if node is None:
+            raise Http404("Unknown taxon")
+        return node
+
+    node = None
+    for rank in TaxonNode.RANKS[:-1]:
+        if rank.lower() not in params:
+            break
+        name = params[rank.lower()].strip() or UNCLASSIFIED
+        node = TaxonNode.objects.filter(parent=node, rank=rank, name=name).first()
+        if node is None:
+            raise Http404("Unknown taxon")
+    return node
+
+
+def _taxonomy_slice(request):
+    """
+    Resolve the requested tree node and return it with its ancestors,
+    direct children and every plant in its subtree. Each part is a single
+    indexed lookup on the nested-set columns.
+    """
+    node = _find_node(request.GET)
+    if node is None:
+        return None, [], TaxonNode.objects.filter(parent=None), []
+
+    ancestors = TaxonNode.objects.filter(lft__lt=node.lft, rgt__gt=node.rgt)
+    children = node.children.order_by("name")
+    plants = (
+        TaxonNode.objects.filter(
+            rank="Species", lft__gte=node.lft, lft__lte=node.rgt
+        )
+        .select_related("plant")
+        .order_by("lft")
+    )
+    return node, ancestors, children, plants
+
+
+@dataset_conditional
+def taxonomy_view(request, *args, **kwargs):
+    node, ancestors, children, plants = _taxonomy_slice(request)
+    return render(
+        request,
+        "taxonomy.html",
+        {
+            "node": node,
+            "ancestors": ancestors,
+            "children": children,
+            "plants": plants,
+        },
+    )
+
+
+def _node_payload(node):
+    return {
+        "node": node.lft,
+        "rank": node.rank,
+        "name": node.name,
+        "plant_count": node.plant_count,
+        "compound_count": node.compound_count,
+    }
+
+
+@dataset_conditional
+def taxonomy_api(request, *args, **kwargs):
+    node, ancestors, children, plants = _taxonomy_slice(request)
+    return JsonResponse(
+        {
+            "node": _node_payload(node) if node else None,
+            "lineage": [_node_payload(item) for item in ancestors],
+            "children": [_node_payload(item) for item in children],
+            "plants": [
+                {
+                    "plant_name": leaf.plant.Plant_Name if leaf.plant else "",
+                    "scientific_name": leaf.name,
+                    "ncbi_taxonomy_id": (
+                        leaf.plant.NCBI_Taxonomy_ID if leaf.plant else ""
+                    ),
+                    "compound_count": leaf.compound_count,
+                }
+                for leaf in plants
+            ],
+        }
+    )
@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+
+COUNT_FIELDS = ('Nucleotide', 'Genome_Sequence', 'mRNA_Sequence')
+
+
+def parse_count(value):
+    """
+    NCBI counts were loaded as text with Western or Indian digit grouping
+    ('74,640', '4,64,380'); anything unparseable becomes 0.
+    """
+    digits = str(value or '').replace(',', '').strip()
+    return int(digits) if digits.isdigit() else 0
+
+
+def counts_to_integers(apps, schema_editor):
+    model = apps.get_model('geno', 'med_geno')
+    rows = list(model.objects.all())
+    for row in rows:
+        for field in COUNT_FIELDS:
+            setattr(row, field, parse_count(getattr(row, field)))
+    model.objects.bulk_update(rows, COUNT_FIELDS, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geno', '0002_remove_med_geno_plant_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(counts_to_integers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='med_geno',
+            name='Nucleotide',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name='med_geno',
+            name='Genome_Sequence',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name='med_geno',
+            name='mRNA_Sequence',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+    ]
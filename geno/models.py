@@ -4,8 +4,8 @@ from django.db import connections
 # Create your models here.
 class med_geno(models.Model):
     Plant_Name = models.TextField()
-    Scientific_Name = models.TextField()
-    Nucleotide = models.TextField()
-    Genome_Sequence = models.TextField()
-    mRNA_Sequence = models.TextField()
+    Scientific_Name = models.TextField(db_index=True)
+    Nucleotide = models.IntegerField(default=0, db_index=True)
+    Genome_Sequence = models.IntegerField(default=0, db_index=True)
+    mRNA_Sequence = models.IntegerField(default=0, db_index=True)
     NCBI_link = models.URLField()
\ No newline at end of file
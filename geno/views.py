@@ -1,12 +1,22 @@
 from django.db.models import Q
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView
 from django.shortcuts import render
+
+from pages.decorators import cached_response, dataset_conditional
+from pages.mixins import FacetedSearchMixin
+from pages.services.catalogue import catalogue_count
+from pages.services.fuzzy import PLANT, did_you_mean
+from pages.services.timing import phase
+
 from .models import med_geno
 
 
-class geno_view(ListView):
+@method_decorator([dataset_conditional, cached_response], name="dispatch")
+class geno_view(FacetedSearchMixin, ListView):
     template_name = "genomes.html"
     model = med_geno
+    facet_dataset = "genome"
 
     def get_queryset(self):
         query = self.request.GET.get("q", "").strip()
@@ -14,22 +24,20 @@ class geno_view(ListView):
         if not query:
             return med_geno.objects.none()
 
-        filters = (
-            Q(Plant_Name__icontains=query)
-            | Q(Scientific_Name__icontains=query)
-            | Q(Nucleotide__icontains=query)
-        )
-        return med_geno.objects.filter(filters).order_by("Plant_Name")
+        filters = Q(Plant_Name__icontains=query) | Q(Scientific_Name__icontains=query)
+        count = query.replace(",", "")
+        if count.isdigit():
+            filters |= Q(Nucleotide=int(count))
+        results = med_geno.objects.filter(filters).order_by("Plant_Name")
+        return self.narrow_by_facets(results)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["query"] = getattr(self, "search_term", "")
-        context["catalogue"] = (
-            med_geno.objects.all()
-            .order_by("Plant_Name")
-            .values_list("Plant_Name", "Scientific_Name")
-        )
-        context["result_count"] = context["object_list"].count()
+        with phase("catalogue"):
+            context["catalogue_count"] = catalogue_count(med_geno)
+        if context["query"] and not context["result_count"]:
+            context["suggestions"] = did_you_mean(context["query"], kinds=(PLANT,))
         return context
     
 
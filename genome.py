@@ -1,9 +1,18 @@
 import sqlite3
+
 import pandas as pd
 
-df1 = pd.read_csv('genome.csv')
+# NCBI counts use Western and Indian digit grouping ("74,640", "4,64,380")
+df1 = pd.read_csv('genome.csv', thousands=',')
+count_columns = ['Nucleotide', 'Genome_Sequence', 'mRNA_Sequence']
+df1[count_columns] = df1[count_columns].fillna(0).astype(int)
+
 conn = sqlite3.connect("db.sqlite3")
 
+# Remove all data from the existing table so reloads do not duplicate rows
+conn.execute("DELETE FROM geno_med_geno")
+conn.commit()
+
 df1.to_sql('geno_med_geno', conn, if_exists='append', index=False, method='multi', chunksize=1000,)
 
-conn.close()
\ No newline at end of file
+conn.close()
@@ -0,0 +1,43 @@
+"""
+gunicorn settings for MPMDB: ``gunicorn medi.wsgi``.
+
+The app is imported and warmed up once in the master (indexes built,
+tables read into the page cache, hot templates compiled), then frozen out
+of the garbage collector's reach before workers are forked. Every worker
+starts warm, answers /ready at once, and shares those pages instead of
+copying them the first time a collection touches them.
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "2"))
+preload_app = True
+
+# No collections while the app is imported and the indexes built; what
+# survives is frozen in when_ready.
+gc.disable()
+
+
+def on_starting(server):
+    from pages.services.metrics import clear_metrics_files
+
+    clear_metrics_files()
+
+
+def when_ready(server):
+    from django.db import connections
+
+    from pages.services.warmup import warm_up
+
+    try:
+        warm_up()
+    finally:
+        # Even when the warm-up fails, workers must open their own database
+        # connections and run with the collector back on.
+        connections.close_all()
+        gc.collect()
+        gc.freeze()
+        gc.enable()
@@ -29,6 +29,19 @@ DEBUG = True
 
 ALLOWED_HOSTS = ['127.0.0.1', 'mpmdb.onrender.com']
 
+# Per-request timing: Server-Timing headers and one JSON line per request on
+# the "pages.timing" logger. When off, the middleware drops out of the stack
+# and templates use the stock backend, so nothing is measured.
+REQUEST_TIMING = os.environ.get('MPMDB_REQUEST_TIMING') == '1'
+
+# Operational metrics served at /metrics. Workers write to per-process files
+# under MPMDB_METRICS_DIR so the endpoint sums all of them; clear it when the
+# server starts. Unset, each process keeps its metrics in memory.
+METRICS_ENABLED = os.environ.get('MPMDB_METRICS', '1') == '1'
+METRICS_DIR = os.environ.get('MPMDB_METRICS_DIR') or None
+# Clients allowed to read /metrics (comma-separated addresses); others get 403.
+METRICS_ALLOWED_IPS = os.environ.get('MPMDB_METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -49,6 +62,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'pages.middleware.MetricsMiddleware',
+    'pages.middleware.ServerTimingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -61,7 +77,11 @@ ROOT_URLCONF = 'medi.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': (
+            'pages.templating.TimedDjangoTemplates'
+            if REQUEST_TIMING
+            else 'django.template.backends.django.DjangoTemplates'
+        ),
         'DIRS': [os.path.join(BASE_DIR,"templates")],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -81,11 +101,72 @@ WSGI_APPLICATION = 'medi.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Ingest (the loader scripts, then `manage.py finish_ingest`) writes
+# db.sqlite3. Setting MPMDB_READ_ONLY_DB=1 switches web workers to the
+# serving mode: they open the release `manage.py publish_db` last published, read-only and
+# immutable, over persistent connections, and reopen when a newer release
+# is published.
+SQLITE_INGEST_DB = BASE_DIR / 'db.sqlite3'
+SQLITE_RELEASES_DIR = BASE_DIR / 'releases'
+SQLITE_PUBLISHED_DB = SQLITE_RELEASES_DIR / 'current.sqlite3'
+SQLITE_READ_ONLY = os.environ.get('MPMDB_READ_ONLY_DB') == '1'
+# FASTA imports (``manage.py import_sequences``) live beside the database as
+# memory-mapped files, one symlinked build per sequence kind.
+SEQUENCE_STORE_DIR = BASE_DIR / 'sequences'
+
+if SQLITE_READ_ONLY:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': f'file:{SQLITE_PUBLISHED_DB}?mode=ro&immutable=1',
+            'CONN_MAX_AGE': None,
+            'OPTIONS': {
+                'init_command': (
+                    'PRAGMA query_only=ON;'
+                    'PRAGMA mmap_size=268435456;'
+                    'PRAGMA cache_size=-65536;'
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': SQLITE_INGEST_DB,
+            'OPTIONS': {
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA cache_size=-65536;'
+                ),
+            },
+        }
     }
+
+
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The Plant Bot cache holds fallback summaries, in-flight locks and rate-limit
+# buckets, so it must be shared by every gunicorn worker on the host.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'plantbot': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'plantbot',
+    },
+    # Rendered search results and Plant Bot answers, keyed by dataset
+    # version. Point RESPONSE_CACHE_ALIAS at a FileBasedCache to share
+    # entries between workers.
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
 }
 
 
@@ -125,9 +206,66 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
+
+# `manage.py build_assets` writes hashed, gzip-compressed files; WhiteNoise
+# serves hashed names with a far-future immutable Cache-Control and the
+# rest for WHITENOISE_MAX_AGE seconds.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'pages.storage.AssetStorage',
+    },
+}
+WHITENOISE_MAX_AGE = 60 * 60
 MEDIA_URL = 'media/'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Plant Bot
+# Fallback lookups are limited per client IP and globally across workers;
+# throttled requests fall back to the curated-only answer.
+
+PLANTBOT_CACHE_ALIAS = 'plantbot'
+PLANTBOT_CLIENT_BURST = 10
+PLANTBOT_CLIENT_PER_MINUTE = 10
+PLANTBOT_OUTBOUND_BURST = 20
+PLANTBOT_OUTBOUND_PER_MINUTE = 60
+# Only enable behind a proxy that sets X-Forwarded-For (e.g. Render).
+PLANTBOT_TRUST_X_FORWARDED_FOR = False
+# Encyclopedic fallback for plants that are not curated. MPMDB_WIKI_URL points
+# it at another host, e.g. the stub started by ``manage.py loadtest``.
+PLANTBOT_WIKI_BASE_URL = os.environ.get('MPMDB_WIKI_URL', 'https://en.wikipedia.org').rstrip('/')
+PLANTBOT_WIKI_SEARCH_URL = f'{PLANTBOT_WIKI_BASE_URL}/w/api.php'
+PLANTBOT_WIKI_SUMMARY_URL = f'{PLANTBOT_WIKI_BASE_URL}/api/rest_v1/page/summary/{{title}}'
+# Questions the fallback could not answer from the summaries stored by
+# ``manage.py enrich``; the next run fetches the most frequent ones.
+PLANTBOT_MISS_LOG = BASE_DIR / 'logs' / 'plantbot-misses.jsonl'
+ENCYCLOPEDIA_REFRESH_DAYS = 30
+ENCYCLOPEDIA_MISSING_REFRESH_DAYS = 7
+
+RESPONSE_CACHE_ALIAS = "responses"
+RESPONSE_CACHE_MAX_BYTES = 512 * 1024
+
+# Rendered plant dossiers, keyed by dataset version.
+DOSSIER_CACHE_ALIAS = "default"
+DOSSIER_CACHE_SECONDS = 24 * 60 * 60
+
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'pages.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'pages.warmup': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'pages.enrichment': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
@@ -21,10 +21,11 @@ from geno.views import geno_view
 from transcriptom.views import transcriptom_view
 from basic.views import basic_view
 from proteom.views import proteom_view
-from classification.views import classification_view
-from django.contrib.staticfiles.urls import staticfiles_urlpatterns
+from classification.views import classification_view, taxonomy_view, taxonomy_api
 
-from pages.views import home_view ,intro_view, aloevera_view , amla_view , ashwagandha_view , babool_view , bhringraj_view , cinnamon_view , clove_view , cumin_view , curry_view , eucalyptus_view , ginger_view , lavender_view , mehndi_view , neem_view , peppermint_view , tulsi_view , turmeric_view, plantbot_view, plantbot_api 
+from pages.services.dossier import LEGACY_DOSSIERS, LEGACY_PAGES
+
+from pages.views import home_view ,intro_view, plant_view, plant_api, legacy_dossier_view, legacy_page_view, plantbot_view, plantbot_api, plantbot_stream_api, stats_view, stats_api, compare_view, compare_api, resolve_api, suggest_api, sequence_search_api, metrics_view, ready_view
 
 
 urlpatterns = [
@@ -32,30 +33,35 @@ urlpatterns = [
     path ('home.html', home_view ,name="home"),
     path('intro.html', intro_view, name="intro"),
     path('classification.html',classification_view.as_view(), name="classification"),
+    path('taxonomy.html', taxonomy_view, name="taxonomy"),
+    path('api/taxonomy/', taxonomy_api, name="taxonomy_api"),
     path('basic.html', basic_view.as_view(), name="basic"),
     path('genomes.html', geno_view.as_view(), name="genomes"),
     path('proteome.html', proteom_view.as_view(), name="proteom"),
     path('metabolites.html', phytochem_view.as_view(), name="metabolites"),
     path('transcriptom.html', transcriptom_view.as_view(), name="transcriptom"),
-    path('aloevera.html', aloevera_view, name="aloevera"),
-    path('amla.html', amla_view, name="amla"),
-    path('ashwagandha.html', ashwagandha_view, name="ashwagandha"),
-    path('babool.html', babool_view, name="babool"),
-    path('bhringraj.html', bhringraj_view, name="bhringraj"),
-    path('cinnamon.html', cinnamon_view, name="cinnamon"),
-    path('clove.html', clove_view, name="clove"),
-    path('cumin.html', cumin_view, name="cumin"),
-    path('curry.html', curry_view, name="curry"),
-    path('eucalyptus.html', eucalyptus_view, name="eucalyptus"),
-    path('ginger.html', ginger_view, name="ginger"),
-    path('lavender.html', lavender_view, name="lavender"),
-    path('mehndi.html', mehndi_view, name="mehndi"),
-    path('neem.html', neem_view, name="neem"),
-    path('peppermint.html', peppermint_view, name="peppermint"),
-    path('tulsi.html', tulsi_view, name="tulsi"),
-    path('turmeric.html', turmeric_view, name="turmeric"),
+    path('plant/<slug:slug>/', plant_view, name="plant"),
+    *[
+        path(f'{legacy}.html', legacy_dossier_view, {"legacy": legacy}, name=legacy)
+        for legacy in LEGACY_DOSSIERS
+    ],
+    *[
+        path(f'{legacy}.html', legacy_page_view, {"legacy": legacy}, name=legacy)
+        for legacy in LEGACY_PAGES
+    ],
+    path('stats.html', stats_view, name="stats"),
+    path('compare.html', compare_view, name="compare"),
+    path('api/plant/<slug:slug>/', plant_api, name="plant_api"),
+    path('api/compare/', compare_api, name="compare_api"),
+    path('api/resolve/', resolve_api, name="resolve_api"),
+    path('api/suggest/', suggest_api, name="suggest_api"),
+    path('api/sequences/search/', sequence_search_api, name="sequence_search_api"),
+    path('api/stats/', stats_api, name="stats_api"),
     path('plantbot.html', plantbot_view, name="plantbot"),
     path('api/plantbot/', plantbot_api, name="plantbot_api"),
+    path('api/plantbot/stream/', plantbot_stream_api, name="plantbot_stream_api"),
+    path('metrics', metrics_view, name="metrics"),
+    path('ready', ready_view, name="ready"),
     path('home/', home_view , name='home'),
     path('intro/',intro_view ,name='intro'),
     path('basic/',basic_view.as_view() ,name='basic'),
@@ -76,5 +82,3 @@ urlpatterns = [
     path('',home_view)
 
 ] 
-
-urlpatterns += staticfiles_urlpatterns()
\ No newline at end of file
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
 
 
 class PagesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pages'
+
+    def ready(self):
+        if getattr(settings, "SQLITE_READ_ONLY", False):
+            from .services.releases import reopen_if_republished
+
+            request_started.connect(reopen_if_republished, dispatch_uid="pages.reopen_if_republished")
@@ -0,0 +1,91 @@
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .services.response_cache import MISSING, RESPONSE_CACHE, RESPONSE_CACHE_MAX_BYTES
+from .services.throttling import cache_key
+from .services.versioning import dataset_version
+
+
+# How long browsers and proxies may reuse a page before revalidating.
+PAGE_CACHE_SECONDS = getattr(settings, "PAGE_CACHE_SECONDS", 300)
+
+
+def _normalized_params(request):
+    return sorted(
+        f"{key}={' '.join(value.split())}"
+        for key, values in request.GET.lists()
+        for value in values
+    )
+
+
+def dataset_etag(request, *args, **kwargs):
+    """
+    Responses only change on ingest, so the dataset version plus the path
+    and normalised query string identify a representation.
+    """
+    return cache_key(
+        "page", dataset_version().number, request.path, *_normalized_params(request)
+    )
+
+
+def dataset_last_modified(request, *args, **kwargs):
+    return dataset_version().updated_at
+
+
+def dataset_conditional(view):
+    """
+    Answer ``If-None-Match`` / ``If-Modified-Since`` with 304 before the
+    view runs, and let browsers and proxies cache the page for
+    ``PAGE_CACHE_SECONDS``. Views that set their own ``Cache-Control``
+    keep it.
+    """
+    conditional_view = condition(
+        etag_func=dataset_etag, last_modified_func=dataset_last_modified
+    )(view)
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        if response.status_code in (200, 304) and not response.has_header("Cache-Control"):
+            patch_cache_control(response, public=True, max_age=PAGE_CACHE_SECONDS)
+        return response
+
+    return wrapped
+
+
+def cached_response(view):
+    """
+    Serve repeated GETs from ``RESPONSE_CACHE``, keyed by URL name, path and
+    normalised query string under the current dataset version.
+    """
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return view(request, *args, **kwargs)
+
+        match = request.resolver_match
+        namespace = match.url_name if match and match.url_name else "page"
+        parts = (request.path, *_normalized_params(request))
+        cached = RESPONSE_CACHE.get(namespace, parts)
+        if cached is not MISSING:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = view(request, *args, **kwargs)
+        if isinstance(response, SimpleTemplateResponse):
+            response.render()
+        if (
+            response.status_code == 200
+            and not response.streaming
+            and len(response.content) <= RESPONSE_CACHE_MAX_BYTES
+        ):
+            RESPONSE_CACHE.set(namespace, parts, (response.content, response["Content-Type"]))
+        return response
+
+    return wrapped
@@ -0,0 +1,104 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from pages.services.benchmark import compare, missing_from_baseline, run_suite
+from pages.services.response_cache import RESPONSE_CACHE
+
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Time ingest, the six search pages and the Plant Bot against a "
+        "throwaway database loaded from the CSVs, and fail when a case is "
+        "slower, larger or issues more SQL queries than the stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--baseline",
+            type=Path,
+            default=DEFAULT_BASELINE,
+            help="Baseline JSON to compare against (default: benchmarks/baseline.json).",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.25,
+            help="Allowed slowdown or growth as a fraction of the baseline (default: 0.25).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Runs per case; the median time is reported (default: 5).",
+        )
+        parser.add_argument(
+            "--data-dir",
+            type=Path,
+            help="Load the CSVs from this directory, e.g. generate_dataset output.",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Write this run's numbers as the new baseline instead of comparing.",
+        )
+
+    def handle(self, *args, **options):
+        if getattr(settings, "SQLITE_READ_ONLY", False):
+            raise CommandError("Run benchmark from an ingest environment, not MPMDB_READ_ONLY_DB=1.")
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            RESPONSE_CACHE.reset_stats()
+            results = run_suite(repeat=options["repeat"], data_dir=options["data_dir"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        width = max(len(result.name) for result in results)
+        self.stdout.write(f"{'case':<{width}}  {'ms':>9}  {'queries':>7}  {'size':>8}")
+        for result in results:
+            self.stdout.write(
+                f"{result.name:<{width}}  {result.time_ms:>9.2f}  {result.queries:>7}  {result.size:>8}"
+            )
+        for namespace, counts in sorted(RESPONSE_CACHE.stats().items()):
+            self.stdout.write(
+                f"Response cache {namespace}: {counts['hits']} hits, "
+                f"{counts['misses']} misses ({counts['hit_rate']:.0%})"
+            )
+
+        current = {result.name: result._asdict() for result in results}
+        for entry in current.values():
+            entry.pop("name")
+        baseline_path = options["baseline"]
+        if options["update_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(current, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(f"Baseline written: {baseline_path}")
+            return
+
+        if not baseline_path.exists():
+            raise CommandError(f"No baseline at {baseline_path}; run with --update-baseline first.")
+        baseline = json.loads(baseline_path.read_text())
+        missing = missing_from_baseline(results, baseline)
+        if missing:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Not in the baseline, so not compared: {', '.join(missing)}. "
+                    "Run with --update-baseline to track them."
+                )
+            )
+        regressions = compare(results, baseline, options["threshold"])
+        if regressions:
+            raise CommandError(
+                "Performance regressions:\n" + "\n".join(f"  {line}" for line in regressions)
+            )
+        self.stdout.write(self.style.SUCCESS(f"No regressions beyond {options['threshold']:.0%}."))
@@ -0,0 +1,69 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from pages.services.assets import (
+    APP_STATIC_DIR,
+    IMAGE_DIR,
+    IMAGE_SUFFIXES,
+    build_variants,
+    canonical_images,
+    duplicate_groups,
+    referenced_images,
+    variant_formats,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Build responsive AVIF/WebP image variants, then collect static files "
+        "with hashed names and gzip copies. Duplicate images are served from one "
+        "canonical file; the others, and images no template or stylesheet "
+        "references, are left out of the build."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--skip-collect",
+            action="store_true",
+            help="Only build image variants; do not run collectstatic.",
+        )
+
+    def handle(self, *args, **options):
+        canonical = canonical_images(duplicate_groups())
+        for path, keep in sorted(canonical.items()):
+            if path != keep:
+                self.stdout.write(f"Duplicate image {path}: served as {keep}")
+
+        used = referenced_images()
+        manifest = build_variants(used, canonical)
+        if variant_formats():
+            variants = sum(
+                len(widths) for entry in manifest.values() for widths in entry["formats"].values()
+            )
+            self.stdout.write(f"Image variants: {variants} for {len(manifest)} images")
+        else:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Pillow with AVIF/WebP support is not installed; "
+                    "serving original images only."
+                )
+            )
+
+        if options["skip_collect"]:
+            return
+        # Only the canonical file of each referenced image is shipped.
+        shipped = {entry["source"] for entry in manifest.values()}
+        unused = [
+            str(path.relative_to(APP_STATIC_DIR))
+            for path in IMAGE_DIR.iterdir()
+            if path.suffix.lower() in IMAGE_SUFFIXES
+            and str(path.relative_to(APP_STATIC_DIR)) not in shipped
+        ]
+        self.stdout.write(f"Unreferenced and duplicate images left out: {len(unused)}")
+        call_command(
+            "collectstatic",
+            interactive=False,
+            clear=True,
+            ignore_patterns=unused,
+            verbosity=options["verbosity"],
+        )
@@ -0,0 +1,76 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.services.enrichment import run_enrichment
+from pages.services.plantbot import lookup_wiki_summary
+from pages.services.releases import publish_release
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-fetch encyclopedic summaries for every plant alias and the most "
+        "frequent Plant Bot questions that found none, and store them so the "
+        "bot's fallback answers from the database. Run it from cron, or keep "
+        "it running with --every as a local worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Fetches in flight at once (default: 4)."
+        )
+        parser.add_argument(
+            "--limit", type=int, default=500, help="Topics fetched per pass (default: 500)."
+        )
+        parser.add_argument(
+            "--top-misses",
+            type=int,
+            default=200,
+            help="Most frequent missed questions taken per pass (default: 200).",
+        )
+        parser.add_argument(
+            "--retries",
+            type=int,
+            default=2,
+            help="Retries of a fetch that failed on a network or HTTP error (default: 2).",
+        )
+        parser.add_argument(
+            "--every",
+            type=float,
+            metavar="SECONDS",
+            help="Keep running, starting a pass every SECONDS.",
+        )
+        parser.add_argument(
+            "--publish",
+            action="store_true",
+            help="Publish a new release after a pass that stored anything, so "
+            "read-only serving workers see the summaries.",
+        )
+
+    def handle(self, *args, **options):
+        if getattr(settings, "SQLITE_READ_ONLY", False):
+            raise CommandError("Run enrich from an ingest environment, not MPMDB_READ_ONLY_DB=1.")
+        while True:
+            started = time.monotonic()
+            self._pass(options)
+            if options["every"] is None:
+                return
+            time.sleep(max(0.0, options["every"] - (time.monotonic() - started)))
+
+    def _pass(self, options):
+        outcomes = run_enrichment(
+            lookup_wiki_summary,
+            workers=options["workers"],
+            limit=options["limit"],
+            top_misses=options["top_misses"],
+            retries=options["retries"],
+        )
+        if not outcomes:
+            self.stdout.write("Encyclopedia summaries: nothing due")
+            return
+        counts = ", ".join(f"{count} {status}" for status, count in sorted(outcomes.items()))
+        self.stdout.write(f"Encyclopedia summaries: {counts}")
+        if options["publish"]:
+            release = publish_release(settings.SQLITE_INGEST_DB)
+            self.stdout.write(f"Published release: {release.name}")
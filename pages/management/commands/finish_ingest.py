@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the derived tables and publish a new release. Run it once "
+        "after the CSV loader scripts, however many of them ran."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=3,
+            help="Number of releases to keep on disk, including the new one.",
+        )
+
+    def handle(self, *args, **options):
+        if getattr(settings, "SQLITE_READ_ONLY", False):
+            raise CommandError("Run finish_ingest from an ingest environment, not MPMDB_READ_ONLY_DB=1.")
+        call_command("refresh_derived", stdout=self.stdout)
+        call_command("publish_db", keep=options["keep"], stdout=self.stdout)
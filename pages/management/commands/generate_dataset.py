@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.services.synthetic import generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Write scaled-up synthetic copies of the six curated CSVs for load "
+        "and ingest testing. The same --seed always produces the same files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", type=Path, help="Directory to write the CSVs into.")
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=10,
+            help="Size relative to the curated data, at least 1 (default: 10).",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0).")
+
+    def handle(self, *args, **options):
+        if options["scale"] < 1:
+            raise CommandError("--scale must be at least 1.")
+        written = generate(options["output"], options["scale"], seed=options["seed"])
+        for filename, rows in written.items():
+            self.stdout.write(f"{filename}: {rows} rows")
@@ -0,0 +1,57 @@
+from collections import Counter
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.services.sequences import (
+    SEQUENCE_KINDS,
+    SeqIO,
+    build_store,
+    match_fasta_organisms,
+    read_fasta,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import FASTA files into the local sequence store of one kind, "
+        "replacing what was imported before, and build its k-mer index for "
+        "/api/sequences/search/. Records are matched to curated plants by "
+        "the [Organism] at the end of their description, or by --plant."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+", type=Path, help="FASTA files to import.")
+        parser.add_argument(
+            "--kind",
+            choices=sorted(SEQUENCE_KINDS),
+            default="protein",
+            help="Sequence kind (default: protein).",
+        )
+        parser.add_argument(
+            "--plant",
+            help="Plant name or NCBI taxonomy ID every record belongs to.",
+        )
+
+    def handle(self, *args, **options):
+        if SeqIO is None:
+            raise CommandError("Importing FASTA files needs Biopython: pip install biopython")
+        missing = [str(path) for path in options["files"] if not path.is_file()]
+        if missing:
+            raise CommandError(f"No such file: {', '.join(missing)}")
+
+        matches = match_fasta_organisms(options["files"], plant=options["plant"])
+        plants = {match[0] for match in matches.values() if match is not None}
+        if not plants:
+            for organism in sorted(organism or "(no organism)" for organism in matches):
+                self.stdout.write(self.style.WARNING(f"Skipped uncurated plant {organism}"))
+            raise CommandError("No records matched a curated plant; the store was left as it was.")
+        skipped = Counter()
+        records = read_fasta(options["files"], matches, skipped, plant=options["plant"])
+        build, count = build_store(options["kind"], records)
+        for organism, skipped_count in sorted(skipped.items()):
+            self.stdout.write(
+                self.style.WARNING(f"Skipped {skipped_count} records of uncurated plant {organism}")
+            )
+        self.stdout.write(f"Sequence store {options['kind']}: {count} records of {len(plants)} plants")
+        self.stdout.write(f"Build: {build.name}")
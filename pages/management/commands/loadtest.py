@@ -0,0 +1,120 @@
+import json
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.services.loadtest import DEFAULT_MIX, RequestMix, WikipediaStub, compare_runs, run_level
+
+
+def _mix(value):
+    weights = {}
+    for item in value.split(","):
+        kind, _, weight = item.partition("=")
+        if kind.strip() not in DEFAULT_MIX or not weight.strip().isdigit():
+            raise ValueError(item)
+        weights[kind.strip()] = int(weight)
+    return weights
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a weighted mix of search, dossier, completion and Plant Bot "
+        "requests against a running instance at each concurrency level, and "
+        "write throughput, p50/p95/p99 latency and error rates per endpoint "
+        "to a JSON file. A local stub answers the Plant Bot's Wikipedia "
+        "fallback; start the server with MPMDB_WIKI_URL pointing at it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Instance under test.")
+        parser.add_argument(
+            "--concurrency",
+            default="1,4,16",
+            help="Comma-separated numbers of concurrent clients (default: 1,4,16).",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=10, help="Seconds per concurrency level (default: 10)."
+        )
+        parser.add_argument(
+            "--mix",
+            type=_mix,
+            default=DEFAULT_MIX,
+            help="Request weights, e.g. search=50,dossier=25,suggest=15,plantbot=10.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0).")
+        parser.add_argument(
+            "--stub-port",
+            type=int,
+            default=8765,
+            help="Port of the Wikipedia stub (default: 8765); 0 disables the stub.",
+        )
+        parser.add_argument(
+            "--stub-latency-ms",
+            type=float,
+            default=150,
+            help="Delay of every stub response (default: 150).",
+        )
+        parser.add_argument(
+            "--label",
+            default="",
+            help="Deployment notes stored with the results, e.g. 'gunicorn -w 4 --threads 2'.",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=Path("loadtest.json"),
+            help="Results file (default: loadtest.json).",
+        )
+        parser.add_argument("--compare", type=Path, help="Earlier results file to compare against.")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options["concurrency"].split(",")]
+        except ValueError:
+            raise CommandError("--concurrency takes comma-separated integers.")
+        mix = RequestMix.from_database(options["mix"])
+
+        stub = (
+            WikipediaStub(options["stub_port"], options["stub_latency_ms"] / 1000)
+            if options["stub_port"]
+            else nullcontext()
+        )
+        results = {
+            "target": options["url"],
+            "label": options["label"],
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "mix": options["mix"],
+            "seed": options["seed"],
+            "stub_latency_ms": options["stub_latency_ms"] if options["stub_port"] else None,
+            "levels": [],
+        }
+        with stub:
+            if options["stub_port"]:
+                self.stdout.write(
+                    f"Wikipedia stub: {stub.url} (start the server with MPMDB_WIKI_URL={stub.url})"
+                )
+            for concurrency in levels:
+                level = run_level(
+                    options["url"], mix, concurrency, options["duration"], seed=options["seed"]
+                )
+                results["levels"].append(level)
+                self.stdout.write(
+                    f"c={concurrency}: {level['throughput_rps']} req/s, "
+                    f"p50 {level['p50_ms']} ms, p95 {level['p95_ms']} ms, "
+                    f"p99 {level['p99_ms']} ms, errors {level['error_rate']:.1%}"
+                )
+                for endpoint, stats in level["endpoints"].items():
+                    self.stdout.write(
+                        f"    {endpoint:<28} {stats['requests']:>6}  "
+                        f"p50 {stats['p50_ms']:>8} ms  p95 {stats['p95_ms']:>8} ms  "
+                        f"p99 {stats['p99_ms']:>8} ms  errors {stats['error_rate']:.1%}"
+                    )
+
+        options["output"].write_text(json.dumps(results, indent=2) + "\n")
+        self.stdout.write(f"Results written: {options['output']}")
+        if options["compare"]:
+            previous = json.loads(options["compare"].read_text())
+            for line in compare_runs(previous, results):
+                self.stdout.write(line)
@@ -0,0 +1,100 @@
+import io
+import tempfile
+from pathlib import Path
+from statistics import mean
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from pages.services.benchmark import LOADERS, load_csv
+from pages.services.memory import fork_workers, index_sizes, memory_usage
+from pages.services.synthetic import generate
+from pages.services.warmup import warm_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a scaled-up synthetic dataset into a throwaway database, build "
+        "the in-process indexes once and fork workers from that process, as "
+        "gunicorn does with preload_app, then report each worker's resident, "
+        "proportional and private memory with and without gc.freeze()."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=10,
+            help="Dataset size relative to the curated CSVs (default: 10).",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0).")
+        parser.add_argument(
+            "--data-dir",
+            type=Path,
+            help="Load the CSVs from this directory instead of generating them.",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Workers to fork (default: 4)."
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Mixed requests each worker serves before it is measured (default: 200).",
+        )
+
+    def handle(self, *args, **options):
+        if getattr(settings, "SQLITE_READ_ONLY", False):
+            raise CommandError(
+                "Run memory_report from an ingest environment, not MPMDB_READ_ONLY_DB=1."
+            )
+
+        with tempfile.TemporaryDirectory() as workdir:
+            data_dir = options["data_dir"]
+            if data_dir is None:
+                data_dir = Path(workdir) / "data"
+                generate(data_dir, options["scale"], seed=options["seed"])
+
+            # Forked workers need their own connections to the same data, so
+            # the test database is a file rather than SQLite's in-memory one.
+            connection.settings_dict["TEST"]["NAME"] = str(Path(workdir) / "memory_report.sqlite3")
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                for spec in LOADERS:
+                    load_csv(data_dir, *spec)
+                call_command("refresh_derived", stdout=io.StringIO())
+                self._report(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+    def _report(self, options):
+        before = memory_usage()["rss"]
+        warm_indexes()
+        after = memory_usage()["rss"]
+        self.stdout.write(f"Master RSS: {before / 1024:.1f} MiB before indexes, {after / 1024:.1f} MiB after")
+        for name, size in index_sizes().items():
+            self.stdout.write(f"  {name:<18} {size / 2**20:>7.2f} MiB")
+
+        for freeze in (False, True):
+            usage = fork_workers(
+                options["workers"], options["requests"], freeze=freeze, seed=options["seed"]
+            )
+            self.stdout.write(f"Workers {'with' if freeze else 'without'} gc.freeze():")
+            self.stdout.write(f"  {'worker':<8} {'RSS MiB':>8} {'PSS MiB':>8} {'private MiB':>12}")
+            for index, worker in enumerate(usage, 1):
+                self.stdout.write(
+                    f"  {index:<8} {worker['rss'] / 1024:>8.1f} {worker['pss'] / 1024:>8.1f} "
+                    f"{worker['private'] / 1024:>12.1f}"
+                )
+            self.stdout.write(
+                f"  {'mean':<8} {mean(w['rss'] for w in usage) / 1024:>8.1f} "
+                f"{mean(w['pss'] for w in usage) / 1024:>8.1f} "
+                f"{mean(w['private'] for w in usage) / 1024:>12.1f}"
+            )
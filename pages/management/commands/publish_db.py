@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.services.releases import publish_release
+
+
+class Command(BaseCommand):
+    help = (
+        "Publish the ingest database as a new immutable release and switch "
+        "read-only serving workers to it. finish_ingest runs this after "
+        "refresh_derived."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=3,
+            help="Number of releases to keep on disk, including the new one.",
+        )
+
+    def handle(self, *args, **options):
+        if getattr(settings, "SQLITE_READ_ONLY", False):
+            raise CommandError("Run publish_db from an ingest environment, not MPMDB_READ_ONLY_DB=1.")
+        release = publish_release(settings.SQLITE_INGEST_DB, keep=options["keep"])
+        self.stdout.write(f"Published release: {release.name}")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from classification.taxonomy import rebuild_taxonomy_tree
+from pages.services.dossier import rebuild_plant_dossiers
+from pages.services.facets import rebuild_facets
+from pages.services.omics import rebuild_omics_summary
+from pages.services.resolve import rebuild_alias_table
+from pages.services.versioning import bump_dataset_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the tables derived from the curated datasets. "
+        "finish_ingest runs this after the CSV loaders."
+    )
+
+    def handle(self, *args, **options):
+        nodes = rebuild_taxonomy_tree()
+        self.stdout.write(f"Taxonomy tree: {nodes} nodes")
+        metrics = rebuild_omics_summary()
+        self.stdout.write(f"Omics summary: {metrics} metrics")
+        aliases = rebuild_alias_table()
+        self.stdout.write(f"Plant aliases: {aliases} keys")
+        dossiers = rebuild_plant_dossiers()
+        self.stdout.write(f"Plant dossiers: {dossiers} plants")
+        facets = rebuild_facets()
+        self.stdout.write(f"Search facets: {facets} bitmaps")
+        version = bump_dataset_version()
+        self.stdout.write(f"Dataset version: {version}")
@@ -0,0 +1,95 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .services.metrics import REQUEST_DURATION, REQUEST_QUERIES, REQUESTS, REQUESTS_IN_PROGRESS
+from .services.timing import start_timer, stop_timer
+
+logger = logging.getLogger("pages.timing")
+
+
+class ServerTimingMiddleware:
+    """
+    Break each request's time down into SQL, template rendering, Plant Bot
+    phases and cache lookups, and send it as ``Server-Timing`` plus one
+    JSON log line on the ``pages.timing`` logger. Removed from the stack
+    unless ``REQUEST_TIMING`` is set.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_TIMING", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer, token = start_timer()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                response = self.get_response(request)
+        finally:
+            stop_timer(token)
+        timer.finish()
+
+        response["Server-Timing"] = timer.header()
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    **timer.record(),
+                }
+            )
+        )
+        return response
+
+
+class _QueryCounter:
+    __slots__ = ("queries",)
+
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status class and SQL query count per view into the
+    metrics registry served at ``/metrics``. Removed from the stack when
+    ``METRICS_ENABLED`` is off.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = _QueryCounter()
+        started = time.perf_counter()
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                response = self.get_response(request)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = (match.view_name or match._func_path) if match else "unmatched"
+        REQUEST_DURATION.observe(elapsed, view, request.method)
+        REQUESTS.inc(view, request.method, f"{response.status_code // 100}xx")
+        REQUEST_QUERIES.observe(counter.queries, view)
+        return response
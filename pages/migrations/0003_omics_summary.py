@@ -0,0 +1,47 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('pages', '0002_delete_med_class'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OmicsCoverage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('has_genome', models.BooleanField()),
+                ('has_proteome', models.BooleanField()),
+                ('has_transcript', models.BooleanField()),
+                ('plant_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-plant_count'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OmicsMetricSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('layer', models.CharField(max_length=16)),
+                ('metric', models.CharField(max_length=32, unique=True)),
+                ('total', models.BigIntegerField(default=0)),
+                ('plants_reported', models.IntegerField(default=0)),
+                ('mean', models.FloatField(default=0)),
+                ('p50', models.FloatField(default=0)),
+                ('p90', models.FloatField(default=0)),
+                ('p99', models.FloatField(default=0)),
+                ('maximum', models.BigIntegerField(default=0)),
+                ('top_plants', models.JSONField(default=list)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0003_omics_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.TextField(db_index=True)),
+                ('kind', models.CharField(max_length=16)),
+                ('scientific_key', models.TextField(db_index=True)),
+                ('scientific_name', models.TextField()),
+                ('plant_label', models.TextField(default='')),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0005_dataset_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantDossier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scientific_key', models.TextField(unique=True)),
+                ('slug', models.SlugField(max_length=255, unique=True)),
+                ('label', models.TextField()),
+                ('scientific_name', models.TextField()),
+                ('payload', models.JSONField(default=dict)),
+            ],
+            options={
+                'ordering': ['slug'],
+            },
+        ),
+    ]
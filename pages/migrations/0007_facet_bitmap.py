@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0006_plant_dossier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dataset', models.CharField(max_length=16)),
+                ('facet', models.CharField(max_length=16)),
+                ('value', models.TextField()),
+                ('bits', models.BinaryField()),
+                ('row_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['dataset', 'facet', '-row_count', 'value'],
+            },
+        ),
+    ]
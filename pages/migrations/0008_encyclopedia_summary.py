@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0007_facet_bitmap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EncyclopediaSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.TextField(unique=True)),
+                ('query', models.TextField()),
+                ('status', models.CharField(max_length=16)),
+                ('summary', models.TextField(default='')),
+                ('url', models.TextField(default='')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('fetched_at', models.DateTimeField()),
+                ('refresh_after', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+from .services.facets import bitmap_ids, facet_counts, narrow, selected_facets, to_bitmap
+
+
+class FacetedSearchMixin:
+    """
+    Facet navigation for the dataset search pages. ``get_queryset`` passes
+    its search results through ``narrow_by_facets``, which fetches them in
+    one query and narrows them in memory; the context then gets the result
+    count and the count of every facet value within those results, computed
+    from the ingest-time bitmaps of ``facet_dataset``.
+    """
+
+    facet_dataset = None
+    facet_bits = None
+    result_count = 0
+
+    def narrow_by_facets(self, queryset):
+        self.facet_selection = selected_facets(self.request.GET)
+        rows = list(queryset)
+        bits = to_bitmap(row.id for row in rows)
+        if self.facet_selection:
+            bits = narrow(self.facet_dataset, bits, self.facet_selection)
+            kept = set(bitmap_ids(bits))
+            rows = [row for row in rows if row.id in kept]
+        self.facet_bits = bits
+        self.result_count = bits.bit_count()
+        return rows
+
+    def _facet_url(self, key, value):
+        params = self.request.GET.copy()
+        if params.get(key) == value:
+            params.pop(key)
+        else:
+            params[key] = value
+        return f"?{params.urlencode()}"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["result_count"] = self.result_count
+        if self.facet_bits is None:
+            return context
+        facets = facet_counts(self.facet_dataset, self.facet_bits, self.facet_selection)
+        for group in facets:
+            for value in group["values"]:
+                value["url"] = self._facet_url(group["key"], value["value"])
+        context["facets"] = facets
+        return context
@@ -3,3 +3,120 @@ from django.db import connections
 # Create your models here.
 
 
+class OmicsMetricSummary(models.Model):
+    """
+    Precomputed aggregates for one omics count column, refreshed on ingest
+    so the stats dashboard never scans the dataset tables.
+    """
+
+    layer = models.CharField(max_length=16)
+    metric = models.CharField(max_length=32, unique=True)
+    total = models.BigIntegerField(default=0)
+    plants_reported = models.IntegerField(default=0)
+    mean = models.FloatField(default=0)
+    p50 = models.FloatField(default=0)
+    p90 = models.FloatField(default=0)
+    p99 = models.FloatField(default=0)
+    maximum = models.BigIntegerField(default=0)
+    top_plants = models.JSONField(default=list)
+
+    class Meta:
+        ordering = ["id"]
+
+
+class OmicsCoverage(models.Model):
+    """
+    Number of plants for each combination of omics layers with data.
+    """
+
+    has_genome = models.BooleanField()
+    has_proteome = models.BooleanField()
+    has_transcript = models.BooleanField()
+    plant_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["-plant_count"]
+
+
+class PlantAlias(models.Model):
+    """
+    Normalised lookup key (common name, scientific name, binomial or NCBI
+    taxonomy ID) pointing at the scientific name stored in the datasets.
+    Built at ingest with the Plant Bot alias rules.
+    """
+
+    COMMON = "common"
+    SCIENTIFIC = "scientific"
+    BINOMIAL = "binomial"
+    TAXONOMY_ID = "taxonomy_id"
+
+    alias = models.TextField(db_index=True)
+    kind = models.CharField(max_length=16)
+    scientific_key = models.TextField(db_index=True)
+    scientific_name = models.TextField()
+    plant_label = models.TextField(default="")
+
+
+class DatasetVersion(models.Model):
+    """
+    Single-row counter bumped by every ingest. In-memory indexes and caches
+    key on it, so nothing has to be invalidated by hand.
+    """
+
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class PlantDossier(models.Model):
+    """
+    One denormalised row per curated plant with all six datasets and its
+    compounds, rebuilt at ingest. The dossier page, the JSON API, compare
+    and the Plant Bot read this row instead of joining the dataset tables.
+    """
+
+    scientific_key = models.TextField(unique=True)
+    slug = models.SlugField(max_length=255, unique=True)
+    label = models.TextField()
+    scientific_name = models.TextField()
+    payload = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ["slug"]
+
+
+class FacetBitmap(models.Model):
+    """
+    Rows of one dataset carrying one facet value, as a bitmap indexed by
+    row id. Built at ingest; search pages intersect the bitmaps in memory
+    to count and narrow results.
+    """
+
+    dataset = models.CharField(max_length=16)
+    facet = models.CharField(max_length=16)
+    value = models.TextField()
+    bits = models.BinaryField()
+    row_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["dataset", "facet", "-row_count", "value"]
+
+
+class EncyclopediaSummary(models.Model):
+    """
+    Encyclopedic fallback summary for one normalised topic (an alias or a
+    frequently missed Plant Bot question), fetched ahead of time by
+    ``manage.py enrich`` so the bot answers without a network round-trip.
+    """
+
+    FOUND = "found"
+    MISSING = "missing"
+    FAILED = "failed"
+
+    topic = models.TextField(unique=True)
+    query = models.TextField()
+    status = models.CharField(max_length=16)
+    summary = models.TextField(default="")
+    url = models.TextField(default="")
+    attempts = models.PositiveIntegerField(default=0)
+    fetched_at = models.DateTimeField()
+    refresh_after = models.DateTimeField(db_index=True)
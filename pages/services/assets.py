@@ -0,0 +1,156 @@
+import hashlib
+import json
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is only needed to build image variants.
+    Image = None
+
+
+APP_STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+IMAGE_DIR = APP_STATIC_DIR / "images"
+# Generated by build_assets; git-ignored and collected like any app static file.
+VARIANT_DIR = APP_STATIC_DIR / "variants"
+VARIANT_MANIFEST = VARIANT_DIR / "manifest.json"
+
+RESPONSIVE_WIDTHS = getattr(settings, "ASSET_RESPONSIVE_WIDTHS", (320, 640, 1280))
+VARIANT_QUALITY = {"avif": 55, "webp": 78}
+IMAGE_SUFFIXES = {".avif", ".jpeg", ".jpg", ".png", ".webp"}
+# Average hashes this many bits apart are reported as the same picture.
+NEAR_DUPLICATE_BITS = 4
+
+IMAGE_REFERENCE = re.compile(r"images/[A-Za-z0-9_.-]+")
+
+
+def referenced_images() -> List[str]:
+    """
+    Every ``images/...`` path mentioned by a template or stylesheet.
+    """
+    sources = list(Path(settings.BASE_DIR, "templates").rglob("*.html"))
+    sources += list(APP_STATIC_DIR.rglob("*.css"))
+    found = set()
+    for source in sources:
+        found.update(IMAGE_REFERENCE.findall(source.read_text(encoding="utf-8")))
+    return sorted(path for path in found if (APP_STATIC_DIR / path).exists())
+
+
+def _digest(path: Path) -> str:
+    return hashlib.sha1(path.read_bytes()).hexdigest()[:12]
+
+
+def _average_hash(path: Path):
+    with Image.open(path) as image:
+        pixels = list(image.convert("L").resize((8, 8)).getdata())
+    mean = sum(pixels) / len(pixels)
+    return sum(1 << i for i, pixel in enumerate(pixels) if pixel > mean)
+
+
+def duplicate_groups() -> List[List[str]]:
+    """
+    Groups of images under ``images/`` that are byte-identical or, when
+    Pillow is available, visually the same picture in another format.
+    """
+    paths = sorted(p for p in IMAGE_DIR.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    by_digest = defaultdict(list)
+    for path in paths:
+        by_digest[_digest(path)].append(path)
+    clusters = list(by_digest.values())
+
+    if Image is not None:
+        merged = []
+        for group in clusters:
+            try:
+                average = _average_hash(group[0])
+            except OSError:
+                merged.append((None, group))
+                continue
+            for cluster_hash, cluster in merged:
+                if cluster_hash is not None and bin(average ^ cluster_hash).count("1") <= NEAR_DUPLICATE_BITS:
+                    cluster.extend(group)
+                    break
+            else:
+                merged.append((average, list(group)))
+        clusters = [cluster for _, cluster in merged]
+
+    return sorted(
+        sorted(str(path.relative_to(APP_STATIC_DIR)) for path in cluster)
+        for cluster in clusters
+        if len(cluster) > 1
+    )
+
+
+def canonical_images(groups: List[List[str]]) -> Dict[str, str]:
+    """
+    Every image of a duplicate group mapped to the one file of the group
+    that is shipped: the smallest, ties broken by name.
+    """
+    canonical = {}
+    for group in groups:
+        keep = min(group, key=lambda path: ((APP_STATIC_DIR / path).stat().st_size, path))
+        for path in group:
+            canonical[path] = keep
+    return canonical
+
+
+def variant_formats() -> List[str]:
+    if Image is None:
+        return []
+    return [fmt for fmt in ("avif", "webp") if features.check(fmt)]
+
+
+def build_variants(paths: List[str], canonical: Optional[Dict[str, str]] = None) -> Dict[str, dict]:
+    """
+    Write resized AVIF/WebP copies of ``paths`` to ``variants/`` and return
+    the manifest. Each path is served from its ``canonical`` file, recorded
+    as the entry's ``source``, so duplicates share one set of files; images
+    are never upscaled. Without Pillow the manifest maps sources only.
+    """
+    canonical = canonical or {}
+    formats = variant_formats()
+    VARIANT_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for path in paths:
+        entry = {"source": canonical.get(path, path), "formats": {}}
+        manifest[path] = entry
+        if not formats:
+            continue
+        source = APP_STATIC_DIR / entry["source"]
+        digest = _digest(source)
+        with Image.open(source) as image:
+            image.load()
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+            widths = [w for w in RESPONSIVE_WIDTHS if w < image.width] + [image.width]
+            entry["width"] = image.width
+            for fmt in formats:
+                entry["formats"][fmt] = {}
+                for width in widths:
+                    name = f"variants/{digest}-{width}.{fmt}"
+                    target = APP_STATIC_DIR / name
+                    if not target.exists():
+                        height = round(image.height * width / image.width)
+                        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                        resized.save(target, fmt.upper(), quality=VARIANT_QUALITY[fmt])
+                    entry["formats"][fmt][str(width)] = name
+
+    VARIANT_MANIFEST.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    _manifest_cache.clear()
+    return manifest
+
+
+_manifest_cache = {}
+
+
+def load_variant_manifest() -> Dict[str, dict]:
+    if "manifest" not in _manifest_cache:
+        try:
+            _manifest_cache["manifest"] = json.loads(VARIANT_MANIFEST.read_text())
+        except (OSError, ValueError):
+            _manifest_cache["manifest"] = {}
+    return _manifest_cache["manifest"]
@@ -0,0 +1,231 @@
+import io
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+from unittest import mock
+
+import pandas as pd
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from .plantbot import PlantKnowledge
+from .response_cache import RESPONSE_CACHE
+
+
+# Replays of the loader scripts' read and insert steps: (table, CSV file,
+# read_csv options, integer count columns, fill values).
+LOADERS = [
+    ("basic_med_basic", "basic_info.csv", {}, [], {"References": "No reference"}),
+    ("classification_med_class", "class.csv", {}, [], {}),
+    (
+        "geno_med_geno",
+        "genome.csv",
+        {"thousands": ","},
+        ["Nucleotide", "Genome_Sequence", "mRNA_Sequence"],
+        {},
+    ),
+    (
+        "proteom_med_proteom",
+        "proteome.csv",
+        {"thousands": ","},
+        ["Protein_Seq", "Identical_Protein_Groups", "Protein"],
+        {},
+    ),
+    (
+        "transcriptom_med_transcriptom",
+        "trans.csv",
+        {"thousands": ","},
+        ["SRA", "DNA", "RNA", "BioProject", "BioSample"],
+        {"NCBI_link": "N/A"},
+    ),
+    ("phytochem_med_phytochem", "phyto.csv", {}, [], {"LogP": 0}),
+]
+
+# Search page URL and (exact name, broad substring, miss) queries.
+VIEW_QUERIES = [
+    ("basic", "/basic.html", ("Ocimum tenuiflorum", "a", "zzqx")),
+    ("classification", "/classification.html", ("Ocimum tenuiflorum", "ae", "zzqx")),
+    ("genomes", "/genomes.html", ("Ocimum tenuiflorum", "a", "zzqx")),
+    ("proteome", "/proteome.html", ("Ocimum tenuiflorum", "a", "zzqx")),
+    ("transcriptom", "/transcriptom.html", ("Ocimum tenuiflorum", "a", "zzqx")),
+    ("metabolites", "/metabolites.html", ("Ocimum tenuiflorum", "acid", "zzqx")),
+]
+PLANTBOT_QUESTIONS = [
+    ("exact", "Summarize Ocimum tenuiflorum"),
+    ("broad", "Which plants have metabolomics data?"),
+    ("miss", "Tell me about zzqx"),
+]
+QUERY_KINDS = ("exact", "broad", "miss")
+
+# Timings below this many milliseconds of slack are treated as noise.
+MIN_TIME_SLACK_MS = 1.0
+
+
+class Measurement(NamedTuple):
+    name: str
+    time_ms: float
+    queries: int
+    size: int
+
+
+def _clear_response_caches():
+    RESPONSE_CACHE.backend.clear()
+    caches[getattr(settings, "DOSSIER_CACHE_ALIAS", "default")].clear()
+
+
+def measure(
+    name: str,
+    action: Callable[[], Optional[int]],
+    repeat: int,
+    setup: Optional[Callable[[], None]] = None,
+) -> Measurement:
+    """
+    Median wall time of ``repeat`` runs of ``action``, with the SQL query
+    count and size (``action``'s return value: response bytes, rows
+    loaded or entries built) of the last run.
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            size = action()
+            timings.append((time.perf_counter() - started) * 1000)
+    return Measurement(name, round(statistics.median(timings), 3), len(queries), size or 0)
+
+
+def load_csv(data_dir, table, filename, read_options, count_columns, fill):
+    frame = pd.read_csv(Path(data_dir) / filename, **read_options)
+    if count_columns:
+        frame[count_columns] = frame[count_columns].fillna(0).astype(int)
+    if fill:
+        frame = frame.fillna(fill)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}")
+    frame.to_sql(
+        table,
+        connection.connection,
+        if_exists="append",
+        index=False,
+        method="multi",
+        chunksize=1000,
+    )
+    return len(frame)
+
+
+def ingest_benchmarks(repeat: int, data_dir) -> List[Measurement]:
+    connection.ensure_connection()
+    results = [
+        measure(f"ingest.{spec[1]}", lambda spec=spec: load_csv(data_dir, *spec), repeat)
+        for spec in LOADERS
+    ]
+    results.append(
+        measure(
+            "ingest.refresh_derived",
+            lambda: call_command("refresh_derived", stdout=io.StringIO()),
+            repeat,
+        )
+    )
+    return results
+
+
+def view_benchmarks(client: Client, repeat: int) -> List[Measurement]:
+    results = []
+    for name, url, queries in VIEW_QUERIES:
+        for kind, query in zip(QUERY_KINDS, queries):
+
+            def fetch(url=url, query=query):
+                return len(client.get(url, {"q": query}).content)
+
+            results.append(
+                measure(f"view.{name}.{kind}", fetch, repeat, setup=_clear_response_caches)
+            )
+            results.append(measure(f"view.{name}.{kind}.cached", fetch, repeat))
+    return results
+
+
+def plantbot_benchmarks(client: Client, repeat: int) -> List[Measurement]:
+    results = []
+    knowledge = PlantKnowledge()
+    results.append(
+        measure("plantbot.knowledge.build", lambda: len(PlantKnowledge().alias_index), repeat)
+    )
+    for kind, question in PLANTBOT_QUESTIONS:
+
+        def answer(question=question):
+            response = client.post(
+                "/api/plantbot/",
+                json.dumps({"question": question}),
+                content_type="application/json",
+            )
+            return len(response.content)
+
+        def match_and_summarize(question=question):
+            record = knowledge.match(question)
+            return len(knowledge.summarize(record)[0]) if record else 0
+
+        results.append(
+            measure(f"plantbot.api.{kind}", answer, repeat, setup=_clear_response_caches)
+        )
+        results.append(measure(f"plantbot.match.{kind}", match_and_summarize, repeat))
+    return results
+
+
+def run_suite(repeat: int = 5, data_dir=None) -> List[Measurement]:
+    """
+    Load the CSVs in ``data_dir`` (the curated ones by default, or a
+    ``generate_dataset`` output) into the current (throwaway) database, then
+    time the search pages, the Plant Bot and its knowledge lookups on that
+    data. Encyclopedic fallbacks are disabled so misses never reach the
+    network or the miss log.
+    """
+    results = ingest_benchmarks(repeat, data_dir or settings.BASE_DIR)
+    client = Client()
+    with mock.patch("pages.services.plantbot._wiki_summary", return_value=None), mock.patch(
+        "pages.services.plantbot.record_miss"
+    ):
+        results += view_benchmarks(client, repeat)
+        results += plantbot_benchmarks(client, repeat)
+    return results
+
+
+def compare(
+    results: List[Measurement], baseline: Dict[str, dict], threshold: float
+) -> List[str]:
+    """
+    Regressions against ``baseline``: more SQL queries, or time or size
+    beyond ``threshold`` (a fraction) of the baseline value.
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None:
+            continue
+        if result.queries > base["queries"]:
+            regressions.append(f"{result.name}: queries {base['queries']} -> {result.queries}")
+        if (
+            result.time_ms > base["time_ms"] * (1 + threshold)
+            and result.time_ms - base["time_ms"] > MIN_TIME_SLACK_MS
+        ):
+            regressions.append(
+                f"{result.name}: time {base['time_ms']:.1f} ms -> {result.time_ms:.1f} ms"
+            )
+        if result.size > base["size"] * (1 + threshold):
+            regressions.append(f"{result.name}: size {base['size']} -> {result.size}")
+    return regressions
+
+
+def missing_from_baseline(results: List[Measurement], baseline: Dict[str, dict]) -> List[str]:
+    """
+    Cases measured in this run that ``baseline`` has no entry for, so
+    ``compare`` could not check them.
+    """
+    return [result.name for result in results if result.name not in baseline]
@@ -0,0 +1,18 @@
+from typing import Dict
+
+from .resolve import DATASET_MODELS
+from .versioning import VersionedIndex
+
+
+def build_catalogue_counts() -> Dict[str, int]:
+    """
+    Row count of every curated dataset, shown on its search page.
+    """
+    return {model._meta.label_lower: model.objects.count() for model in DATASET_MODELS}
+
+
+CATALOGUE_COUNTS = VersionedIndex(build_catalogue_counts)
+
+
+def catalogue_count(model) -> int:
+    return CATALOGUE_COUNTS.get()[model._meta.label_lower]
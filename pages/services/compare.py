@@ -0,0 +1,43 @@
+from typing import List
+
+from .dossier import load_dossiers, plant_summary
+from .omics import OMICS_LAYERS
+from .resolve import match_names
+
+
+MAX_COMPARE_PLANTS = 10
+TOP_COMPOUNDS = 5
+
+
+def compare_plants(identifiers: List[str]) -> dict:
+    """
+    Side-by-side view of up to ``MAX_COMPARE_PLANTS`` plants: one column per
+    plant plus a metric matrix aligned with the plant order. Names and NCBI
+    taxonomy IDs resolve through the alias table, then every column is read
+    from the plant's precomputed dossier row.
+    """
+    identifiers = [ident.strip() for ident in identifiers if ident.strip()]
+    identifiers = identifiers[:MAX_COMPARE_PLANTS]
+    matches = match_names(identifiers)
+    dossiers = load_dossiers(match[0] for match in matches if match)
+
+    plants = [
+        plant_summary(
+            ident,
+            match[1] if match else ident,
+            dossiers.get(match[0]) if match else None,
+            top_compounds=TOP_COMPOUNDS,
+        )
+        for ident, match in zip(identifiers, matches)
+    ]
+
+    matrix = [
+        {
+            "layer": layer,
+            "metric": field,
+            "values": [plant[layer][field] if plant[layer] else None for plant in plants],
+        }
+        for layer, _, fields in OMICS_LAYERS
+        for field in fields
+    ]
+    return {"plants": plants, "matrix": matrix}
@@ -0,0 +1,296 @@
+import sys
+from collections import defaultdict
+from typing import Dict, NamedTuple
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from basic.models import med_basic
+from classification.models import med_class
+from phytochem.models import med_phytochem
+
+from ..models import PlantAlias, PlantDossier
+from .omics import OMICS_LAYERS
+from .versioning import VersionedIndex
+
+
+# Hand-written dossier pages that used to live at /<name>.html, and the
+# canonical slug of the curated plant each now redirects to.
+LEGACY_DOSSIERS = {
+    "aloevera": "aloevera",
+    "amla": "amla",
+    "ashwagandha": "ashwangandha",
+    "babool": "babool",
+    "bhringraj": "eclipta-abla",
+    "cinnamon": "cinnamon",
+    "clove": "clove",
+    "eucalyptus": "eucalyptus",
+    "ginger": "ginger",
+    "lavender": "lavender",
+    "neem": "neem",
+    "peppermint": "peppermint",
+    "tulsi": "tulsi",
+}
+# Hand-written pages for plants with no curated records yet, still served
+# from their templates at /<name>.html.
+LEGACY_PAGES = ["cumin", "curry", "mehndi", "turmeric"]
+
+BASIC_SECTIONS = [
+    ("Description", "Description"),
+    ("Medicinal value", "Medicinal_Value"),
+    ("Chemical properties", "Chemical_Properties"),
+    ("Morphological features", "Morphological_Features"),
+    ("Growing conditions", "Weather_Conditions_Required_to_Grow"),
+    ("Worldwide regions", "Worldwide_regions_Support_their_Growth"),
+]
+COMPOUND_FIELDS = [
+    "Phytochemicals",
+    "Plant_Part",
+    "Activity_Count",
+    "Formula",
+    "Molecular_Mass",
+    "Structure",
+]
+TAXONOMY_FIELDS = ["NCBI_Taxonomy_ID", "Order", "Family", "Genus", "Species", "NCBI_link"]
+
+# (payload key, model, stored fields) for the one-row-per-plant datasets.
+DOSSIER_DATASETS = [
+    ("classification", med_class, TAXONOMY_FIELDS),
+    (
+        "basic",
+        med_basic,
+        ["Parts_Used", *(field for _, field in BASIC_SECTIONS), "References"],
+    ),
+    *((layer, model, [*fields, "NCBI_link"]) for layer, model, fields in OMICS_LAYERS),
+]
+
+# Keeps every IN list below SQLite's bound-parameter limit.
+IN_CHUNK_SIZE = 500
+
+
+class SlugIndex(NamedTuple):
+    # Every usable slug, canonical or alias, to the plant's scientific key.
+    keys: Dict[str, str]
+    # One canonical slug per scientific key.
+    canonical: Dict[str, str]
+
+
+def build_slug_index() -> SlugIndex:
+    """
+    Slugs come from the plant's display label, falling back to its
+    scientific name when two plants share a label ("Bhringaraj"). Other
+    common and scientific names become alias slugs that redirect.
+    """
+    aliases = defaultdict(set)
+    labels = {}
+    rows = PlantAlias.objects.exclude(kind=PlantAlias.TAXONOMY_ID).values_list(
+        "alias", "scientific_key", "plant_label"
+    )
+    for alias, scientific_key, label in rows.iterator():
+        scientific_key = sys.intern(scientific_key)
+        aliases[scientific_key].add(alias)
+        labels.setdefault(scientific_key, label)
+
+    claims = defaultdict(set)
+    for scientific_key, label in labels.items():
+        claims[slugify(label)].add(scientific_key)
+
+    canonical = {}
+    for scientific_key in sorted(labels):
+        slug = slugify(labels[scientific_key])
+        if not slug or len(claims[slug]) > 1:
+            slug = slugify(scientific_key)
+        canonical[scientific_key] = slug
+
+    keys = {slug: scientific_key for scientific_key, slug in canonical.items()}
+    for scientific_key in sorted(aliases):
+        for alias in sorted(aliases[scientific_key]):
+            keys.setdefault(slugify(alias), scientific_key)
+    return SlugIndex(keys, canonical)
+
+
+SLUG_INDEX = VersionedIndex(build_slug_index)
+
+
+def resolve_slug(slug: str):
+    """
+    ``(scientific_key, canonical_slug)`` for a dossier slug, or
+    ``(None, None)`` when no curated plant uses it.
+    """
+    index = SLUG_INDEX.get()
+    scientific_key = index.keys.get(slug)
+    if scientific_key is None:
+        return None, None
+    return scientific_key, index.canonical[scientific_key]
+
+
+def chunked(items, size=IN_CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+@transaction.atomic
+def rebuild_plant_dossiers():
+    """
+    Rebuild ``PlantDossier`` from the alias table and the six datasets: one
+    query per dataset, each row routed to its plant through the stored
+    scientific-name variants, so rows naming the same binomial with or
+    without an authority fill one dossier. Returns the number of dossiers
+    written.
+    """
+    slugs = build_slug_index().canonical
+    variants = defaultdict(set)
+    common_names = defaultdict(set)
+    labels = {}
+    rows = PlantAlias.objects.values_list(
+        "alias", "kind", "scientific_key", "scientific_name", "plant_label"
+    )
+    for alias, kind, scientific_key, scientific_name, label in rows.iterator():
+        variants[scientific_key].add(scientific_name)
+        labels.setdefault(scientific_key, label)
+        if kind == PlantAlias.COMMON:
+            common_names[scientific_key].add(alias)
+    owners = {
+        name: scientific_key
+        for scientific_key, names in variants.items()
+        for name in names
+    }
+
+    datasets = defaultdict(dict)
+    plant_names = {}
+    for dataset, model, fields in DOSSIER_DATASETS:
+        queryset = model.objects.order_by("id").values(
+            "Plant_Name", "Scientific_Name", *fields
+        )
+        for row in queryset.iterator():
+            scientific_key = owners.get(row["Scientific_Name"])
+            if scientific_key is None or dataset in datasets[scientific_key]:
+                continue
+            datasets[scientific_key][dataset] = row
+            plant_names.setdefault(scientific_key, row["Plant_Name"] or "")
+
+    compounds = defaultdict(list)
+    seen = defaultdict(set)
+    phyto_rows = (
+        med_phytochem.objects.order_by("-Activity_Count", "Phytochemicals", "id")
+        .values("Plant_Name", "Scientific_Name", *COMPOUND_FIELDS, "References")
+    )
+    for row in phyto_rows.iterator():
+        scientific_key = owners.get(row["Scientific_Name"])
+        name = (row["Phytochemicals"] or "").strip()
+        if scientific_key is None or not name or name.lower() in seen[scientific_key]:
+            continue
+        seen[scientific_key].add(name.lower())
+        compounds[scientific_key].append(
+            {field: row[field] for field in (*COMPOUND_FIELDS, "References")}
+        )
+        plant_names.setdefault(scientific_key, row["Plant_Name"] or "")
+
+    dossiers = []
+    for scientific_key in sorted(slugs):
+        found = datasets[scientific_key]
+        named = found.get("classification") or found.get("basic")
+        scientific_name = (
+            named["Scientific_Name"] if named else sorted(variants[scientific_key])[0]
+        ).strip()
+        label = labels[scientific_key] or scientific_name
+        payload = {
+            "label": label,
+            "plant_name": plant_names.get(scientific_key, ""),
+            "scientific_name": scientific_name,
+            "scientific_names": sorted(variants[scientific_key]),
+            "common_names": sorted(common_names[scientific_key]),
+            "compounds": compounds[scientific_key],
+        }
+        for dataset, _, fields in DOSSIER_DATASETS:
+            row = found.get(dataset)
+            payload[dataset] = {field: row[field] for field in fields} if row else None
+        dossiers.append(
+            PlantDossier(
+                scientific_key=scientific_key,
+                slug=slugs[scientific_key],
+                label=label,
+                scientific_name=scientific_name,
+                payload=payload,
+            )
+        )
+
+    PlantDossier.objects.all().delete()
+    PlantDossier.objects.bulk_create(dossiers, batch_size=500)
+    return len(dossiers)
+
+
+def load_dossiers(scientific_keys) -> Dict[str, dict]:
+    """
+    Dossier payloads by scientific key, one ``IN`` query per chunk.
+    """
+    payloads = {}
+    for chunk in chunked(set(scientific_keys)):
+        rows = PlantDossier.objects.filter(scientific_key__in=chunk).values_list(
+            "scientific_key", "payload"
+        )
+        payloads.update(rows)
+    return payloads
+
+
+def page_context(payload: dict) -> dict:
+    """
+    Dossier payload plus the text sections and omics tables the page lists.
+    """
+    basic = payload["basic"]
+    omics = []
+    for layer, _, fields in OMICS_LAYERS:
+        row = payload[layer]
+        if row:
+            omics.append(
+                {
+                    "layer": layer,
+                    "metrics": [(field, row[field]) for field in fields],
+                    "link": row["NCBI_link"],
+                }
+            )
+    return {
+        **payload,
+        "sections": [
+            (title, basic[field])
+            for title, field in BASIC_SECTIONS
+            if basic and (basic[field] or "").strip()
+        ],
+        "omics": omics,
+    }
+
+
+def plant_summary(query: str, label: str, payload, top_compounds: int) -> dict:
+    """
+    Compare/resolve column for one plant, built from its dossier payload
+    (``None`` when the identifier did not match a curated plant).
+    """
+    payload = payload or {}
+    classification = payload.get("classification")
+    plant = {
+        "query": query,
+        "matched": bool(payload),
+        "label": label,
+        "plant_name": payload.get("plant_name", ""),
+        "scientific_name": payload.get("scientific_name", ""),
+        "taxonomy": (
+            {field: classification[field] for field in TAXONOMY_FIELDS}
+            if classification
+            else None
+        ),
+        "top_compounds": [
+            {
+                "name": compound["Phytochemicals"].strip(),
+                "activity_count": compound["Activity_Count"],
+                "plant_part": compound["Plant_Part"],
+            }
+            for compound in payload.get("compounds", [])[:top_compounds]
+        ],
+    }
+    for layer, _, fields in OMICS_LAYERS:
+        layer_row = payload.get(layer)
+        plant[layer] = (
+            {field: layer_row[field] for field in fields} if layer_row else None
+        )
+    return plant
@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+from requests.exceptions import RequestException
+
+from ..models import EncyclopediaSummary, PlantAlias
+from .dossier import chunked
+
+logger = logging.getLogger("pages.enrichment")
+
+# Plant Bot questions that found no stored summary, one JSON line each.
+# Serving workers cannot write to the read-only database, so they append
+# here and ``manage.py enrich`` picks the most frequent ones up.
+MISS_LOG = getattr(settings, "PLANTBOT_MISS_LOG", None)
+
+# When stored topics are fetched again.
+REFRESH_FOUND = timedelta(days=getattr(settings, "ENCYCLOPEDIA_REFRESH_DAYS", 30))
+REFRESH_MISSING = timedelta(days=getattr(settings, "ENCYCLOPEDIA_MISSING_REFRESH_DAYS", 7))
+RETRY_FAILED = timedelta(minutes=15)
+RETRY_FAILED_MAX = timedelta(days=1)
+
+Fetch = Callable[[str], Optional[Tuple[str, str]]]
+
+
+class StoredSummary(NamedTuple):
+    found: bool
+    summary: str
+    url: str
+
+
+def stored_summary(topic: str) -> Optional[StoredSummary]:
+    """
+    What the last enrichment run learnt about ``topic``: a summary, or that
+    there is none. None when the topic was never fetched successfully.
+    """
+    row = (
+        EncyclopediaSummary.objects.filter(topic=topic)
+        .exclude(status=EncyclopediaSummary.FAILED)
+        .values_list("status", "summary", "url")
+        .first()
+    )
+    if row is None:
+        return None
+    status, summary, url = row
+    return StoredSummary(status == EncyclopediaSummary.FOUND, summary, url or None)
+
+
+def record_miss(topic: str, question: str):
+    if not MISS_LOG:
+        return
+    line = json.dumps({"topic": topic, "question": question}) + "\n"
+    try:
+        Path(MISS_LOG).parent.mkdir(parents=True, exist_ok=True)
+        # One write of one short line to a file opened for appending, so
+        # lines from concurrent workers do not interleave.
+        with open(MISS_LOG, "a", encoding="utf-8") as handle:
+            handle.write(line)
+    except OSError:
+        logger.warning("Could not log a Plant Bot miss to %s", MISS_LOG, exc_info=True)
+
+
+def frequent_misses(limit: int) -> Dict[str, str]:
+    """
+    The ``limit`` most frequent missed topics since the last call, mapped
+    to a question that asked for them, most frequent first. The log is
+    rotated before it is read, so every miss is counted once; topics below
+    the cut are dropped and come back if they keep being asked.
+    """
+    if not MISS_LOG:
+        return {}
+    log = Path(MISS_LOG)
+    pending = log.with_name(log.name + ".pending")
+    # A pending file left by an interrupted run is read first; the live
+    # log then waits for the next run.
+    if log.exists() and not pending.exists():
+        os.replace(log, pending)
+    if not pending.exists():
+        return {}
+
+    counts = Counter()
+    questions = {}
+    with open(pending, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            counts[entry["topic"]] += 1
+            questions.setdefault(entry["topic"], entry["question"])
+    pending.unlink()
+    return {topic: questions[topic] for topic, _ in counts.most_common(limit)}
+
+
+def alias_topics() -> Dict[str, str]:
+    """
+    Every name alias (not taxonomy IDs), mapped to the scientific name,
+    which finds the article more reliably than a common name.
+    """
+    rows = (
+        PlantAlias.objects.exclude(kind=PlantAlias.TAXONOMY_ID)
+        .order_by("alias")
+        .values_list("alias", "scientific_name")
+    )
+    return {alias: scientific_name for alias, scientific_name in rows}
+
+
+def due_topics(candidates: Dict[str, str], now, limit: int) -> List[Tuple[str, str]]:
+    """
+    ``(topic, query)`` pairs to fetch now, at most ``limit``: candidates
+    never fetched or due for a refresh, in the order given, then any other
+    stored topic that is due, oldest first.
+    """
+    refresh = {}
+    for chunk in chunked(candidates):
+        refresh.update(
+            EncyclopediaSummary.objects.filter(topic__in=chunk).values_list("topic", "refresh_after")
+        )
+    due = [
+        (topic, query)
+        for topic, query in candidates.items()
+        if topic not in refresh or refresh[topic] <= now
+    ]
+    if len(due) < limit:
+        stale = (
+            EncyclopediaSummary.objects.filter(refresh_after__lte=now)
+            .order_by("refresh_after")
+            .values_list("topic", "query")
+        )
+        due.extend(row for row in stale.iterator() if row[0] not in candidates)
+    return due[:limit]
+
+
+def fetch_with_retries(fetch: Fetch, query: str, retries: int, backoff: float):
+    """
+    ``(result, error)`` for ``query``; transient errors are retried
+    ``retries`` times, waiting ``backoff`` seconds and doubling.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return fetch(query), None
+        except RequestException as exc:
+            if attempt == retries:
+                return None, exc
+            time.sleep(backoff * 2**attempt)
+
+
+def store_result(topic: str, query: str, result, error, now) -> str:
+    existing = EncyclopediaSummary.objects.filter(topic=topic).first()
+    row = existing or EncyclopediaSummary(topic=topic)
+    row.query = query
+    if error is not None:
+        row.attempts += 1
+        row.refresh_after = now + min(RETRY_FAILED * 2 ** (row.attempts - 1), RETRY_FAILED_MAX)
+        if existing is None or existing.status == EncyclopediaSummary.FAILED:
+            # A summary fetched earlier stays served until a refresh works.
+            row.status = EncyclopediaSummary.FAILED
+            row.fetched_at = now
+    elif result:
+        row.status = EncyclopediaSummary.FOUND
+        row.summary, row.url = result[0], result[1] or ""
+        row.attempts = 0
+        row.fetched_at = now
+        row.refresh_after = now + REFRESH_FOUND
+    else:
+        row.status = EncyclopediaSummary.MISSING
+        row.summary, row.url = "", ""
+        row.attempts = 0
+        row.fetched_at = now
+        row.refresh_after = now + REFRESH_MISSING
+    row.save()
+    return EncyclopediaSummary.FAILED if error is not None else row.status
+
+
+def run_enrichment(
+    fetch: Fetch,
+    workers: int = 4,
+    limit: int = 500,
+    top_misses: int = 200,
+    retries: int = 2,
+    backoff: float = 1.0,
+) -> Dict[str, int]:
+    """
+    One pass of the enrichment job: fetch summaries for the most frequent
+    missed questions and every alias that are new or due, with at most
+    ``workers`` requests in flight, and store them. Returns the number of
+    topics per outcome.
+    """
+    now = timezone.now()
+    candidates = frequent_misses(top_misses)
+    for topic, query in alias_topics().items():
+        candidates.setdefault(topic, query)
+    due = due_topics(candidates, now, limit)
+
+    outcomes = Counter()
+    if not due:
+        return outcomes
+    # Fetches run in the pool; all database writes stay on this thread.
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="enrich") as pool:
+        futures = {
+            pool.submit(fetch_with_retries, fetch, query, retries, backoff): (topic, query)
+            for topic, query in due
+        }
+        for future in as_completed(futures):
+            topic, query = futures[future]
+            result, error = future.result()
+            if error is not None:
+                logger.warning("Fetching a summary for %r failed: %s", topic, error)
+            outcomes[store_result(topic, query, result, error, now)] += 1
+    return outcomes
@@ -0,0 +1,243 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple
+
+from django.db import transaction
+
+from basic.models import med_basic
+from classification.models import med_class
+from geno.models import med_geno
+from phytochem.models import med_phytochem
+from proteom.models import med_proteom
+from transcriptom.models import med_transcriptom
+
+from ..models import FacetBitmap, PlantDossier
+from .versioning import VersionedIndex
+
+
+# Search page datasets, by the name their views pass as ``facet_dataset``.
+FACET_DATASETS = {
+    "basic": med_basic,
+    "classification": med_class,
+    "genome": med_geno,
+    "proteome": med_proteom,
+    "transcript": med_transcriptom,
+    "phyto": med_phytochem,
+}
+
+# (query-string key, heading) in display order.
+FACETS = [
+    ("part", "Plant part"),
+    ("family", "Family"),
+    ("region", "Growth region"),
+    ("evidence", "Omics evidence"),
+]
+FACET_KEYS = [key for key, _ in FACETS]
+
+# Free-text parts and regions are mapped onto a small vocabulary; a text can
+# carry several values ("Leaf Essent. Oil" is both Leaf and Essential oil).
+PART_TERMS = [
+    ("Leaf", r"\b(leaf|leaves|foliage)"),
+    ("Root", r"\broot"),
+    ("Rhizome", r"\brhizome"),
+    ("Bark", r"\bbark"),
+    ("Stem", r"\b(stem|stalk|twig)"),
+    ("Shoot", r"\bshoot"),
+    ("Flower", r"\b(flower|blossom|petal|inflorescence)"),
+    ("Fruit", r"\b(fruit|berr(y|ies)|pod)"),
+    ("Seed", r"\bseed"),
+    ("Bulb", r"\bbulb"),
+    ("Tuber", r"\btuber"),
+    ("Resin, gum or latex", r"\b(resin|gum|latex|sap)\b"),
+    ("Essential oil", r"\bessent"),
+    ("Whole plant", r"^\s*plant\s*$|\b(whole plant|aerial part|all parts)"),
+]
+REGION_TERMS = [
+    ("Africa", r"\b(africa|madagascar)"),
+    ("Europe", r"\beurop"),
+    ("Mediterranean", r"\bmediterranean"),
+    ("Middle East", r"\b(middle east|arabia|iran|persia|turkey|yemen|oman|levant|western asia)"),
+    ("South Asia", r"\b(india|indian subcontinent|sri lanka|nepal|pakistan|bangladesh|himalaya)"),
+    ("East Asia", r"\b(china|japan|korea|taiwan|mongolia|siberia|east(ern)? asia)"),
+    (
+        "Southeast Asia",
+        r"\b(south-?east(ern)? asia|indonesia|malaysia|thailand|vietnam|philippines|myanmar|burma)",
+    ),
+    ("North America", r"\b(north america|united states|canada|mexico|california)"),
+    (
+        "Central and South America",
+        r"\b(south america|central america|tropical america|brazil|peru|andes|amazon|caribbean|west indies)",
+    ),
+    ("Australia and Oceania", r"\b(australia|new zealand|oceania|pacific islands|polynesia)"),
+]
+EVIDENCE_LAYERS = [
+    ("genome", "Genome"),
+    ("proteome", "Proteome"),
+    ("transcript", "Transcriptome"),
+]
+
+_PART_PATTERNS = [(value, re.compile(pattern, re.I)) for value, pattern in PART_TERMS]
+_REGION_PATTERNS = [(value, re.compile(pattern, re.I)) for value, pattern in REGION_TERMS]
+
+# Values listed per facet; selected values are always listed.
+MAX_FACET_VALUES = 8
+
+
+def _terms(patterns, text: str) -> set:
+    if not text:
+        return set()
+    return {value for value, pattern in patterns if pattern.search(text)}
+
+
+def to_bitmap(ids: Iterable[int]) -> int:
+    """
+    Bitmap with bit ``id`` set for every id.
+    """
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for row_id in ids:
+        buffer[row_id >> 3] |= 1 << (row_id & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def bitmap_ids(bits: int) -> List[int]:
+    ids = []
+    for offset, byte in enumerate(bits.to_bytes((bits.bit_length() + 7) // 8, "little")):
+        while byte:
+            low = byte & -byte
+            ids.append(offset * 8 + low.bit_length() - 1)
+            byte ^= low
+    return ids
+
+
+def _plant_facets(payload: dict) -> Dict[str, set]:
+    basic = payload.get("basic") or {}
+    classification = payload.get("classification") or {}
+    parts = _terms(_PART_PATTERNS, basic.get("Parts_Used"))
+    for compound in payload.get("compounds", []):
+        parts |= _terms(_PART_PATTERNS, compound.get("Plant_Part"))
+    family = (classification.get("Family") or "").strip()
+    return {
+        "part": parts,
+        "family": {family} if family else set(),
+        "region": _terms(_REGION_PATTERNS, basic.get("Worldwide_regions_Support_their_Growth")),
+        "evidence": {label for layer, label in EVIDENCE_LAYERS if payload.get(layer)},
+    }
+
+
+@transaction.atomic
+def rebuild_facets():
+    """
+    Rebuild ``FacetBitmap`` from the plant dossiers: every dataset row
+    inherits its plant's facet values, except that compound rows take their
+    plant part from their own ``Plant_Part``. Returns the number of bitmaps
+    written.
+    """
+    owners = {}
+    plant_facets = {}
+    for scientific_key, payload in PlantDossier.objects.values_list(
+        "scientific_key", "payload"
+    ).iterator():
+        plant_facets[scientific_key] = _plant_facets(payload)
+        for name in payload["scientific_names"]:
+            owners[name] = scientific_key
+
+    bitmaps = []
+    for dataset, model in FACET_DATASETS.items():
+        members = defaultdict(list)
+        fields = ["id", "Scientific_Name"]
+        if model is med_phytochem:
+            fields.append("Plant_Part")
+        for row in model.objects.values_list(*fields).iterator():
+            scientific_key = owners.get(row[1])
+            if scientific_key is None:
+                continue
+            facets = plant_facets[scientific_key]
+            if model is med_phytochem:
+                facets = {**facets, "part": _terms(_PART_PATTERNS, row[2])}
+            for facet, values in facets.items():
+                for value in values:
+                    members[(facet, value)].append(row[0])
+
+        for (facet, value), ids in members.items():
+            bits = to_bitmap(ids)
+            bitmaps.append(
+                FacetBitmap(
+                    dataset=dataset,
+                    facet=facet,
+                    value=value,
+                    bits=bits.to_bytes((bits.bit_length() + 7) // 8, "little"),
+                    row_count=len(ids),
+                )
+            )
+
+    FacetBitmap.objects.all().delete()
+    FacetBitmap.objects.bulk_create(bitmaps, batch_size=500)
+    return len(bitmaps)
+
+
+class FacetValue(NamedTuple):
+    value: str
+    bits: int
+
+
+def load_facet_index() -> Dict[str, Dict[str, List[FacetValue]]]:
+    """
+    ``dataset -> facet -> values`` with bitmaps as Python ints, most common
+    value first.
+    """
+    index = defaultdict(lambda: defaultdict(list))
+    rows = FacetBitmap.objects.values_list("dataset", "facet", "value", "bits")
+    for dataset, facet, value, bits in rows.iterator():
+        index[dataset][facet].append(FacetValue(value, int.from_bytes(bits, "little")))
+    return {dataset: dict(facets) for dataset, facets in index.items()}
+
+
+FACET_INDEX = VersionedIndex(load_facet_index)
+
+
+def selected_facets(params) -> Dict[str, str]:
+    return {key: params[key].strip() for key in FACET_KEYS if params.get(key, "").strip()}
+
+
+def narrow(dataset: str, bits: int, selection: Dict[str, str]) -> int:
+    """
+    Intersect a result bitmap with the bitmap of every selected value.
+    """
+    facets = FACET_INDEX.get().get(dataset, {})
+    for facet, selected in selection.items():
+        value_bits = next(
+            (value.bits for value in facets.get(facet, []) if value.value == selected), 0
+        )
+        bits &= value_bits
+    return bits
+
+
+def facet_counts(dataset: str, bits: int, selection: Dict[str, str]) -> List[dict]:
+    """
+    Result count for each facet value within the current results, by
+    bitmap intersection. Values without results are left out.
+    """
+    facets = FACET_INDEX.get().get(dataset, {})
+    groups = []
+    for key, label in FACETS:
+        counted = [
+            (value.value, (value.bits & bits).bit_count())
+            for value in facets.get(key, [])
+        ]
+        counted.sort(key=lambda item: (-item[1], item[0]))
+        values = [
+            {"value": value, "count": count, "selected": selection.get(key) == value}
+            for value, count in counted
+            if count or selection.get(key) == value
+        ]
+        shown = [
+            value
+            for position, value in enumerate(values)
+            if position < MAX_FACET_VALUES or value["selected"]
+        ]
+        if shown:
+            groups.append({"key": key, "label": label, "values": shown})
+    return groups
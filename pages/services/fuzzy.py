@@ -0,0 +1,152 @@
+import sys
+from array import array
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+from phytochem.models import med_phytochem
+
+from ..models import PlantAlias
+from .names import normalize_name
+from .versioning import VersionedIndex
+
+
+PLANT = "plant"
+COMPOUND = "compound"
+
+# Candidates kept after trigram scoring, before the edit-distance re-rank.
+CANDIDATE_POOL = 50
+MIN_TRIGRAM_SIMILARITY = 0.3
+MAX_EDIT_DISTANCE = 3
+# Words of multi-word names shorter than this are not indexed on their own.
+MIN_WORD_LENGTH = 4
+
+
+class Term(NamedTuple):
+    key: str
+    kind: str
+    label: str
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_levenshtein(a: str, b: str, limit: int) -> int:
+    """
+    Edit distance between ``a`` and ``b``, or ``limit + 1`` as soon as it
+    is known to exceed ``limit``.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b),
+                )
+            )
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class TrigramIndex:
+    """
+    Trigram postings over plant names, aliases and phytochemical names.
+    Lookups score only terms sharing a trigram with the query, then
+    re-rank the best of those by bounded edit distance.
+
+    Terms are stored as columns and postings as ``array`` of term ids, so
+    the index is a handful of large objects rather than one per term and
+    posting, which keeps it compact and its pages shared between forked
+    workers.
+    """
+
+    __slots__ = ("keys", "kinds", "labels", "term_trigrams", "postings")
+
+    def __init__(self, terms: List[Term]):
+        self.keys = [term.key for term in terms]
+        self.kinds = [term.kind for term in terms]
+        self.labels = [sys.intern(term.label) for term in terms]
+        self.term_trigrams = array("H", (len(trigrams(key)) for key in self.keys))
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for term_id, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                postings[gram].append(term_id)
+        self.postings = {gram: array("I", ids) for gram, ids in postings.items()}
+
+    def suggest(self, query: str, limit: int = 5, kinds=(PLANT, COMPOUND)):
+        key = normalize_name(query)
+        if len(key) < 3:
+            return []
+        query_grams = trigrams(key)
+
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for term_id in self.postings.get(gram, ()):
+                shared[term_id] += 1
+
+        scored = []
+        for term_id, hits in shared.items():
+            if self.kinds[term_id] not in kinds:
+                continue
+            similarity = 2 * hits / (len(query_grams) + self.term_trigrams[term_id])
+            if similarity >= MIN_TRIGRAM_SIMILARITY:
+                scored.append((similarity, term_id))
+        scored.sort(reverse=True)
+
+        max_distance = min(MAX_EDIT_DISTANCE, 1 + len(key) // 4)
+        ranked = []
+        seen_labels = set()
+        for similarity, term_id in scored[:CANDIDATE_POOL]:
+            label = self.labels[term_id]
+            distance = bounded_levenshtein(key, self.keys[term_id], max_distance)
+            if distance > max_distance or label.lower() in seen_labels:
+                continue
+            seen_labels.add(label.lower())
+            ranked.append((distance, -similarity, label, self.kinds[term_id]))
+        ranked.sort(key=lambda item: (item[0], item[1], item[2]))
+        return [
+            {"label": label, "kind": kind, "distance": distance}
+            for distance, _, label, kind in ranked[:limit]
+        ]
+
+
+def _add_term(terms, key, kind, label):
+    terms.setdefault((key, kind), label)
+    # Words of multi-word names too, so "tumeric" finds "Wild turmeric".
+    words = key.split()
+    if len(words) > 1:
+        for word in words:
+            if len(word) >= MIN_WORD_LENGTH:
+                terms.setdefault((word, kind, label), label)
+
+
+def build_trigram_index() -> TrigramIndex:
+    terms = {}
+    for alias, label in PlantAlias.objects.values_list("alias", "plant_label").iterator():
+        _add_term(terms, alias, PLANT, label or alias)
+    compounds = med_phytochem.objects.values_list("Phytochemicals", flat=True).distinct()
+    for compound in compounds.iterator():
+        key = normalize_name(compound)
+        if key:
+            _add_term(terms, key, COMPOUND, compound.strip())
+    return TrigramIndex(
+        [Term(entry[0], entry[1], label) for entry, label in terms.items()]
+    )
+
+
+TRIGRAM_INDEX = VersionedIndex(build_trigram_index)
+
+
+def did_you_mean(query: str, limit: int = 5, kinds=(PLANT,)):
+    """
+    Ranked spelling suggestions for a query that returned nothing.
+    """
+    return TRIGRAM_INDEX.get().suggest(query, limit=limit, kinds=kinds)
@@ -0,0 +1,261 @@
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import requests
+from requests.exceptions import RequestException
+
+from ..models import PlantDossier
+
+
+# Relative weight of each request kind in the default mix.
+DEFAULT_MIX = {"search": 50, "dossier": 25, "suggest": 15, "plantbot": 10}
+SEARCH_PAGES = [
+    "/basic.html",
+    "/classification.html",
+    "/genomes.html",
+    "/proteome.html",
+    "/transcriptom.html",
+    "/metabolites.html",
+]
+# Used when the local database has no dossiers to sample plant names from.
+FALLBACK_PLANTS = [
+    ("tulsi", "Tulsi"),
+    ("neem", "Neem"),
+    ("ginger", "Ginger"),
+    ("amla", "Amla"),
+    ("clove", "Clove"),
+]
+# Share of Plant Bot questions about plants that are not curated, which
+# take the encyclopedic fallback.
+UNCURATED_SHARE = 0.2
+REQUEST_TIMEOUT = 30
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an ascending list.
+    """
+    if not sorted_values:
+        return 0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    unknown = frozenset()
+    failures = None
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        if self.failures is not None and next(self.failures, None) is not None:
+            self.send_error(503)
+            return
+        url = urlsplit(self.path)
+        if url.path == "/w/api.php":
+            topic = parse_qs(url.query).get("search", [""])[0]
+            if topic.lower() in self.unknown:
+                body = [topic, [], [], []]
+            else:
+                body = [topic, [topic.title()], [""], [f"https://example.org/wiki/{topic}"]]
+        elif url.path.startswith("/api/rest_v1/page/summary/"):
+            title = unquote(url.path.rsplit("/", 1)[-1]).replace("_", " ")
+            body = {
+                "extract": f"{title} is a plant described by the load-test stub.",
+                "content_urls": {"desktop": {"page": f"https://example.org/wiki/{title}"}},
+            }
+        else:
+            self.send_error(404)
+            return
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WikipediaStub:
+    """
+    Local stand-in for the two Wikipedia endpoints the Plant Bot fallback
+    calls, answering after ``latency`` seconds. Start the instance under
+    test with ``MPMDB_WIKI_URL`` set to ``url``. Searches for ``unknown``
+    topics find nothing, and the first ``fail_first`` requests get a 503.
+    """
+
+    def __init__(self, port: int = 0, latency: float = 0.15, unknown=(), fail_first: int = 0):
+        handler = type(
+            "StubHandler",
+            (_StubHandler,),
+            {
+                "latency": latency,
+                "unknown": frozenset(topic.lower() for topic in unknown),
+                # Shared by the server's threads; next() on it is atomic.
+                "failures": iter(range(fail_first)),
+            },
+        )
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class Sample(NamedTuple):
+    endpoint: str
+    latency_ms: float
+    ok: bool
+
+
+class RequestMix:
+    """
+    Weighted, seeded stream of requests: search pages, dossiers, search-box
+    completions and Plant Bot questions about plants sampled from the
+    local dossier table.
+    """
+
+    def __init__(self, weights: Dict[str, int], plants: List[Tuple[str, str]]):
+        self.kinds = [kind for kind, weight in weights.items() if weight > 0]
+        self.weights = [weights[kind] for kind in self.kinds]
+        self.plants = plants
+
+    @classmethod
+    def from_database(cls, weights: Dict[str, int], limit: int = 500):
+        plants = list(PlantDossier.objects.values_list("slug", "label")[:limit])
+        return cls(weights, plants or FALLBACK_PLANTS)
+
+    def next(self, rng: random.Random):
+        """
+        ``(endpoint, method, path, payload)`` for one request.
+        """
+        kind = rng.choices(self.kinds, self.weights)[0]
+        slug, label = rng.choice(self.plants)
+        if kind == "search":
+            page = rng.choice(SEARCH_PAGES)
+            return f"search {page}", "GET", page, {"q": label}
+        if kind == "dossier":
+            return "dossier", "GET", f"/plant/{slug}/", None
+        if kind == "suggest":
+            return "suggest", "GET", "/api/suggest/", {"q": label[: rng.randint(1, 4)]}
+        if rng.random() < UNCURATED_SHARE:
+            question = f"Tell me about {label} hybrid {rng.randint(1, 10**6)}"
+        else:
+            question = f"Summarize {label}"
+        return "plantbot", "POST", "/api/plantbot/", {"question": question}
+
+
+def _worker(base_url, mix, rng, deadline, samples, lock):
+    session = requests.Session()
+    csrf_token = None
+    local = []
+    while time.monotonic() < deadline:
+        endpoint, method, path, payload = mix.next(rng)
+        started = time.perf_counter()
+        try:
+            if method == "GET":
+                response = session.get(base_url + path, params=payload, timeout=REQUEST_TIMEOUT)
+            else:
+                if csrf_token is None:
+                    session.get(f"{base_url}/plantbot.html", timeout=REQUEST_TIMEOUT)
+                    csrf_token = session.cookies.get("csrftoken", "")
+                response = session.post(
+                    base_url + path,
+                    json=payload,
+                    headers={"X-CSRFToken": csrf_token, "Referer": f"{base_url}/plantbot.html"},
+                    timeout=REQUEST_TIMEOUT,
+                )
+            ok = response.status_code < 400
+        except RequestException:
+            ok = False
+        local.append(Sample(endpoint, (time.perf_counter() - started) * 1000, ok))
+    with lock:
+        samples.extend(local)
+
+
+def summarize(samples: List[Sample], elapsed: float) -> dict:
+    by_endpoint = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample.endpoint].append(sample)
+
+    def stats(group):
+        latencies = sorted(sample.latency_ms for sample in group)
+        errors = sum(not sample.ok for sample in group)
+        return {
+            "requests": len(group),
+            "throughput_rps": round(len(group) / elapsed, 2),
+            "errors": errors,
+            "error_rate": round(errors / len(group), 4) if group else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+        }
+
+    return {
+        **stats(samples),
+        "endpoints": {endpoint: stats(group) for endpoint, group in sorted(by_endpoint.items())},
+    }
+
+
+def run_level(
+    base_url: str, mix: RequestMix, concurrency: int, duration: float, seed: int = 0
+) -> dict:
+    """
+    Drive ``base_url`` from ``concurrency`` threads for ``duration``
+    seconds and return throughput, latency percentiles and error rates,
+    overall and per endpoint.
+    """
+    samples: List[Sample] = []
+    lock = threading.Lock()
+    base_url = base_url.rstrip("/")
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(base_url, mix, random.Random(f"{seed}:{index}"), deadline, samples, lock),
+        )
+        for index in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    return {"concurrency": concurrency, "duration_s": round(elapsed, 2), **summarize(samples, elapsed)}
+
+
+def compare_runs(previous: dict, current: dict) -> List[str]:
+    """
+    One line per concurrency level present in both runs: throughput and
+    overall p95 before and after.
+    """
+    before: Dict[int, dict] = {level["concurrency"]: level for level in previous.get("levels", [])}
+    lines = []
+    for level in current["levels"]:
+        old: Optional[dict] = before.get(level["concurrency"])
+        if old is None:
+            continue
+        lines.append(
+            f"c={level['concurrency']}: "
+            f"{old['throughput_rps']} -> {level['throughput_rps']} req/s, "
+            f"p95 {old['p95_ms']} -> {level['p95_ms']} ms, "
+            f"errors {old['error_rate']:.1%} -> {level['error_rate']:.1%}"
+        )
+    return lines
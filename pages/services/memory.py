@@ -0,0 +1,154 @@
+import gc
+import json
+import os
+import random
+import resource
+import sys
+from typing import Dict, List
+from unittest import mock
+
+from django.db import connections
+from django.test import Client
+
+from .loadtest import DEFAULT_MIX, RequestMix
+from .warmup import indexes, warm_indexes
+
+
+def deep_size(obj) -> int:
+    """
+    Bytes held by ``obj`` and everything it references, counting shared
+    objects (interned strings, small ints) once.
+    """
+    seen = set()
+    pending = [obj]
+    total = 0
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            pending.extend(current)
+        elif hasattr(current, "__dict__"):
+            pending.append(vars(current))
+        if hasattr(type(current), "__slots__"):
+            pending.extend(
+                getattr(current, slot)
+                for slot in type(current).__slots__
+                if hasattr(current, slot)
+            )
+    return total
+
+
+def index_sizes() -> Dict[str, int]:
+    return {name: deep_size(index.get()) for name, index in indexes().items()}
+
+
+def memory_usage() -> Dict[str, int]:
+    """
+    Resident, proportional and private memory of this process in KiB.
+    PSS splits pages shared with other workers between them; private pages
+    are the ones forking could not share.
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as handle:
+            fields = {
+                line.split(":")[0]: int(line.split()[1])
+                for line in handle
+                if line.rstrip().endswith("kB")
+            }
+    except OSError:
+        # No /proc (macOS): only the peak resident size is available.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"rss": peak, "pss": peak, "private": peak}
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "private": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def _serve(mix: RequestMix, requests: int, seed: int):
+    client = Client()
+    rng = random.Random(seed)
+    with mock.patch("pages.services.plantbot._wiki_summary", return_value=None), mock.patch(
+        "pages.services.plantbot.record_miss"
+    ):
+        for _ in range(requests):
+            _, method, path, payload = mix.next(rng)
+            if method == "GET":
+                client.get(path, payload)
+            else:
+                client.post(path, json.dumps(payload), content_type="application/json")
+
+
+def _worker(mix, requests, seed, commands, results):
+    # Serve, run a full collection (which is what dirties shared pages
+    # through refcount and GC header writes), then report when told to, so
+    # every worker is measured while all of them are alive.
+    _serve(mix, requests, seed)
+    gc.collect()
+    os.write(results, b"R")
+    os.read(commands, 1)
+    os.write(results, json.dumps(memory_usage()).encode("utf-8") + b"\n")
+    os.read(commands, 1)
+
+
+def fork_workers(count: int, requests: int, freeze: bool, seed: int = 0) -> List[Dict[str, int]]:
+    """
+    Fork ``count`` workers from this process, as a preloading server
+    would, and return each one's memory after serving ``requests`` mixed
+    requests. With ``freeze``, the indexes built here are moved to the
+    permanent GC generation first so the workers' collections leave them
+    alone.
+    """
+    mix = RequestMix.from_database(DEFAULT_MIX)
+    warm_indexes()
+    connections.close_all()
+    gc.collect()
+    if freeze:
+        gc.freeze()
+
+    children = []
+    try:
+        for index in range(count):
+            commands_read, commands_write = os.pipe()
+            results_read, results_write = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                # Drop the parent's ends, including those of earlier workers,
+                # or a worker would wait forever for a close that never comes.
+                os.close(commands_write)
+                os.close(results_read)
+                for _, other_commands, other_results in children:
+                    os.close(other_commands)
+                    other_results.close()
+                status = 0
+                try:
+                    _worker(mix, requests, seed + index, commands_read, results_write)
+                except BaseException:
+                    status = 1
+                finally:
+                    os._exit(status)
+            os.close(commands_read)
+            os.close(results_write)
+            children.append((pid, commands_write, os.fdopen(results_read, "rb")))
+
+        for _, _, results in children:
+            if results.read(1) != b"R":
+                raise RuntimeError("A worker exited before reporting its memory.")
+        for _, commands, _ in children:
+            os.write(commands, b"M")
+        usage = [json.loads(results.readline()) for _, _, results in children]
+    finally:
+        for pid, commands, results in children:
+            os.close(commands)
+            results.close()
+            os.waitpid(pid, 0)
+        if freeze:
+            gc.unfreeze()
+    return usage
@@ -0,0 +1,350 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+
+
+# Directory shared by all workers of a host. Each process writes its own
+# mmap-backed file there and /metrics sums them; without it, values live in
+# process memory and /metrics reports only the worker that answers.
+METRICS_DIR = getattr(settings, "METRICS_DIR", None)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_HEADER = struct.Struct("<Q")
+_LENGTH = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+
+
+def _padded(size: int) -> int:
+    return size + (-size % 8)
+
+
+def _entries(buffer, used: int):
+    """
+    ``(key, value, value_offset)`` for every entry of a metrics file.
+    """
+    offset = _HEADER.size
+    while offset < used:
+        (length,) = _LENGTH.unpack_from(buffer, offset)
+        key = bytes(buffer[offset + _LENGTH.size : offset + _LENGTH.size + length]).decode("utf-8")
+        value_offset = offset + _padded(_LENGTH.size + length)
+        (value,) = _VALUE.unpack_from(buffer, value_offset)
+        yield key, value, value_offset
+        offset = value_offset + _VALUE.size
+
+
+class MmapValues:
+    """
+    Float values keyed by string in one process's memory-mapped file. The
+    file starts with the number of bytes in use, followed by
+    ``[key length][key][padding][float64]`` entries; the header is written
+    after each new entry, so readers in other processes never see a
+    half-written one.
+    """
+
+    INITIAL_SIZE = 64 * 1024
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "a+b")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self.INITIAL_SIZE:
+            self._file.truncate(self.INITIAL_SIZE)
+            size = self.INITIAL_SIZE
+        self._map = mmap.mmap(self._file.fileno(), size)
+        (self._used,) = _HEADER.unpack_from(self._map, 0)
+        if not self._used:
+            self._used = _HEADER.size
+            _HEADER.pack_into(self._map, 0, self._used)
+        self._offsets = {key: offset for key, _, offset in _entries(self._map, self._used)}
+
+    def _offset(self, key: str) -> int:
+        offset = self._offsets.get(key)
+        if offset is not None:
+            return offset
+        encoded = key.encode("utf-8")
+        value_offset = self._used + _padded(_LENGTH.size + len(encoded))
+        end = value_offset + _VALUE.size
+        if end > len(self._map):
+            size = len(self._map)
+            while size < end:
+                size *= 2
+            self._map.close()
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+        _LENGTH.pack_into(self._map, self._used, len(encoded))
+        self._map[self._used + _LENGTH.size : self._used + _LENGTH.size + len(encoded)] = encoded
+        _VALUE.pack_into(self._map, value_offset, 0.0)
+        self._used = end
+        _HEADER.pack_into(self._map, 0, self._used)
+        self._offsets[key] = value_offset
+        return value_offset
+
+    def inc(self, key: str, amount: float):
+        offset = self._offset(key)
+        (value,) = _VALUE.unpack_from(self._map, offset)
+        _VALUE.pack_into(self._map, offset, value + amount)
+
+    def set(self, key: str, value: float):
+        _VALUE.pack_into(self._map, self._offset(key), value)
+
+    @staticmethod
+    def read(path: Path) -> Iterable[Tuple[str, float]]:
+        data = path.read_bytes()
+        if len(data) < _HEADER.size:
+            return []
+        (used,) = _HEADER.unpack_from(data, 0)
+        return [(key, value) for key, value, _ in _entries(data, min(used, len(data)))]
+
+
+class MemoryValues:
+    def __init__(self):
+        self.values: Dict[str, float] = defaultdict(float)
+
+    def inc(self, key: str, amount: float):
+        self.values[key] += amount
+
+    def set(self, key: str, value: float):
+        self.values[key] = value
+
+
+class _Store:
+    """
+    This process's value store, reopened after a fork so every gunicorn
+    worker writes its own file.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._values = None
+
+    def _current(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            if METRICS_DIR:
+                Path(METRICS_DIR).mkdir(parents=True, exist_ok=True)
+                self._values = MmapValues(Path(METRICS_DIR) / f"metrics-{pid}.db")
+            else:
+                self._values = MemoryValues()
+            self._pid = pid
+        return self._values
+
+    def inc(self, key: str, amount: float = 1.0):
+        with self._lock:
+            self._current().inc(key, amount)
+
+    def set(self, key: str, value: float):
+        with self._lock:
+            self._current().set(key, value)
+
+    def snapshots(self) -> Iterable[Tuple[Optional[int], Iterable[Tuple[str, float]]]]:
+        """
+        ``(pid, values)`` per process; the pid is None for in-memory values.
+        """
+        if not METRICS_DIR:
+            with self._lock:
+                return [(None, list(self._current().values.items()))]
+        snapshots = []
+        for path in sorted(Path(METRICS_DIR).glob("metrics-*.db")):
+            pid = int(path.stem.split("-", 1)[1])
+            snapshots.append((pid, MmapValues.read(path)))
+        return snapshots
+
+
+STORE = _Store()
+
+
+def clear_metrics_files():
+    """
+    Remove the files left by a previous server run, so its workers' counts
+    are not summed into the new one's. Run before the workers start.
+    """
+    if METRICS_DIR:
+        for path in Path(METRICS_DIR).glob("metrics-*.db"):
+            path.unlink(missing_ok=True)
+
+
+REGISTRY: Dict[str, "Metric"] = {}
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._keys: Dict[tuple, str] = {}
+        REGISTRY[name] = self
+
+    def _key(self, suffix: str, labels: tuple, extra: tuple = ()) -> str:
+        cache_key = (suffix, labels, extra)
+        key = self._keys.get(cache_key)
+        if key is None:
+            pairs = list(zip(self.labelnames, labels)) + list(extra)
+            key = self._keys[cache_key] = json.dumps([self.name, suffix, pairs])
+        return key
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1.0):
+        STORE.inc(self._key("_total", labels), amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labels):
+        STORE.set(self._key("", labels), value)
+
+    def inc(self, *labels, amount: float = 1.0):
+        STORE.inc(self._key("", labels), amount)
+
+    def dec(self, *labels, amount: float = 1.0):
+        STORE.inc(self._key("", labels), -amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, value: float, *labels):
+        # Buckets are stored per bucket and made cumulative on exposition.
+        bound = self.buckets[bisect_left(self.buckets, value)]
+        STORE.inc(self._key("_bucket", labels, (("le", bound),)))
+        STORE.inc(self._key("_sum", labels), value)
+        STORE.inc(self._key("_count", labels))
+
+
+def _alive(pid: Optional[int]) -> bool:
+    if pid is None:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect() -> Dict[tuple, float]:
+    """
+    Samples summed across processes, keyed by ``(metric, suffix, labels)``.
+    Gauges of exited workers are dropped; their counters are kept.
+    """
+    totals: Dict[tuple, float] = defaultdict(float)
+    for pid, values in STORE.snapshots():
+        alive = _alive(pid)
+        for key, value in values:
+            name, suffix, pairs = json.loads(key)
+            metric = REGISTRY.get(name)
+            if metric is None or (metric.kind == "gauge" and not alive):
+                continue
+            totals[(name, suffix, tuple(tuple(pair) for pair in pairs))] += value
+    return totals
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ""
+    rendered = []
+    for label, value in pairs:
+        if label == "le":
+            value = "+Inf" if value == float("inf") else repr(float(value))
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        rendered.append(f'{label}="{escaped}"')
+    return "{" + ",".join(rendered) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def exposition() -> str:
+    """
+    All registered metrics in the Prometheus text format, plus a hit ratio
+    gauge per cache derived from the cache request counters.
+    """
+    totals = collect()
+    by_metric = defaultdict(list)
+    for (name, suffix, pairs), value in totals.items():
+        by_metric[name].append((suffix, pairs, value))
+
+    lines = []
+    for name in sorted(REGISTRY):
+        metric = REGISTRY[name]
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        samples = sorted(by_metric.get(name, []), key=lambda sample: (sample[1], sample[0]))
+        if metric.kind != "histogram":
+            for suffix, pairs, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(pairs)} {_format_value(value)}")
+            continue
+
+        series = defaultdict(dict)
+        for suffix, pairs, value in samples:
+            labels = tuple(pair for pair in pairs if pair[0] != "le")
+            bound = next((pair[1] for pair in pairs if pair[0] == "le"), None)
+            series[labels][(suffix, bound)] = value
+        for labels, values in sorted(series.items()):
+            running = 0.0
+            for bound in metric.buckets:
+                running += values.get(("_bucket", bound), 0.0)
+                lines.append(
+                    f"{name}_bucket{_format_labels(labels + (('le', bound),))} {_format_value(running)}"
+                )
+            for suffix in ("_sum", "_count"):
+                lines.append(
+                    f"{name}{suffix}{_format_labels(labels)} {_format_value(values.get((suffix, None), 0.0))}"
+                )
+
+    lookups = defaultdict(lambda: [0.0, 0.0])
+    for suffix, pairs, value in by_metric.get(CACHE_REQUESTS.name, []):
+        labels = dict(pairs)
+        lookups[labels["cache"]][labels["outcome"] == "hit"] += value
+    lines.append(f"# HELP {CACHE_HIT_RATIO} Share of cache lookups that were hits.")
+    lines.append(f"# TYPE {CACHE_HIT_RATIO} gauge")
+    for cache, (misses, hits) in sorted(lookups.items()):
+        ratio = hits / (hits + misses) if hits + misses else 0.0
+        lines.append(f'{CACHE_HIT_RATIO}{{cache="{cache}"}} {round(ratio, 4)}')
+    return "\n".join(lines) + "\n"
+
+
+REQUEST_DURATION = Histogram(
+    "mpmdb_request_duration_seconds", "Request latency by view.", ("view", "method")
+)
+REQUESTS = Counter(
+    "mpmdb_requests", "Requests by view and status class.", ("view", "method", "status")
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "mpmdb_requests_in_progress", "Requests being served by live workers."
+)
+REQUEST_QUERIES = Histogram(
+    "mpmdb_request_queries", "SQL queries per request by view.", ("view",), buckets=QUERY_BUCKETS
+)
+PLANTBOT_ANSWERS = Counter(
+    "mpmdb_plantbot_answers", "Plant Bot answers by outcome.", ("outcome",)
+)
+WIKI_FETCH_DURATION = Histogram(
+    "mpmdb_wiki_fetch_duration_seconds", "Encyclopedic fallback fetch latency.", ("outcome",)
+)
+CACHE_REQUESTS = Counter(
+    "mpmdb_cache_requests", "Cache lookups by cache and outcome.", ("cache", "outcome")
+)
+CACHE_HIT_RATIO = "mpmdb_cache_hit_ratio"
@@ -0,0 +1,62 @@
+import re
+from typing import Iterator
+
+# Alias rules shared by the Plant Bot and every ingest-time index: names are
+# split on "/", ",", ";" or "|" and normalised to lowercase alphanumerics.
+ALIAS_SPLITTER = re.compile(r"[/,;|]+")
+NAME_NORMALIZER = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(text: str) -> str:
+    if not text:
+        return ""
+    return NAME_NORMALIZER.sub(" ", text.lower()).strip()
+
+
+def split_aliases(text: str) -> Iterator[str]:
+    if not text:
+        return
+    for token in ALIAS_SPLITTER.split(text):
+        alias = token.strip()
+        if alias:
+            yield alias
+
+
+def name_keys(plant_name: str, scientific_name: str) -> Iterator[str]:
+    """
+    Yield every normalised key a dataset row can be matched on, scientific
+    name first.
+    """
+    for label in (scientific_name, plant_name):
+        for alias in split_aliases(label):
+            norm = normalize_name(alias)
+            if norm:
+                yield norm
+
+
+def display_label(plant_name: str, scientific_name: str) -> str:
+    """
+    First alias of the common name, as the Plant Bot labels a plant.
+    """
+    for alias in split_aliases(plant_name):
+        return alias
+    return (scientific_name or "").strip()
+
+
+def binomial_key(normalized: str) -> str:
+    """
+    Genus + species part of a normalised scientific name, dropping
+    authorities and infraspecific ranks ("aloe barbadensis miller").
+    """
+    tokens = normalized.split()
+    return " ".join(tokens[:2]) if len(tokens) > 2 else ""
+
+
+def plant_key(scientific_name: str) -> str:
+    """
+    Key one curated plant is stored under: the binomial of its scientific
+    name, so variants that only add an authority ("Allium cepa Linn.") or
+    an infraspecific rank fold into one plant.
+    """
+    normalized = normalize_name(scientific_name)
+    return binomial_key(normalized) or normalized
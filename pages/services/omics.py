@@ -0,0 +1,104 @@
+import math
+from itertools import product
+
+from django.db import transaction
+
+from geno.models import med_geno
+from proteom.models import med_proteom
+from transcriptom.models import med_transcriptom
+
+from ..models import OmicsCoverage, OmicsMetricSummary
+from .names import plant_key
+
+
+# (layer, model, integer count columns) in dashboard order.
+OMICS_LAYERS = [
+    ("genome", med_geno, ["Nucleotide", "Genome_Sequence", "mRNA_Sequence"]),
+    ("proteome", med_proteom, ["Protein_Seq", "Identical_Protein_Groups", "Protein"]),
+    ("transcript", med_transcriptom, ["SRA", "DNA", "RNA", "BioProject", "BioSample"]),
+]
+
+TOP_N = 10
+
+
+def _percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an ascending list.
+    """
+    if not sorted_values:
+        return 0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _metric_summary(layer, model, field):
+    values = sorted(model.objects.values_list(field, flat=True))
+    top = (
+        model.objects.order_by(f"-{field}", "Plant_Name")
+        .values("Plant_Name", "Scientific_Name", field)[:TOP_N]
+    )
+    total = sum(values)
+    return OmicsMetricSummary(
+        layer=layer,
+        metric=field,
+        total=total,
+        plants_reported=sum(1 for value in values if value),
+        mean=total / len(values) if values else 0,
+        p50=_percentile(values, 50),
+        p90=_percentile(values, 90),
+        p99=_percentile(values, 99),
+        maximum=values[-1] if values else 0,
+        top_plants=[
+            {
+                "plant_name": row["Plant_Name"],
+                "scientific_name": row["Scientific_Name"],
+                "value": row[field],
+            }
+            for row in top
+        ],
+    )
+
+
+def _coverage():
+    layers = {}
+    for layer, model, fields in OMICS_LAYERS:
+        for row in model.objects.values("Scientific_Name", *fields):
+            key = plant_key(row["Scientific_Name"])
+            if not key:
+                continue
+            flags = layers.setdefault(key, set())
+            if any(row[field] for field in fields):
+                flags.add(layer)
+
+    counts = {}
+    for flags in layers.values():
+        combo = tuple(layer in flags for layer, _, _ in OMICS_LAYERS)
+        counts[combo] = counts.get(combo, 0) + 1
+
+    return [
+        OmicsCoverage(
+            has_genome=combo[0],
+            has_proteome=combo[1],
+            has_transcript=combo[2],
+            plant_count=counts.get(combo, 0),
+        )
+        for combo in product((True, False), repeat=3)
+    ]
+
+
+@transaction.atomic
+def rebuild_omics_summary():
+    """
+    Recompute totals, percentiles, top-N plants per metric and cross-layer
+    coverage. Returns the number of metrics summarised.
+    """
+    summaries = [
+        _metric_summary(layer, model, field)
+        for layer, model, fields in OMICS_LAYERS
+        for field in fields
+    ]
+    OmicsMetricSummary.objects.all().delete()
+    OmicsMetricSummary.objects.bulk_create(summaries)
+    OmicsCoverage.objects.all().delete()
+    OmicsCoverage.objects.bulk_create(_coverage())
+    return len(summaries)
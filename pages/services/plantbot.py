@@ -1,14 +1,21 @@
-import csv
-import re
-from collections import defaultdict
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+import sys
+import time
+from typing import List, Optional, Tuple
 
 import requests
 from requests.exceptions import RequestException
 
 from django.conf import settings
 
+from ..models import PlantAlias, PlantDossier
+from .enrichment import record_miss, stored_summary
+from .metrics import CACHE_REQUESTS, PLANTBOT_ANSWERS, WIKI_FETCH_DURATION
+from .names import normalize_name
+from .response_cache import MISSING, RESPONSE_CACHE
+from .throttling import SingleFlight, Throttled, take_token
+from .timing import phase
+from .versioning import VersionedIndex
+
 
 GENERAL_RESPONSES = [
     (
@@ -38,137 +45,81 @@ FOCUS_PRIORITIES = {
 }
 
 
-WIKI_SUMMARY_URL = "https://en.wikipedia.org/api/rest_v1/page/summary/{title}"
-WIKI_SEARCH_URL = "https://en.wikipedia.org/w/api.php"
+WIKI_SUMMARY_URL = getattr(
+    settings,
+    "PLANTBOT_WIKI_SUMMARY_URL",
+    "https://en.wikipedia.org/api/rest_v1/page/summary/{title}",
+)
+WIKI_SEARCH_URL = getattr(
+    settings, "PLANTBOT_WIKI_SEARCH_URL", "https://en.wikipedia.org/w/api.php"
+)
 
 
-class PlantKnowledge:
-    """
-    Lightweight in-memory knowledge graph over the CSV assets.
+# Shared cache used for fallback coalescing and rate limiting. Point it at a
+# backend every worker can see (file-based, memcached, redis) in production.
+PLANTBOT_CACHE = getattr(settings, "PLANTBOT_CACHE_ALIAS", "default")
 
-    - Normalises aliases so common and scientific names resolve to a single key.
-    - Indexes each dataset (basic, classification, genome, proteome, transcript, phyto)
-      under that key.
-    - Produces focused scientific summaries for the Plant Bot.
+# Per-client budget for fallback lookups: burst size and tokens per minute.
+CLIENT_BURST = getattr(settings, "PLANTBOT_CLIENT_BURST", 10)
+CLIENT_PER_MINUTE = getattr(settings, "PLANTBOT_CLIENT_PER_MINUTE", 10)
+
+# Global budget for outbound Wikipedia fetches across all workers.
+OUTBOUND_BURST = getattr(settings, "PLANTBOT_OUTBOUND_BURST", 20)
+OUTBOUND_PER_MINUTE = getattr(settings, "PLANTBOT_OUTBOUND_PER_MINUTE", 60)
+
+
+class AliasTable:
+    """
+    Aliases and the scientific key each resolves to, as two parallel
+    tuples. Keys are interned, so all aliases of a plant share one string.
     """
 
-    splitter = re.compile(r"[/,;|]+")
-    normalizer = re.compile(r"[^a-z0-9]+")
+    __slots__ = ("aliases", "keys")
 
-    def __init__(self):
-        self.records: Dict[str, dict] = {}
-        self.alias_index: Dict[str, str] = {}
-        self._load()
-
-    def _normalize(self, text: str) -> str:
-        if not text:
-            return ""
-        return self.normalizer.sub(" ", text.lower()).strip()
-
-    def _split_aliases(self, text: str):
-        if not text:
-            return []
-        for token in self.splitter.split(text):
-            alias = token.strip()
-            if alias:
-                yield alias
-
-    def _canonical_key(self, label: str) -> str:
-        aliases = list(self._split_aliases(label))
-        base = aliases[0] if aliases else (label or "plant")
-        return self._normalize(base)
-
-    def _register_alias(self, alias: str, canonical_key: str, record: dict):
-        norm = self._normalize(alias)
-        if not norm:
-            return
-        self.alias_index[norm] = canonical_key
-        record["aliases"].add(alias)
-
-    def _ensure_record(self, plant_name: str, scientific_name: str):
-        label_source = plant_name or scientific_name or "Plant"
-        canonical_key = self._canonical_key(label_source)
-        pretty_label = (
-            list(self._split_aliases(plant_name))[0]
-            if plant_name
-            else (scientific_name or label_source)
-        )
-        record = self.records.setdefault(
-            canonical_key,
-            {
-                "canonical_label": pretty_label,
-                "scientific_label": scientific_name or "",
-                "aliases": set(),
-                "datasets": defaultdict(list),
-            },
-        )
+    def __init__(self, rows):
+        aliases, keys = [], []
+        for alias, scientific_key in rows:
+            aliases.append(alias)
+            keys.append(sys.intern(scientific_key))
+        self.aliases = tuple(aliases)
+        self.keys = tuple(keys)
 
-        if plant_name and not record["canonical_label"]:
-            record["canonical_label"] = plant_name
-        if scientific_name and not record["scientific_label"]:
-            record["scientific_label"] = scientific_name
+    def __len__(self):
+        return len(self.aliases)
 
-        for alias in self._split_aliases(plant_name):
-            self._register_alias(alias, canonical_key, record)
-        for alias in self._split_aliases(scientific_name):
-            self._register_alias(alias, canonical_key, record)
+    def items(self):
+        return zip(self.aliases, self.keys)
 
-        return record
 
-    def _read_csv(self, filename: str) -> List[dict]:
-        """
-        Read a CSV from the project root or app root using BASE_DIR.
-        This allows you to keep the original CSVs in the same relative locations.
-        """
-        path = Path(settings.BASE_DIR) / filename
-        if not path.exists():
-            return []
-        with path.open(encoding="utf-8") as handle:
-            return list(csv.DictReader(handle))
-
-    def _ingest_single(self, dataset_name: str, rows: List[dict]):
-        for row in rows:
-            record = self._ensure_record(
-                row.get("Plant_Name", ""), row.get("Scientific_Name", "")
-            )
-            record["datasets"][dataset_name] = row
+class PlantKnowledge:
+    """
+    Plant Bot view of the curated plants, read from the ``PlantDossier``
+    rows built at ingest so answers match the dossier pages.
 
-    def _ingest_phyto(self, rows: List[dict]):
-        for row in rows:
-            record = self._ensure_record(
-                row.get("Plant_Name", ""), row.get("Scientific_Name", "")
-            )
-            record["datasets"]["phyto"].append(row)
+    - Matches a free-text question against the normalised alias table.
+    - Loads the matched plant's dossier with one indexed lookup.
+    - Produces focused scientific summaries for the Plant Bot.
+    """
 
-    def _load(self):
-        """
-        Wire the CSV files into the in-memory index. Filenames are
-        kept identical to the legacy implementation so you do not
-        have to rename anything.
-        """
-        file_map = {
-            "basic": "basic_info.csv",
-            "classification": "class.csv",
-            "genome": "genome.csv",
-            "proteome": "proteome.csv",
-            "transcript": "trans.csv",
-            "phyto": "phyto.csv",
-        }
-
-        for dataset, filename in file_map.items():
-            rows = self._read_csv(filename)
-            if not rows:
-                continue
-            if dataset == "phyto":
-                self._ingest_phyto(rows)
-            else:
-                self._ingest_single(dataset, rows)
+    def __init__(self):
+        self.aliases = VersionedIndex(self._build_alias_index)
+
+    @staticmethod
+    def _build_alias_index() -> AliasTable:
+        rows = PlantAlias.objects.exclude(kind=PlantAlias.TAXONOMY_ID).values_list(
+            "alias", "scientific_key"
+        )
+        return AliasTable(rows.iterator())
+
+    @property
+    def alias_index(self) -> AliasTable:
+        return self.aliases.get()
 
     def match(self, question: str):
         """
         Very lightweight fuzzy match between a free-text question and the aliases.
         """
-        norm_question = self._normalize(question)
+        norm_question = normalize_name(question)
         if not norm_question:
             return None
 
@@ -187,20 +138,19 @@ class PlantKnowledge:
                 best_score = score
                 best_key = canonical
 
-        return self.records.get(best_key)
-
-    def summarize(self, record: dict, focus: Optional[str] = None):
-        """
-        Build a scientist-facing narrative using all available datasets,
-        optionally prioritising a specific omics or taxonomy focus.
-        """
-        datasets = record["datasets"]
-        sections: List[Tuple[str, str]] = []
-        references = set()
+        if best_key is None:
+            return None
+        return (
+            PlantDossier.objects.filter(scientific_key=best_key)
+            .values_list("payload", flat=True)
+            .first()
+        )
 
-        label = record.get("canonical_label") or "This plant"
-        scientific = record.get("scientific_label")
-        alias_snippet = ", ".join(sorted(list(record["aliases"]))[:3])
+    def _general_section(self, record: dict):
+        label = record.get("label") or "This plant"
+        scientific = record.get("scientific_name")
+        aliases = record.get("common_names") or []
+        alias_snippet = ", ".join(aliases[:3])
 
         intro_bits = []
         if scientific:
@@ -210,38 +160,40 @@ class PlantKnowledge:
         if alias_snippet:
             intro_bits.append(
                 f"aka {alias_snippet}"
-                + ("…" if len(record["aliases"]) > 3 else "")
+                + ("…" if len(aliases) > 3 else "")
             )
+        return [" ".join(intro_bits) + " is curated inside MPMDB."], set()
 
-        sections.append(
-            ("general", " ".join(intro_bits) + " is curated inside MPMDB.")
-        )
-
-        # Basic descriptor block
-        basic = datasets.get("basic")
-        if isinstance(basic, dict):
-            desc = basic.get("Description", "").strip()
-            chem = basic.get("Chemical_Properties", "").strip()
-            medicinal = basic.get("Medicinal_Value", "").strip()
-            morphology = basic.get("Morphological_Features", "").strip()
-            region = basic.get("Worldwide_regions_Support_their_Growth", "").strip()
+    def _basic_section(self, record: dict):
+        texts: List[str] = []
+        references = set()
+        basic = record.get("basic")
+        if basic:
+            desc = (basic.get("Description") or "").strip()
+            chem = (basic.get("Chemical_Properties") or "").strip()
+            medicinal = (basic.get("Medicinal_Value") or "").strip()
+            morphology = (basic.get("Morphological_Features") or "").strip()
+            region = (basic.get("Worldwide_regions_Support_their_Growth") or "").strip()
 
             if desc:
-                sections.append(("basic", desc))
+                texts.append(desc)
             if chem:
-                sections.append(("basic", f"Chemistry focus: {chem}"))
+                texts.append(f"Chemistry focus: {chem}")
             if medicinal:
-                sections.append(("basic", f"Therapeutic evidence: {medicinal}"))
+                texts.append(f"Therapeutic evidence: {medicinal}")
             if morphology:
-                sections.append(("basic", f"Morphology: {morphology}"))
+                texts.append(f"Morphology: {morphology}")
             if region:
-                sections.append(("basic", f"Geography: {region}"))
+                texts.append(f"Geography: {region}")
             if basic.get("References"):
                 references.add(basic["References"])
+        return texts, references
 
-        # Taxonomy
-        classification = datasets.get("classification")
-        if isinstance(classification, dict):
+    def _classification_section(self, record: dict):
+        texts: List[str] = []
+        references = set()
+        classification = record.get("classification")
+        if classification:
             lineage = [
                 classification.get("Order"),
                 classification.get("Family"),
@@ -250,204 +202,371 @@ class PlantKnowledge:
             ]
             lineage = [item for item in lineage if item]
             if lineage:
-                sections.append(
-                    ("classification", "Taxonomy · " + " → ".join(lineage))
-                )
+                texts.append("Taxonomy · " + " → ".join(lineage))
             if classification.get("NCBI_link"):
                 references.add(classification["NCBI_link"])
+        return texts, references
 
-        # Genome
-        genome = datasets.get("genome")
-        if isinstance(genome, dict):
-            sections.append(
-                (
-                    "genome",
-                    (
-                        "Genome resources: "
-                        f"{genome.get('Nucleotide', '0')} nucleotide entries, "
-                        f"{genome.get('Genome_Sequence', '0')} genome assemblies, and "
-                        f"{genome.get('mRNA_Sequence', '0')} mRNA sequences curated via NCBI."
-                    ),
-                )
+    def _genome_section(self, record: dict):
+        texts: List[str] = []
+        references = set()
+        genome = record.get("genome")
+        if genome:
+            texts.append(
+                "Genome resources: "
+                f"{genome.get('Nucleotide', '0')} nucleotide entries, "
+                f"{genome.get('Genome_Sequence', '0')} genome assemblies, and "
+                f"{genome.get('mRNA_Sequence', '0')} mRNA sequences curated via NCBI."
             )
             if genome.get("NCBI_link"):
                 references.add(genome["NCBI_link"])
+        return texts, references
 
-        # Proteome
-        proteome = datasets.get("proteome")
-        if isinstance(proteome, dict):
-            sections.append(
-                (
-                    "proteome",
-                    (
-                        "Proteome coverage: "
-                        f"{proteome.get('Protein_Seq', '0')} protein sequences, "
-                        f"{proteome.get('Identical_Protein_Groups', '0')} identical protein groups, "
-                        f"{proteome.get('Protein', '0')} peptide identifications."
-                    ),
-                )
+    def _proteome_section(self, record: dict):
+        texts: List[str] = []
+        references = set()
+        proteome = record.get("proteome")
+        if proteome:
+            texts.append(
+                "Proteome coverage: "
+                f"{proteome.get('Protein_Seq', '0')} protein sequences, "
+                f"{proteome.get('Identical_Protein_Groups', '0')} identical protein groups, "
+                f"{proteome.get('Protein', '0')} peptide identifications."
             )
             if proteome.get("NCBI_link"):
                 references.add(proteome["NCBI_link"])
+        return texts, references
 
-        # Transcriptome
-        transcript = datasets.get("transcript")
-        if isinstance(transcript, dict):
-            sections.append(
-                (
-                    "transcript",
-                    (
-                        "Transcriptomics: "
-                        f"{transcript.get('SRA', '0')} SRA runs with "
-                        f"{transcript.get('DNA', '0')} DNA and "
-                        f"{transcript.get('RNA', '0')} RNA libraries across "
-                        f"{transcript.get('BioProject', '0')} BioProjects / "
-                        f"{transcript.get('BioSample', '0')} BioSamples."
-                    ),
-                )
+    def _transcript_section(self, record: dict):
+        texts: List[str] = []
+        references = set()
+        transcript = record.get("transcript")
+        if transcript:
+            texts.append(
+                "Transcriptomics: "
+                f"{transcript.get('SRA', '0')} SRA runs with "
+                f"{transcript.get('DNA', '0')} DNA and "
+                f"{transcript.get('RNA', '0')} RNA libraries across "
+                f"{transcript.get('BioProject', '0')} BioProjects / "
+                f"{transcript.get('BioSample', '0')} BioSamples."
             )
             if transcript.get("NCBI_link"):
                 references.add(transcript["NCBI_link"])
+        return texts, references
+
+    def _phyto_section(self, record: dict):
+        texts: List[str] = []
+        references = set()
+        # Dossier compounds are de-duplicated and ordered by activity count.
+        compounds = []
+        for row in record.get("compounds", [])[:3]:
+            activity = row.get("Activity_Count") or "NA"
+            part = row.get("Plant_Part") or "various tissues"
+            compounds.append(
+                f"{row['Phytochemicals'].strip()} (activity {activity}, {part.lower()})"
+            )
+            if row.get("References"):
+                references.add(row["References"])
+        if compounds:
+            texts.append(
+                "Highlighted phytochemicals: " + "; ".join(compounds) + "."
+            )
+        return texts, references
+
+    def iter_sections(self, record: dict, focus: Optional[str] = None):
+        """
+        Yield ``(key, texts, references)`` for each dataset block of a record,
+        building every block only when it is requested. Blocks that match
+        the focus come first so streaming clients see them immediately.
+        """
+        builders = [
+            ("general", self._general_section),
+            ("basic", self._basic_section),
+            ("classification", self._classification_section),
+            ("genome", self._genome_section),
+            ("proteome", self._proteome_section),
+            ("transcript", self._transcript_section),
+            ("phyto", self._phyto_section),
+        ]
 
-        # Phytochemical / metabolite layer
-        phyto_rows = datasets.get("phyto")
-        if phyto_rows:
-            compounds = []
-            seen = set()
-            for row in phyto_rows:
-                compound = row.get("Phytochemicals")
-                if not compound or compound in seen:
-                    continue
-                activity = row.get("Activity_Count") or "NA"
-                part = row.get("Plant_Part") or "various tissues"
-                compounds.append(
-                    f"{compound} (activity {activity}, {part.lower()})"
-                )
-                seen.add(compound)
-                if len(compounds) == 3:
-                    break
-                if row.get("References"):
-                    references.add(row["References"])
-            if compounds:
-                sections.append(
-                    (
-                        "phyto",
-                        "Highlighted phytochemicals: "
-                        + "; ".join(compounds)
-                        + ".",
-                    )
-                )
-
-        # Reorder based on focus if provided
         focus_keys = FOCUS_PRIORITIES.get(focus or "", set())
-        ordered_sections: List[str] = []
+        if not focus_keys:
+            for key, builder in builders:
+                texts, references = builder(record)
+                yield key, texts, references
+            return
 
-        if focus_keys:
-            for key, text in sections:
-                if key in focus_keys:
-                    ordered_sections.append(text)
-            if not ordered_sections:
-                ordered_sections.append(
+        focused_texts = 0
+        for key, builder in builders:
+            if key in focus_keys:
+                texts, references = builder(record)
+                focused_texts += len(texts)
+                yield key, texts, references
+        if not focused_texts:
+            yield (
+                "notice",
+                [
                     f"No curated {focus} dataset yet inside MPMDB. "
                     "Consider contributing data or cross-checking NCBI."
-                )
-            ordered_sections.extend(text for key, text in sections if key not in focus_keys)
-        else:
-            ordered_sections = [text for _, text in sections]
+                ],
+                set(),
+            )
+        for key, builder in builders:
+            if key not in focus_keys:
+                texts, references = builder(record)
+                yield key, texts, references
+
+    def summarize(self, record: dict, focus: Optional[str] = None):
+        """
+        Build a scientist-facing narrative using all available datasets,
+        optionally prioritising a specific omics or taxonomy focus.
+        """
+        ordered_sections: List[str] = []
+        references = set()
+        for _, texts, section_refs in self.iter_sections(record, focus=focus):
+            ordered_sections.extend(texts)
+            references |= section_refs
 
         answer = " ".join(seg.strip() for seg in ordered_sections if seg.strip())
-        source = "; ".join(sorted(ref for ref in references if ref)) or None
-        return answer, source
+        return answer, _join_references(references)
+
+
+def _join_references(references) -> Optional[str]:
+    return "; ".join(sorted(ref for ref in references if ref)) or None
 
 
 KNOWLEDGE_BASE = PlantKnowledge()
 
 
-def _wiki_summary(topic: str) -> Optional[Tuple[str, str]]:
+def lookup_wiki_summary(topic: str) -> Optional[Tuple[str, str]]:
     """
-    Fetch a short encyclopedic-style summary from Wikipedia as a
-    fallback when the plant is not yet curated in MPMDB.
+    Fetch a short encyclopedic-style summary and its page URL from
+    Wikipedia. Returns None when nothing matches ``topic``; network and
+    HTTP errors are raised.
     """
-    try:
-        search_resp = requests.get(
-            WIKI_SEARCH_URL,
-            params={
-                "action": "opensearch",
-                "search": topic,
-                "limit": 1,
-                "namespace": 0,
-                "format": "json",
-            },
-            timeout=6,
-        )
-        search_resp.raise_for_status()
-        data = search_resp.json()
-        if not data or len(data) < 2 or not data[1]:
-            return None
+    search_resp = requests.get(
+        WIKI_SEARCH_URL,
+        params={
+            "action": "opensearch",
+            "search": topic,
+            "limit": 1,
+            "namespace": 0,
+            "format": "json",
+        },
+        timeout=6,
+    )
+    search_resp.raise_for_status()
+    data = search_resp.json()
+    if not data or len(data) < 2 or not data[1]:
+        return None
+
+    title = data[1][0]
+    summary_resp = requests.get(
+        WIKI_SUMMARY_URL.format(title=title.replace(" ", "_")),
+        timeout=6,
+        headers={"Accept": "application/json"},
+    )
+    summary_resp.raise_for_status()
+    summary_data = summary_resp.json()
+    summary = summary_data.get("extract")
+    url = (
+        summary_data.get("content_urls", {})
+        .get("desktop", {})
+        .get("page")
+        or summary_data.get("canonical")
+    )
+    if summary:
+        return summary.strip(), url
+    return None
 
-        title = data[1][0]
-        summary_resp = requests.get(
-            WIKI_SUMMARY_URL.format(title=title.replace(" ", "_")),
-            timeout=6,
-            headers={"Accept": "application/json"},
-        )
-        summary_resp.raise_for_status()
-        summary_data = summary_resp.json()
-        summary = summary_data.get("extract")
-        url = (
-            summary_data.get("content_urls", {})
-            .get("desktop", {})
-            .get("page")
-            or summary_data.get("canonical")
-        )
 
-        if summary:
-            return summary.strip(), url
+def _wiki_summary(topic: str) -> Optional[Tuple[str, str]]:
+    """
+    Live fallback when the plant is not yet curated in MPMDB and no
+    summary was stored for it. Errors count as no summary.
+    """
+    started = time.perf_counter()
+    outcome = "empty"
+    try:
+        result = lookup_wiki_summary(topic)
+        if result:
+            outcome = "ok"
+        return result
     except RequestException:
+        outcome = "error"
         return None
+    finally:
+        WIKI_FETCH_DURATION.observe(time.perf_counter() - started, outcome)
+
+
+WIKI_FLIGHT = SingleFlight(
+    PLANTBOT_CACHE,
+    "plantbot-wiki",
+    result_timeout=24 * 60 * 60,
+    empty_timeout=5 * 60,
+    # Two sequential requests with a 6s timeout each.
+    wait_timeout=12,
+)
+
+
+def _fetch_wiki_summary(topic: str, client_id: Optional[str] = None):
+    # Only reached when the summary is not cached, so the client's token
+    # is spent on actual outbound fetches.
+    if client_id and not take_token(
+        PLANTBOT_CACHE, f"plantbot:client:{client_id}", CLIENT_BURST, CLIENT_PER_MINUTE / 60
+    ):
+        raise Throttled()
+    if not take_token(
+        PLANTBOT_CACHE, "plantbot:outbound", OUTBOUND_BURST, OUTBOUND_PER_MINUTE / 60
+    ):
+        raise Throttled()
+    return _wiki_summary(topic)
+
+
+def _fallback_summary(
+    question: str, client_id: Optional[str] = None
+) -> Optional[Tuple[str, str]]:
+    """
+    Summary stored by ``manage.py enrich`` for the question, or else a
+    rate-limited, coalesced call to ``_wiki_summary``. Questions without a
+    stored summary are logged for the next enrichment run. A summary
+    already fetched is served from the cache; otherwise returns None
+    (curated-only answer) when the client or the global outbound budget is
+    exhausted instead of queueing the request.
+    """
+    topic = normalize_name(question)
+    if not topic:
+        return None
+    stored = stored_summary(topic)
+    if stored is not None:
+        CACHE_REQUESTS.inc("encyclopedia", "hit")
+        return (stored.summary, stored.url) if stored.found else None
+    CACHE_REQUESTS.inc("encyclopedia", "miss")
+    record_miss(topic, question)
+
+    return WIKI_FLIGHT.do(topic, lambda: _fetch_wiki_summary(question, client_id))
 
+
+def _general_response(question: str) -> Optional[str]:
+    question_lower = question.lower()
+    for keywords, response in GENERAL_RESPONSES:
+        if any(keyword in question_lower for keyword in keywords):
+            return response
     return None
 
 
-def generate_answer(question: str, focus: Optional[str] = None):
+def _fallback_reply(summary: str) -> str:
+    return (
+        "Here's what I found after checking recent encyclopedic sources:\n"
+        f"{summary}"
+    )
+
+
+NO_MATCH_REPLY = (
+    "I could not match that request to our curated plants yet. "
+    "Try providing the botanical or scientific name, optionally followed by "
+    "genome/proteome/transcriptome/metabolite context. You can also ask for "
+    "taxonomy, sequencing, or metabolite insights explicitly."
+)
+
+
+def _curated_answer(question: str, focus: Optional[str]):
+    # 1) General responses for broad modality questions
+    general = _general_response(question)
+    if general:
+        return general, None
+
+    # 2) Curated plant knowledge from the dossier table
+    with phase("plantbot-match"):
+        record = KNOWLEDGE_BASE.match(question)
+    if record:
+        with phase("plantbot-summarize"):
+            return KNOWLEDGE_BASE.summarize(record, focus=focus)
+    return None
+
+
+def generate_answer(
+    question: str, focus: Optional[str] = None, client_id: Optional[str] = None
+):
     """
     Main entry point for the Plant Bot.
 
     - First, respond with general guidance snippets if the query is broad
       (e.g., "metabolomics", "sequencing", etc.).
-    - Next, try to resolve the plant into the curated CSV-backed knowledge base
-      and build a scientist-facing summary, optionally focused on a given layer.
+    - Next, try to resolve the plant into its curated dossier and build a scientist-facing summary, optionally focused on a given layer.
     - Finally, if no curated plant matches, fall back to a Wikipedia-style
       summary so that queries for any species still receive a useful answer.
+      Summaries pre-fetched by ``manage.py enrich`` are read from the
+      database; for anything else, identical concurrent lookups share one
+      fetch, and ``client_id`` is rate limited; throttled requests get the
+      curated-only reply.
     """
-    question_lower = question.lower()
-
-    # 1) General responses for broad modality questions
-    for keywords, response in GENERAL_RESPONSES:
-        if any(keyword in question_lower for keyword in keywords):
-            return response, None
-
-    # 2) Curated plant knowledge from CSVs
-    record = KNOWLEDGE_BASE.match(question)
-    if record:
-        return KNOWLEDGE_BASE.summarize(record, focus=focus)
+    # 1) and 2) General guidance or curated knowledge, both deterministic
+    # for a dataset version and so served from the response cache.
+    parts = (" ".join(question.lower().split()), focus or "")
+    curated = RESPONSE_CACHE.get("plantbot", parts)
+    if curated is MISSING:
+        curated = _curated_answer(question, focus)
+        RESPONSE_CACHE.set("plantbot", parts, curated)
+    if curated:
+        PLANTBOT_ANSWERS.inc("general" if _general_response(question) else "curated")
+        return curated
 
     # 3) Fallback: external encyclopedic summary so exotic species still work
-    wiki = _wiki_summary(question)
+    with phase("plantbot-fallback"):
+        wiki = _fallback_summary(question, client_id)
     if wiki:
         summary, url = wiki
-        reply = (
-            "Here's what I found after checking recent encyclopedic sources:\n"
-            f"{summary}"
-        )
-        return reply, url
+        PLANTBOT_ANSWERS.inc("wiki")
+        return _fallback_reply(summary), url
 
     # 4) Final graceful fallback
-    return (
-        "I could not match that request to our curated plants yet. "
-        "Try providing the botanical or scientific name, optionally followed by "
-        "genome/proteome/transcriptome/metabolite context. You can also ask for "
-        "taxonomy, sequencing, or metabolite insights explicitly.",
-        None,
-    )
+    PLANTBOT_ANSWERS.inc("none")
+    return NO_MATCH_REPLY, None
+
 
+def stream_answer(
+    question: str, focus: Optional[str] = None, client_id: Optional[str] = None
+):
+    """
+    Incremental counterpart of ``generate_answer``.
+
+    Yields ``(event, payload)`` pairs: one ``section`` event per curated
+    dataset block as soon as it is built, a ``status`` event before the
+    slow encyclopedic fallback, and a closing ``done`` event carrying the
+    combined source references.
+    """
+    general = _general_response(question)
+    if general:
+        PLANTBOT_ANSWERS.inc("general")
+        yield "section", {"key": "general", "text": general}
+        yield "done", {"source": None}
+        return
+
+    with phase("plantbot-match"):
+        record = KNOWLEDGE_BASE.match(question)
+    if record:
+        PLANTBOT_ANSWERS.inc("curated")
+        references = set()
+        for key, texts, section_refs in KNOWLEDGE_BASE.iter_sections(
+            record, focus=focus
+        ):
+            references |= section_refs
+            text = " ".join(seg.strip() for seg in texts if seg.strip())
+            if text:
+                yield "section", {"key": key, "text": text}
+        yield "done", {"source": _join_references(references)}
+        return
+
+    yield "status", {"message": "Not curated yet, checking encyclopedic sources…"}
+    wiki = _fallback_summary(question, client_id)
+    if wiki:
+        summary, url = wiki
+        PLANTBOT_ANSWERS.inc("wiki")
+        yield "section", {"key": "fallback", "text": _fallback_reply(summary)}
+        yield "done", {"source": url}
+        return
+
+    PLANTBOT_ANSWERS.inc("none")
+    yield "section", {"key": "none", "text": NO_MATCH_REPLY}
+    yield "done", {"source": None}
@@ -0,0 +1,202 @@
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+
+# Golden files, one per case. Regenerate after an intended plan change with
+# MPMDB_UPDATE_QUERY_PLANS=1 python manage.py test pages
+PLAN_DIR = Path(settings.BASE_DIR) / "pages" / "query_plans"
+
+# Tables that grow with the curated datasets. Any other table is small
+# enough (summaries, dataset version) that a scan does not matter.
+LARGE_TABLES = {
+    "basic_med_basic",
+    "classification_med_class",
+    "geno_med_geno",
+    "proteom_med_proteom",
+    "transcriptom_med_transcriptom",
+    "phytochem_med_phytochem",
+    "classification_taxonnode",
+    "pages_plantalias",
+    "pages_plantdossier",
+    "pages_facetbitmap",
+}
+
+_ROWID = "<rowid>"
+_ACCESS = re.compile(r"^(SCAN|SEARCH) (?:TABLE )?(\w+)(?: AS \w+)?(?: USING (.*))?$")
+
+
+class PlanCase(NamedTuple):
+    """
+    One request whose SQL is explained. ``uses`` lists ``(table, column)``
+    pairs that must be looked up through an index leading with that column;
+    ``scans`` lists the large tables the request may read in full, e.g. for
+    substring search, which no index can serve.
+    """
+
+    name: str
+    path: str
+    params: Optional[dict] = None
+    method: str = "GET"
+    uses: Tuple[Tuple[str, str], ...] = ()
+    scans: Tuple[str, ...] = ()
+
+
+def _search(name, path, table, **facets):
+    # icontains compiles to LIKE '%q%', so the dataset table itself is always
+    # scanned; nothing else may be. Facets narrow the fetched rows in memory.
+    return PlanCase(name, path, {"q": "testplant", **facets}, scans=(table,))
+
+
+CASES = [
+    _search("basic-search", "/basic.html", "basic_med_basic"),
+    _search("basic-search-faceted", "/basic.html", "basic_med_basic", part="Leaf"),
+    _search("classification-search", "/classification.html", "classification_med_class"),
+    _search(
+        "classification-search-faceted",
+        "/classification.html",
+        "classification_med_class",
+        family="Plantaginaceae",
+    ),
+    _search("genome-search", "/genomes.html", "geno_med_geno"),
+    _search("proteome-search", "/proteome.html", "proteom_med_proteom"),
+    _search("transcriptome-search", "/transcriptom.html", "transcriptom_med_transcriptom"),
+    _search("metabolite-search", "/metabolites.html", "phytochem_med_phytochem"),
+    PlanCase("dossier-page", "/plant/plantago-testensis1/", uses=(("pages_plantdossier", "slug"),)),
+    PlanCase("dossier-api", "/api/plant/plantago-testensis1/", uses=(("pages_plantdossier", "slug"),)),
+    PlanCase(
+        "compare-api",
+        "/api/compare/",
+        {"plants": "Testplant 1,Plantago testensis2,900003"},
+        uses=(("pages_plantalias", "alias"), ("pages_plantdossier", "scientific_key")),
+    ),
+    PlanCase(
+        "resolve-api",
+        "/api/resolve/",
+        {"names": ["Testplant 1", "Plantago testensis2", "900003"]},
+        method="POST",
+        uses=(("pages_plantalias", "alias"), ("pages_plantdossier", "scientific_key")),
+    ),
+    PlanCase("suggest-api", "/api/suggest/", {"q": "test"}),
+    PlanCase(
+        "taxonomy-page",
+        "/taxonomy.html",
+        {"order": "Lamiales", "family": "Plantaginaceae"},
+        uses=(("classification_taxonnode", "rank"),),
+    ),
+    PlanCase(
+        "taxonomy-api",
+        "/api/taxonomy/",
+        # Genus Plantago: Lamiales is lft 1, Plantaginaceae 2.
+        {"node": 3},
+        uses=(("classification_taxonnode", "lft"),),
+    ),
+    PlanCase("stats-api", "/api/stats/"),
+]
+
+
+class _Recorder:
+    def __init__(self):
+        self.statements: List[Tuple[str, tuple]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith("SELECT"):
+            self.statements.append((sql, tuple(params or ())))
+        return execute(sql, params, many, context)
+
+
+def _request(client, case: PlanCase):
+    if case.method == "POST":
+        return client.post(case.path, json.dumps(case.params), content_type="application/json")
+    return client.get(case.path, case.params or {})
+
+
+def capture(client, case: PlanCase) -> List[Tuple[str, tuple]]:
+    """
+    SELECTs a request issues once the in-process indexes are warm and the
+    response caches are empty, i.e. what every uncached request pays.
+    """
+    _request(client, case)
+    for cache in caches.all():
+        cache.clear()
+    recorder = _Recorder()
+    with connection.execute_wrapper(recorder):
+        response = _request(client, case)
+    if response.status_code >= 400:
+        raise AssertionError(f"{case.name}: {case.path} answered {response.status_code}")
+    return recorder.statements
+
+
+def explain(sql: str, params: tuple) -> List[str]:
+    """
+    ``EXPLAIN QUERY PLAN`` as indented lines, in the wording of recent
+    SQLite versions.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        rows = cursor.fetchall()
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        detail = re.sub(r"\b(SCAN|SEARCH) TABLE ", r"\1 ", detail)
+        lines.append("  " * depth[node] + detail)
+    return lines
+
+
+def render(statements: List[Tuple[str, tuple]]) -> str:
+    blocks = []
+    for sql, params in statements:
+        plan = "\n".join(explain(sql, params))
+        blocks.append(f"-- {sql}\n{plan}")
+    return "\n\n".join(blocks) + "\n"
+
+
+def _leading_indexes(table: str) -> Dict[str, str]:
+    """
+    First column of every index on ``table``, keyed by index name.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA index_list("{table}")')
+        names = [row[1] for row in cursor.fetchall()]
+        leading = {}
+        for name in names:
+            cursor.execute(f'PRAGMA index_info("{name}")')
+            columns = sorted(cursor.fetchall())
+            if columns:
+                leading[name] = columns[0][2]
+    return leading
+
+
+def problems(case: PlanCase, plan: str) -> List[str]:
+    """
+    Full scans of large tables the case does not allow, and required index
+    lookups that no longer happen.
+    """
+    found = []
+    searches = set()
+    for line in plan.splitlines():
+        match = _ACCESS.match(line.strip())
+        if not match:
+            continue
+        kind, table, using = match.groups()
+        if kind == "SCAN" and table in LARGE_TABLES and table not in case.scans:
+            found.append(f"full scan of {table}: {line.strip()}")
+        if kind == "SEARCH" and using:
+            index = re.search(r"INDEX (\w+)", using)
+            if index:
+                searches.add((table, index.group(1)))
+            elif using.startswith("INTEGER PRIMARY KEY"):
+                searches.add((table, _ROWID))
+    for table, column in case.uses:
+        indexes = {name for name, first in _leading_indexes(table).items() if first == column}
+        if column == "id":
+            indexes.add(_ROWID)
+        if not any((table, name) in searches for name in indexes):
+            found.append(f"no index lookup on {table}.{column}")
+    return found
@@ -0,0 +1,68 @@
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+from .versioning import expire_dataset_version
+
+
+RELEASE_PREFIX = "db-"
+
+
+def publish_release(source: Path, keep: int = 3) -> Path:
+    """
+    Copy ``source`` into a new release file and repoint the
+    ``current.sqlite3`` symlink at it in one ``rename``. Workers that still
+    hold the previous file keep reading it until they reopen.
+    """
+    releases_dir = Path(settings.SQLITE_RELEASES_DIR)
+    releases_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    release = releases_dir / f"{RELEASE_PREFIX}{stamp}-{os.getpid()}.sqlite3"
+    partial = release.with_suffix(".partial")
+
+    # VACUUM INTO writes a compact, consistent copy even while the ingest
+    # database is open elsewhere.
+    with sqlite3.connect(source) as conn:
+        conn.execute("VACUUM INTO ?", (str(partial),))
+    conn.close()
+    with sqlite3.connect(f"file:{partial}?mode=ro", uri=True) as check:
+        (status,) = check.execute("PRAGMA quick_check").fetchone()
+    check.close()
+    if status != "ok":
+        partial.unlink()
+        raise sqlite3.DatabaseError(f"Published copy failed quick_check: {status}")
+    os.replace(partial, release)
+
+    link = Path(settings.SQLITE_PUBLISHED_DB)
+    staged_link = link.with_name(f".{link.name}.{os.getpid()}")
+    if staged_link.is_symlink() or staged_link.exists():
+        staged_link.unlink()
+    os.symlink(release.name, staged_link)
+    os.replace(staged_link, link)
+
+    old = sorted(releases_dir.glob(f"{RELEASE_PREFIX}*.sqlite3"))[:-keep] if keep else []
+    for path in old:
+        if path != release:
+            path.unlink()
+    return release
+
+
+def reopen_if_republished(sender, **kwargs):
+    """
+    ``request_started`` receiver for the read-only serving mode: close this
+    thread's persistent connection when ``current.sqlite3`` points at a new
+    release, so the next query opens it.
+    """
+    target = os.path.realpath(settings.SQLITE_PUBLISHED_DB)
+    connection = connections["default"]
+    opened = getattr(connection, "published_release", None)
+    if opened == target:
+        return
+    if opened is not None:
+        connection.close()
+        expire_dataset_version()
+    connection.published_release = target
@@ -0,0 +1,163 @@
+from collections import defaultdict
+from typing import Dict, List
+
+from django.db import transaction
+
+from basic.models import med_basic
+from classification.models import med_class
+from geno.models import med_geno
+from phytochem.models import med_phytochem
+from proteom.models import med_proteom
+from transcriptom.models import med_transcriptom
+
+from ..models import PlantAlias
+from .dossier import chunked, load_dossiers, plant_summary
+from .names import binomial_key, display_label, normalize_name, plant_key, split_aliases
+
+
+MAX_RESOLVE_NAMES = 1000
+
+DATASET_MODELS = [med_class, med_basic, med_geno, med_proteom, med_transcriptom, med_phytochem]
+
+# Confidence reported for each way an input can match.
+CONFIDENCE = {
+    PlantAlias.SCIENTIFIC: 1.0,
+    PlantAlias.TAXONOMY_ID: 1.0,
+    PlantAlias.COMMON: 1.0,
+    PlantAlias.BINOMIAL: 0.9,
+}
+INPUT_BINOMIAL_CONFIDENCE = 0.8
+AMBIGUOUS_CONFIDENCE = 0.5
+
+
+def _alias_rows(plant_name, scientific_name, taxonomy_id=""):
+    normalized = normalize_name(scientific_name)
+    if not normalized:
+        return
+    scientific_key = plant_key(scientific_name)
+    label = display_label(plant_name, scientific_name)
+    yield normalized, PlantAlias.SCIENTIFIC, scientific_key, label
+    if scientific_key != normalized:
+        yield scientific_key, PlantAlias.BINOMIAL, scientific_key, label
+    for alias in list(split_aliases(plant_name)) + list(split_aliases(scientific_name)):
+        norm = normalize_name(alias)
+        if norm and norm != normalized:
+            yield norm, PlantAlias.COMMON, scientific_key, label
+    if taxonomy_id and str(taxonomy_id).strip().isdigit():
+        yield str(taxonomy_id).strip(), PlantAlias.TAXONOMY_ID, scientific_key, label
+
+
+@transaction.atomic
+def rebuild_alias_table():
+    """
+    Rebuild ``PlantAlias`` from every name and taxonomy ID in the six
+    datasets. Returns the number of aliases written.
+    """
+    seen = set()
+    aliases = []
+    for model in DATASET_MODELS:
+        fields = ["Plant_Name", "Scientific_Name"]
+        if model is med_class:
+            fields.append("NCBI_Taxonomy_ID")
+        for values in model.objects.values_list(*fields).distinct().iterator():
+            scientific_name = values[1] or ""
+            for alias, kind, scientific_key, label in _alias_rows(*values):
+                key = (alias, kind, scientific_name)
+                if key in seen:
+                    continue
+                seen.add(key)
+                aliases.append(
+                    PlantAlias(
+                        alias=alias,
+                        kind=kind,
+                        scientific_key=scientific_key,
+                        scientific_name=scientific_name,
+                        plant_label=label,
+                    )
+                )
+
+    PlantAlias.objects.all().delete()
+    PlantAlias.objects.bulk_create(aliases, batch_size=1000)
+    return len(aliases)
+
+
+def _lookup(keys) -> Dict[str, list]:
+    found = defaultdict(list)
+    for chunk in chunked(set(keys)):
+        rows = PlantAlias.objects.filter(alias__in=chunk).values_list(
+            "alias", "kind", "scientific_key", "plant_label"
+        )
+        for alias, kind, scientific_key, label in rows:
+            found[alias].append((kind, scientific_key, label))
+    return found
+
+
+def _best_match(candidates, base_confidence=None):
+    """
+    Pick the scientific key an alias points to. Aliases shared by several
+    plants resolve to the one with the most supporting rows, flagged with a
+    lower confidence.
+    """
+    by_key = defaultdict(list)
+    for kind, scientific_key, label in candidates:
+        by_key[scientific_key].append((kind, label))
+    scientific_key = max(sorted(by_key), key=lambda key: len(by_key[key]))
+    kinds = [kind for kind, _ in by_key[scientific_key]]
+    label = by_key[scientific_key][0][1]
+    if len(by_key) > 1:
+        return scientific_key, label, AMBIGUOUS_CONFIDENCE, "ambiguous"
+    if base_confidence is not None:
+        return scientific_key, label, base_confidence, PlantAlias.BINOMIAL
+    best_kind = max(kinds, key=CONFIDENCE.get)
+    return scientific_key, label, CONFIDENCE[best_kind], best_kind
+
+
+def match_names(inputs: List[str]) -> list:
+    """
+    ``(scientific_key, label, confidence, match_type)`` for each plant name
+    or NCBI taxonomy ID, or ``None`` when nothing matches, in input order.
+    """
+    keys = [normalize_name(str(item)) for item in inputs]
+    found = _lookup(key for key in keys if key)
+
+    # Retry names that only miss on an authority or variety suffix.
+    retry = {
+        key: binomial_key(key)
+        for key in keys
+        if key and key not in found and binomial_key(key)
+    }
+    found_binomial = _lookup(retry.values()) if retry else {}
+
+    matches = []
+    for key in keys:
+        if key in found:
+            matches.append(_best_match(found[key]))
+        elif retry.get(key) in found_binomial:
+            matches.append(
+                _best_match(found_binomial[retry[key]], INPUT_BINOMIAL_CONFIDENCE)
+            )
+        else:
+            matches.append(None)
+    return matches
+
+
+def resolve_names(inputs: List[str]) -> List[dict]:
+    """
+    Resolve plant names or NCBI taxonomy IDs in bulk: chunked ``IN``
+    lookups on the alias table, then one batched query for the matched
+    plants' dossiers. Returns one row per input, in input order.
+    """
+    matches = match_names(inputs)
+    dossiers = load_dossiers(match[0] for match in matches if match)
+
+    results = []
+    for item, match in zip(inputs, matches):
+        payload = dossiers.get(match[0]) if match else None
+        plant = plant_summary(item, match[1] if match else "", payload, top_compounds=0)
+        plant.pop("top_compounds")
+        plant["input"] = plant.pop("query")
+        plant["matched"] = match is not None
+        plant["confidence"] = match[2] if match else 0.0
+        plant["match_type"] = match[3] if match else None
+        results.append(plant)
+    return results
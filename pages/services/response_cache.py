@@ -0,0 +1,72 @@
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .metrics import CACHE_REQUESTS
+from .throttling import cache_key
+from .timing import count
+from .versioning import dataset_version
+
+
+# Any configured cache alias works: locmem per worker, FileBasedCache shared
+# by the workers of one host, or a networked backend. Eviction is the
+# backend's own, bounded by its MAX_ENTRIES option.
+RESPONSE_CACHE_ALIAS = getattr(settings, "RESPONSE_CACHE_ALIAS", "responses")
+RESPONSE_CACHE_SECONDS = getattr(settings, "RESPONSE_CACHE_SECONDS", 24 * 60 * 60)
+# Larger bodies (broad searches) are not worth holding in the cache.
+RESPONSE_CACHE_MAX_BYTES = getattr(settings, "RESPONSE_CACHE_MAX_BYTES", 512 * 1024)
+
+MISSING = object()
+
+
+class ResponseCache:
+    """
+    Cache keyed by namespace, dataset version and request parts, so entries
+    from an older ingest are simply never read again. Hits and misses are
+    counted per namespace in each process.
+    """
+
+    def __init__(self, alias: str = RESPONSE_CACHE_ALIAS, timeout: int = RESPONSE_CACHE_SECONDS):
+        self.alias = alias
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def _key(self, namespace, parts):
+        return cache_key("response", namespace, dataset_version().number, *parts)
+
+    def _count(self, namespace, outcome):
+        with self._lock:
+            self._counters[namespace][outcome] += 1
+
+    def get(self, namespace, parts):
+        value = self.backend.get(self._key(namespace, parts), MISSING)
+        outcome = "misses" if value is MISSING else "hits"
+        self._count(namespace, outcome)
+        count(f"{namespace}-{outcome}")
+        CACHE_REQUESTS.inc(namespace, "miss" if value is MISSING else "hit")
+        return value
+
+    def set(self, namespace, parts, value):
+        self.backend.set(self._key(namespace, parts), value, self.timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {namespace: dict(counts) for namespace, counts in self._counters.items()}
+        for counts in counters.values():
+            lookups = counts["hits"] + counts["misses"]
+            counts["hit_rate"] = round(counts["hits"] / lookups, 3) if lookups else 0.0
+        return counters
+
+    def reset_stats(self):
+        with self._lock:
+            self._counters.clear()
+
+
+RESPONSE_CACHE = ResponseCache()
@@ -0,0 +1,346 @@
+import json
+import mmap
+import os
+import re
+import shutil
+import threading
+from array import array
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+
+from .dossier import SLUG_INDEX, chunked
+from .resolve import match_names
+
+try:
+    from Bio import SeqIO
+except ImportError:  # Biopython is only needed to import FASTA files.
+    SeqIO = None
+
+
+# One store per kind, each a directory of flat files rebuilt by
+# ``manage.py import_sequences`` and swapped in through a symlink, so
+# serving workers map them read-only and share the pages.
+SEQUENCE_STORE_DIR = Path(getattr(settings, "SEQUENCE_STORE_DIR", settings.BASE_DIR / "sequences"))
+BUILD_PREFIX = "build-"
+
+MAX_SEQUENCE_QUERY = 10000
+MAX_SEQUENCE_HITS = 50
+# Share of the query's k-mers a record must contain to be reported.
+DEFAULT_MIN_SCORE = 0.3
+# Organism in NCBI FASTA descriptions: ">XP_0123.1 chalcone synthase [Plantago major]".
+ORGANISM = re.compile(r"\[([^\[\]]+)\]\s*$")
+
+
+class Alphabet(NamedTuple):
+    letters: str
+    k: int
+
+    @property
+    def size(self) -> int:
+        return len(self.letters) ** self.k
+
+
+# Residues outside the alphabet (X, B, N, gaps, stop codons) break a k-mer.
+SEQUENCE_KINDS = {
+    "protein": Alphabet("ACDEFGHIKLMNPQRSTVWY", 4),
+    "nucleotide": Alphabet("ACGT", 10),
+}
+
+
+class SequenceRecord(NamedTuple):
+    accession: str
+    description: str
+    scientific_key: str
+    label: str
+    sequence: bytes
+
+
+def _code_table(alphabet: Alphabet) -> List[int]:
+    table = [-1] * 256
+    for value, letter in enumerate(alphabet.letters):
+        table[ord(letter)] = value
+        table[ord(letter.lower())] = value
+    return table
+
+
+def kmer_codes(sequence: bytes, alphabet: Alphabet) -> set:
+    """
+    Distinct k-mers of ``sequence`` as base-``len(letters)`` integers.
+    """
+    table = _code_table(alphabet)
+    base = len(alphabet.letters)
+    high = base ** (alphabet.k - 1)
+    codes = set()
+    code = run = 0
+    for byte in sequence:
+        value = table[byte]
+        if value < 0:
+            code = run = 0
+            continue
+        code = (code % high) * base + value
+        run += 1
+        if run >= alphabet.k:
+            codes.add(code)
+    return codes
+
+
+def _write_array(path: Path, typecode: str, values):
+    with open(path, "wb") as handle:
+        array(typecode, values).tofile(handle)
+
+
+def build_store(kind: str, records: Iterable[SequenceRecord], keep: int = 2) -> Tuple[Path, int]:
+    """
+    Write ``records`` as a new store for ``kind`` and switch to it:
+    concatenated sequences and headers with their offsets, each record's
+    plant, and an inverted index from k-mer to the ascending ids of the
+    records containing it. Returns the build directory and record count.
+    """
+    alphabet = SEQUENCE_KINDS[kind]
+    SEQUENCE_STORE_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    build = SEQUENCE_STORE_DIR / f"{BUILD_PREFIX}{kind}-{stamp}-{os.getpid()}"
+    partial = build.with_name(build.name + ".partial")
+    if partial.exists():
+        shutil.rmtree(partial)
+    partial.mkdir()
+
+    sequence_offsets, header_offsets = array("Q", [0]), array("Q", [0])
+    record_plants = array("I")
+    plants: Dict[str, int] = {}
+    labels: List[List[str]] = []
+    postings: Dict[int, array] = {}
+    with open(partial / "sequences.bin", "wb") as sequences, open(
+        partial / "headers.bin", "wb"
+    ) as headers:
+        for record_id, record in enumerate(records):
+            sequence = record.sequence.upper()
+            sequences.write(sequence)
+            sequence_offsets.append(sequence_offsets[-1] + len(sequence))
+            header = f"{record.accession}\t{record.description}".encode("utf-8")
+            headers.write(header)
+            header_offsets.append(header_offsets[-1] + len(header))
+            if record.scientific_key not in plants:
+                plants[record.scientific_key] = len(labels)
+                labels.append([record.scientific_key, record.label])
+            record_plants.append(plants[record.scientific_key])
+            # Records are added in id order, so every posting list stays sorted.
+            for code in kmer_codes(sequence, alphabet):
+                postings.setdefault(code, array("I")).append(record_id)
+
+    kmer_offsets = array("Q", [0]) * (alphabet.size + 1)
+    with open(partial / "postings.bin", "wb") as handle:
+        written = 0
+        for code in range(alphabet.size):
+            ids = postings.get(code)
+            if ids is not None:
+                ids.tofile(handle)
+                written += len(ids)
+            kmer_offsets[code + 1] = written
+    _write_array(partial / "kmer_offsets.bin", "Q", kmer_offsets)
+    _write_array(partial / "sequence_offsets.bin", "Q", sequence_offsets)
+    _write_array(partial / "header_offsets.bin", "Q", header_offsets)
+    _write_array(partial / "record_plants.bin", "I", record_plants)
+    manifest = {"kind": kind, "k": alphabet.k, "records": len(record_plants), "plants": labels}
+    (partial / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(partial, build)
+
+    link = SEQUENCE_STORE_DIR / kind
+    staged_link = link.with_name(f".{link.name}.{os.getpid()}")
+    if staged_link.is_symlink() or staged_link.exists():
+        staged_link.unlink()
+    os.symlink(build.name, staged_link)
+    os.replace(staged_link, link)
+
+    old = sorted(SEQUENCE_STORE_DIR.glob(f"{BUILD_PREFIX}{kind}-*[0-9]"))[:-keep] if keep else []
+    for path in old:
+        if path != build:
+            shutil.rmtree(path)
+    return build, len(record_plants)
+
+
+def _mapped(path: Path, typecode: str):
+    """
+    Read-only memoryview of an array file, backed by the page cache.
+    """
+    if path.stat().st_size == 0:
+        return memoryview(array(typecode))
+    with open(path, "rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    return view if typecode == "B" else view.cast(typecode)
+
+
+class SequenceStore:
+    """
+    One built store, memory-mapped. Nothing is copied into the worker but
+    the manifest's plant list.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        manifest = json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+        self.alphabet = SEQUENCE_KINDS[manifest["kind"]]
+        self.plants = [tuple(plant) for plant in manifest["plants"]]
+        self.sequences = _mapped(path / "sequences.bin", "B")
+        self.sequence_offsets = _mapped(path / "sequence_offsets.bin", "Q")
+        self.headers = _mapped(path / "headers.bin", "B")
+        self.header_offsets = _mapped(path / "header_offsets.bin", "Q")
+        self.record_plants = _mapped(path / "record_plants.bin", "I")
+        self.kmer_offsets = _mapped(path / "kmer_offsets.bin", "Q")
+        self.postings = _mapped(path / "postings.bin", "I")
+
+    def __len__(self):
+        return len(self.record_plants)
+
+    def sequence(self, record_id: int) -> bytes:
+        return bytes(
+            self.sequences[self.sequence_offsets[record_id] : self.sequence_offsets[record_id + 1]]
+        )
+
+    def header(self, record_id: int) -> Tuple[str, str]:
+        raw = self.headers[self.header_offsets[record_id] : self.header_offsets[record_id + 1]]
+        accession, _, description = bytes(raw).decode("utf-8").partition("\t")
+        return accession, description
+
+    def records_with(self, code: int):
+        return self.postings[self.kmer_offsets[code] : self.kmer_offsets[code + 1]]
+
+
+_stores: Dict[str, Tuple[str, SequenceStore]] = {}
+_lock = threading.Lock()
+
+
+def open_store(kind: str) -> Optional[SequenceStore]:
+    """
+    The current store for ``kind``, reopened when an import has switched
+    the symlink to a new build; None before the first import.
+    """
+    link = SEQUENCE_STORE_DIR / kind
+    if not link.exists():
+        return None
+    target = os.path.realpath(link)
+    opened = _stores.get(kind)
+    if opened is None or opened[0] != target:
+        with _lock:
+            opened = _stores.get(kind)
+            if opened is None or opened[0] != target:
+                opened = _stores[kind] = (target, SequenceStore(Path(target)))
+    return opened[1]
+
+
+def search_sequences(
+    kind: str, query: str, limit: int = 10, min_score: float = DEFAULT_MIN_SCORE
+) -> Optional[dict]:
+    """
+    Plants with a record sharing most of the query's k-mers, best record
+    per plant, ranked by that share. Records that contain the query as a
+    substring are flagged ``exact``. None when nothing of ``kind`` has been
+    imported.
+    """
+    store = open_store(kind)
+    if store is None:
+        return None
+    codes = kmer_codes(query.encode("ascii", "ignore"), store.alphabet)
+    shared = Counter()
+    for code in codes:
+        shared.update(store.records_with(code))
+
+    # Each plant's record sharing the most k-mers; a query without any
+    # k-mer (shorter than k) matches nothing.
+    best: Dict[int, Tuple[int, int]] = {}
+    for record_id, count in shared.items():
+        if count < min_score * len(codes):
+            continue
+        plant = store.record_plants[record_id]
+        if plant not in best or count > best[plant][1]:
+            best[plant] = (record_id, count)
+
+    needle = query.upper().encode("ascii", "ignore")
+    slugs = SLUG_INDEX.get().canonical
+    hits = []
+    ranked = sorted(best.items(), key=lambda item: (-item[1][1], item[1][0]))
+    for plant, (record_id, count) in ranked[:limit]:
+        scientific_key, label = store.plants[plant]
+        accession, description = store.header(record_id)
+        sequence = store.sequence(record_id)
+        hits.append(
+            {
+                "plant": label,
+                "scientific_key": scientific_key,
+                "slug": slugs.get(scientific_key),
+                "score": round(count / len(codes), 4),
+                "record": {
+                    "accession": accession,
+                    "description": description,
+                    "length": len(sequence),
+                    "exact": needle in sequence,
+                },
+            }
+        )
+    return {
+        "kind": kind,
+        "k": store.alphabet.k,
+        "query_kmers": len(codes),
+        "records": len(store),
+        "candidates": len(shared),
+        "hits": hits,
+    }
+
+
+def _organism(description: str) -> str:
+    found = ORGANISM.search(description)
+    return found.group(1) if found else ""
+
+
+def match_fasta_organisms(
+    paths: Iterable[Path], plant: Optional[str] = None
+) -> Dict[str, Optional[tuple]]:
+    """
+    Every organism named in the FASTA files mapped to its curated plant
+    (``match_names`` result, None when MPMDB does not curate it), or just
+    ``plant`` if given. A cheap first pass reading header lines only, so
+    no sequence is held while the names are resolved in batches.
+    """
+    if plant is not None:
+        return {plant: match_names([plant])[0]}
+    organisms = set()
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            for line in handle:
+                if line.startswith(">"):
+                    organisms.add(_organism(line[1:].strip()))
+    matches = {}
+    for chunk in chunked(sorted(organisms)):
+        matches.update(zip(chunk, match_names(chunk)))
+    return matches
+
+
+def read_fasta(
+    paths: Iterable[Path],
+    matches: Dict[str, Optional[tuple]],
+    skipped: Counter,
+    plant: Optional[str] = None,
+) -> Iterator[SequenceRecord]:
+    """
+    Stream the records of FASTA files parsed with Biopython, matched to
+    curated plants through ``matches`` (see ``match_fasta_organisms``) by
+    ``plant`` if given, else by the ``[Organism]`` of their description.
+    Records of plants MPMDB does not curate are counted in ``skipped`` as
+    the generator is consumed. Needs Biopython (``SeqIO`` is None without it).
+    """
+    for path in paths:
+        for entry in SeqIO.parse(str(path), "fasta"):
+            organism = plant if plant is not None else _organism(entry.description)
+            match = matches.get(organism)
+            if match is None:
+                skipped[organism or "(no organism)"] += 1
+                continue
+            _, _, description = entry.description.partition(" ")
+            yield SequenceRecord(
+                entry.id, description, match[0], match[1], str(entry.seq).encode("ascii", "ignore")
+            )
@@ -0,0 +1,171 @@
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional
+
+from django.db.models import Count
+
+from phytochem.models import med_phytochem
+
+from .fuzzy import COMPOUND, PLANT
+from .names import normalize_name, plant_key, split_aliases
+from .resolve import DATASET_MODELS
+from .versioning import VersionedIndex
+
+
+MAX_SUGGESTIONS = 10
+# Prefixes up to this length match hundreds of names; their completions are
+# ranked once at build time instead of on every keystroke.
+PRECOMPUTED_PREFIX_LENGTH = 2
+KINDS = (None, PLANT, COMPOUND)
+
+
+class Completion(NamedTuple):
+    key: str
+    kind: str
+    label: str
+    detail: str
+    weight: int
+
+
+class PrefixIndex:
+    """
+    Sorted array of normalised names. A prefix maps to one contiguous slice
+    found by binary search; entries carry a global popularity rank so a
+    slice is ordered without re-reading weights. Precomputed short-prefix
+    results are kept as arrays of entry positions, not response dicts.
+    """
+
+    def __init__(self, completions: List[Completion]):
+        self.completions = sorted(completions)
+        self.keys = [completion.key for completion in self.completions]
+        by_weight = sorted(
+            range(len(self.completions)),
+            key=lambda i: (
+                -self.completions[i].weight,
+                len(self.completions[i].label),
+                self.completions[i].label.lower(),
+            ),
+        )
+        self.rank = array("I", [0]) * len(by_weight)
+        for position, index in enumerate(by_weight):
+            self.rank[index] = position
+
+        self.top: Dict[tuple, array] = {}
+        prefixes = {
+            key[:length]
+            for key in self.keys
+            for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1)
+            if len(key) >= length
+        }
+        for prefix in prefixes:
+            for kind in KINDS:
+                self.top[(prefix, kind)] = array("I", self._rank_slice(prefix, kind))
+
+    def _slice(self, prefix: str):
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+        return start, end
+
+    def _rank_slice(self, prefix: str, kind: Optional[str]) -> List[int]:
+        """
+        Positions of the best ``MAX_SUGGESTIONS`` entries under ``prefix``,
+        one per label.
+        """
+        start, end = self._slice(prefix)
+        candidates = sorted(
+            (
+                index
+                for index in range(start, end)
+                if kind is None or self.completions[index].kind == kind
+            ),
+            key=self.rank.__getitem__,
+        )
+        results = []
+        seen = set()
+        for index in candidates:
+            label = self.completions[index].label.lower()
+            if label in seen:
+                continue
+            seen.add(label)
+            results.append(index)
+            if len(results) == MAX_SUGGESTIONS:
+                break
+        return results
+
+    def complete(self, query: str, kind: Optional[str] = None, limit: int = MAX_SUGGESTIONS):
+        prefix = normalize_name(query)
+        if not prefix:
+            return []
+        ranked = self.top.get((prefix, kind))
+        if ranked is None:
+            ranked = self._rank_slice(prefix, kind)
+        return [
+            {
+                "label": self.completions[index].label,
+                "kind": self.completions[index].kind,
+                "detail": self.completions[index].detail,
+            }
+            for index in ranked[:limit]
+        ]
+
+
+def build_prefix_index() -> PrefixIndex:
+    """
+    Completions for every common name, alias, scientific name and compound,
+    weighted by how many curated rows mention the plant or compound.
+    """
+    plant_rows = Counter()
+    names = {}
+    for model in DATASET_MODELS:
+        grouped = (
+            model.objects.values_list("Plant_Name", "Scientific_Name")
+            .annotate(rows=Count("id"))
+            .order_by()
+        )
+        for plant_name, scientific_name, rows in grouped:
+            normalized = normalize_name(scientific_name)
+            if not normalized:
+                continue
+            scientific_key = plant_key(scientific_name)
+            plant_rows[scientific_key] += rows
+            scientific_label = sys.intern(scientific_name.strip())
+            for alias in list(split_aliases(plant_name)) + list(split_aliases(scientific_name)):
+                key = normalize_name(alias)
+                if key:
+                    detail = scientific_label if key != normalized else ""
+                    names.setdefault((key, alias), (scientific_key, detail))
+
+    completions = [
+        Completion(key, PLANT, label, detail, plant_rows[scientific_key])
+        for (key, label), (scientific_key, detail) in names.items()
+    ]
+
+    compound_rows = Counter()
+    compound_labels = {}
+    grouped = (
+        med_phytochem.objects.values_list("Phytochemicals")
+        .annotate(rows=Count("id"))
+        .order_by()
+    )
+    for compound, rows in grouped:
+        key = normalize_name(compound)
+        if key:
+            compound_rows[key] += rows
+            compound_labels.setdefault(key, compound.strip())
+    completions += [
+        Completion(key, COMPOUND, compound_labels[key], "", rows)
+        for key, rows in compound_rows.items()
+    ]
+    return PrefixIndex(completions)
+
+
+PREFIX_INDEX = VersionedIndex(build_prefix_index)
+
+
+def suggest(query: str, kind: Optional[str] = None, limit: int = MAX_SUGGESTIONS):
+    """
+    Top completions for a search-box prefix, most curated records first.
+    """
+    return PREFIX_INDEX.get().complete(query, kind=kind, limit=limit)
@@ -0,0 +1,184 @@
+import csv
+import random
+from collections import defaultdict
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, List
+
+from django.conf import settings
+
+from .names import split_aliases
+
+
+# Curated CSVs, keyed by the dataset each one loads.
+DATASET_FILES = {
+    "basic": "basic_info.csv",
+    "classification": "class.csv",
+    "genome": "genome.csv",
+    "proteome": "proteome.csv",
+    "transcript": "trans.csv",
+    "phyto": "phyto.csv",
+}
+COUNT_FIELDS = {
+    "genome": ["Nucleotide", "Genome_Sequence", "mRNA_Sequence"],
+    "proteome": ["Protein_Seq", "Identical_Protein_Groups", "Protein"],
+    "transcript": ["SRA", "DNA", "RNA", "BioProject", "BioSample"],
+    "phyto": ["Activity_Count"],
+}
+
+# Synthetic taxonomy IDs start well above the curated ones.
+SYNTHETIC_TAXONOMY_BASE = 90_000_000
+TAXONOMY_LINK = "https://www.ncbi.nlm.nih.gov/datasets/taxonomy/{}/"
+
+EPITHET_SYLLABLES = [
+    "al", "ar", "bel", "ca", "cor", "den", "flo", "gra", "lan", "li", "ma",
+    "mon", "ner", "or", "pha", "ra", "ri", "sa", "ta", "ti", "ul", "ve", "vi",
+]
+EPITHET_ENDINGS = ["ensis", "ata", "osa", "ica", "ifolia", "ina", "oides", "ella", "iana"]
+
+# Compounds a synthetic plant keeps from its template, and extra compounds it
+# borrows from other plants, so the same compound recurs across plants.
+KEEP_COMPOUND = 0.9
+MAX_BORROWED_COMPOUNDS = 3
+
+
+def _read(path: Path):
+    with path.open(encoding="utf-8-sig", newline="") as handle:
+        reader = csv.DictReader(handle)
+        return reader.fieldnames, list(reader)
+
+
+def _int(value) -> int:
+    try:
+        return int(str(value).replace(",", "").strip() or 0)
+    except ValueError:
+        return 0
+
+
+class Templates:
+    """
+    The curated rows grouped by plant. Every synthetic plant copies one
+    curated plant's rows, so dataset coverage, alias counts and text lengths
+    follow the real distribution.
+    """
+
+    def __init__(self, source: Path):
+        self.fieldnames: Dict[str, List[str]] = {}
+        self.rows: Dict[str, List[dict]] = {}
+        by_plant = defaultdict(lambda: defaultdict(list))
+        for dataset, filename in DATASET_FILES.items():
+            fieldnames, rows = _read(source / filename)
+            self.fieldnames[dataset] = fieldnames
+            self.rows[dataset] = rows
+            for row in rows:
+                by_plant[row["Scientific_Name"].strip()][dataset].append(row)
+        self.names = sorted(by_plant)
+        self.plants = [dict(by_plant[name]) for name in self.names]
+        self.compounds = self.rows["phyto"]
+        self.name_words = sorted(
+            {
+                word
+                for row in self.rows["classification"] + self.rows["basic"]
+                for alias in split_aliases(row["Plant_Name"])
+                for word in alias.split()
+                if word.isalpha() and len(word) > 2
+            }
+        )
+
+
+class SyntheticPlant:
+    """
+    Names and taxonomy ID of one synthetic plant: the template's genus with
+    a new epithet, and as many common names as the template has aliases.
+    """
+
+    def __init__(self, index: int, template: dict, rng: random.Random, used: set, words):
+        first = next(iter(rows[0] for rows in template.values()))
+        self.template_scientific = first["Scientific_Name"].strip()
+        self.template_label = next(split_aliases(first["Plant_Name"]), "")
+        genus = self.template_scientific.split()[0]
+
+        epithet = ""
+        while not epithet or f"{genus} {epithet}" in used:
+            stem = "".join(rng.choice(EPITHET_SYLLABLES) for _ in range(rng.randint(2, 3)))
+            epithet = f"{stem}{rng.choice(EPITHET_ENDINGS)}"
+        self.genus = genus
+        self.epithet = epithet
+        self.scientific_name = f"{genus} {epithet}"
+        used.add(self.scientific_name)
+
+        alias_count = max(1, len(list(split_aliases(first["Plant_Name"]))))
+        aliases = [
+            " ".join(rng.choice(words).capitalize() for _ in range(rng.randint(1, 2)))
+            for _ in range(alias_count)
+        ]
+        self.label = aliases[0]
+        self.plant_name = " / ".join(aliases)
+        self.taxonomy_id = SYNTHETIC_TAXONOMY_BASE + index
+
+    def rewrite(self, text: str) -> str:
+        """
+        Template free text with the template plant's names swapped for ours.
+        """
+        if not text:
+            return text
+        text = text.replace(self.template_scientific, self.scientific_name)
+        if self.template_label:
+            text = text.replace(self.template_label, self.label)
+        return text
+
+
+def _synthetic_row(dataset, row, plant, rng):
+    row = {key: plant.rewrite(value) for key, value in row.items()}
+    row["Plant_Name"] = plant.plant_name
+    row["Scientific_Name"] = plant.scientific_name
+    for field in COUNT_FIELDS.get(dataset, ()):
+        row[field] = round(_int(row[field]) * rng.uniform(0.5, 1.5))
+    if dataset == "classification":
+        row["NCBI_Taxonomy_ID"] = plant.taxonomy_id
+        row["Genus"] = plant.genus
+        row["Species"] = plant.epithet
+    if (row.get("NCBI_link") or "").startswith("http"):
+        row["NCBI_link"] = TAXONOMY_LINK.format(plant.taxonomy_id)
+    return row
+
+
+def generate(output: Path, scale: float, seed: int = 0, source: Path = None) -> Dict[str, int]:
+    """
+    Write the six CSVs at ``scale`` times the curated size into ``output``:
+    the curated rows first, then synthetic plants cloned from randomly
+    chosen curated ones. Rows are streamed, so memory stays flat at any
+    scale, and the same seed always produces the same files. Returns the
+    row count written per file.
+    """
+    if scale < 1:
+        raise ValueError("scale must be at least 1")
+    templates = Templates(Path(source or settings.BASE_DIR))
+    output.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    used = set(templates.names)
+    synthetic_count = round(len(templates.plants) * (scale - 1))
+    written = defaultdict(int)
+
+    with ExitStack() as stack:
+        writers = {}
+        for dataset, filename in DATASET_FILES.items():
+            handle = stack.enter_context(
+                (output / filename).open("w", encoding="utf-8", newline="")
+            )
+            writers[dataset] = csv.DictWriter(handle, fieldnames=templates.fieldnames[dataset])
+            writers[dataset].writeheader()
+            writers[dataset].writerows(templates.rows[dataset])
+            written[filename] += len(templates.rows[dataset])
+
+        for index in range(synthetic_count):
+            template = rng.choice(templates.plants)
+            plant = SyntheticPlant(index, template, rng, used, templates.name_words)
+            for dataset, rows in template.items():
+                if dataset == "phyto":
+                    rows = [row for row in rows if rng.random() < KEEP_COMPOUND]
+                    rows += rng.sample(templates.compounds, rng.randint(0, MAX_BORROWED_COMPOUNDS))
+                for row in rows:
+                    writers[dataset].writerow(_synthetic_row(dataset, row, plant, rng))
+                written[DATASET_FILES[dataset]] += len(rows)
+    return dict(written)
@@ -0,0 +1,136 @@
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from django.core.cache import caches
+
+
+class Throttled(Exception):
+    """
+    Raised inside a coalesced call to abandon it without caching a result.
+    """
+
+
+def cache_key(*parts) -> str:
+    """
+    Build a backend-safe cache key (memcached rejects spaces and long keys).
+    """
+    digest = hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+    return f"{parts[0]}:{digest}"
+
+
+def take_token(
+    cache_alias: str,
+    bucket: str,
+    capacity: float,
+    refill_per_second: float,
+) -> bool:
+    """
+    Token-bucket check stored in the Django cache so every worker sharing
+    the cache backend draws from the same bucket. Returns False when the
+    bucket is empty. The read-modify-write is not atomic, which lets a
+    handful of extra requests through under contention; that is acceptable
+    for load shedding.
+    """
+    cache = caches[cache_alias]
+    key = cache_key("bucket", bucket)
+    now = time.time()
+    state = cache.get(key)
+    if state is None:
+        tokens, stamp = float(capacity), now
+    else:
+        tokens, stamp = state
+    tokens = min(float(capacity), tokens + (now - stamp) * refill_per_second)
+
+    # Once a bucket would be full again the entry can expire.
+    ttl = int(capacity / refill_per_second) + 1 if refill_per_second else None
+    if tokens < 1:
+        cache.set(key, (tokens, now), ttl)
+        return False
+    cache.set(key, (tokens - 1, now), ttl)
+    return True
+
+
+class _Call:
+    __slots__ = ("event", "value")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one execution.
+
+    Threads in the same worker wait on the leader's in-flight call. Other
+    workers see a short-lived lock in the shared cache and poll for the
+    leader's result instead of repeating the call. Results (including
+    empty ones) are cached so later requests skip the call entirely.
+    """
+
+    def __init__(
+        self,
+        cache_alias: str,
+        prefix: str,
+        result_timeout: int,
+        empty_timeout: int,
+        wait_timeout: float,
+        poll_interval: float = 0.1,
+    ):
+        self.cache_alias = cache_alias
+        self.prefix = prefix
+        self.result_timeout = result_timeout
+        self.empty_timeout = empty_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Optional[object]]):
+        cache = caches[self.cache_alias]
+        result_key = cache_key(self.prefix, "result", key)
+        cached = cache.get(result_key)
+        if cached is not None:
+            return cached[0]
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait(self.wait_timeout)
+            return call.value
+
+        try:
+            call.value = self._run_shared(cache, key, result_key, fn)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.value
+
+    def _run_shared(self, cache, key: str, result_key: str, fn):
+        lock_key = cache_key(self.prefix, "lock", key)
+        if not cache.add(lock_key, 1, int(self.wait_timeout) + 1):
+            # Another worker is already fetching; wait for its result.
+            deadline = time.monotonic() + self.wait_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                cached = cache.get(result_key)
+                if cached is not None:
+                    return cached[0]
+            return None
+
+        try:
+            value = fn()
+            timeout = self.result_timeout if value is not None else self.empty_timeout
+            cache.set(result_key, (value,), timeout)
+        except Throttled:
+            value = None
+        finally:
+            cache.delete(lock_key)
+        return value
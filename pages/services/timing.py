@@ -0,0 +1,106 @@
+import time
+from collections import Counter
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Timer of the request being served on this thread, set by
+# ``ServerTimingMiddleware`` only when ``REQUEST_TIMING`` is enabled.
+_current: ContextVar[Optional["RequestTimer"]] = ContextVar("request_timer", default=None)
+_NO_PHASE = nullcontext()
+
+
+class RequestTimer:
+    """
+    Wall time per named phase and event counters for one request. Also a
+    database execute wrapper, so SQL time and query count land in the
+    ``db`` phase.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total_ms = 0.0
+        self.phases: Dict[str, List[float]] = {}
+        self.counters: Counter = Counter()
+
+    def add(self, name: str, elapsed_ms: float):
+        entry = self.phases.setdefault(name, [0.0, 0])
+        entry[0] += elapsed_ms
+        entry[1] += 1
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add("db", (time.perf_counter() - started) * 1000)
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+
+    def header(self) -> str:
+        """
+        ``Server-Timing`` value: one metric per phase, cache counters as a
+        description, and the total.
+        """
+        metrics = []
+        for name, (elapsed, calls) in self.phases.items():
+            desc = f"queries={calls}" if name == "db" else f"calls={calls}"
+            metrics.append(f'{name};dur={elapsed:.2f};desc="{desc}"')
+        if self.counters:
+            desc = " ".join(f"{name}={count}" for name, count in sorted(self.counters.items()))
+            metrics.append(f'cache;desc="{desc}"')
+        metrics.append(f"total;dur={self.total_ms:.2f}")
+        return ", ".join(metrics)
+
+    def record(self) -> dict:
+        db_ms, queries = self.phases.get("db", (0.0, 0))
+        return {
+            "total_ms": round(self.total_ms, 2),
+            "db_ms": round(db_ms, 2),
+            "queries": queries,
+            "phases": {
+                name: round(elapsed, 2) for name, (elapsed, _) in self.phases.items() if name != "db"
+            },
+            "counters": dict(self.counters),
+        }
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "started")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, (time.perf_counter() - self.started) * 1000)
+
+
+def start_timer():
+    timer = RequestTimer()
+    return timer, _current.set(timer)
+
+
+def stop_timer(token):
+    _current.reset(token)
+
+
+def phase(name: str):
+    """
+    Context manager timing ``name`` for the current request; a shared no-op
+    when timing is disabled.
+    """
+    timer = _current.get()
+    if timer is None:
+        return _NO_PHASE
+    return _Phase(timer, name)
+
+
+def count(name: str):
+    timer = _current.get()
+    if timer is not None:
+        timer.counters[name] += 1
@@ -0,0 +1,79 @@
+import threading
+import time
+from typing import Callable, Generic, NamedTuple, Optional, TypeVar
+
+from django.conf import settings
+from django.db import transaction
+
+from ..models import DatasetVersion
+from .timing import phase
+
+
+# Workers re-read the version row at most this often.
+VERSION_CHECK_SECONDS = getattr(settings, "DATASET_VERSION_CHECK_SECONDS", 5)
+
+
+class Version(NamedTuple):
+    number: int
+    updated_at: Optional[object]
+
+
+_cached = {"version": None, "checked": 0.0}
+
+
+def dataset_version() -> Version:
+    """
+    Current dataset version, re-read from the database at most once per
+    ``VERSION_CHECK_SECONDS`` in each process.
+    """
+    now = time.monotonic()
+    cached = _cached["version"]
+    if cached is not None and now - _cached["checked"] < VERSION_CHECK_SECONDS:
+        return cached
+
+    row = DatasetVersion.objects.order_by("pk").values("version", "updated_at").first()
+    version = Version(row["version"], row["updated_at"]) if row else Version(0, None)
+    _cached.update(version=version, checked=now)
+    return version
+
+
+def expire_dataset_version():
+    """
+    Forget the cached version so the next read hits the database.
+    """
+    _cached.update(version=None, checked=0.0)
+
+
+@transaction.atomic
+def bump_dataset_version() -> int:
+    row, _ = DatasetVersion.objects.select_for_update().get_or_create(pk=1)
+    row.version += 1
+    row.save()
+    expire_dataset_version()
+    return row.version
+
+
+T = TypeVar("T")
+
+
+class VersionedIndex(Generic[T]):
+    """
+    Lazily built in-memory structure that is rebuilt once per dataset
+    version, shared by all threads of a worker.
+    """
+
+    def __init__(self, builder: Callable[[], T]):
+        self.builder = builder
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._value: Optional[T] = None
+
+    def get(self) -> T:
+        number = dataset_version().number
+        if self._version != number:
+            with self._lock:
+                if self._version != number:
+                    with phase("index-build"):
+                        self._value = self.builder()
+                    self._version = number
+        return self._value
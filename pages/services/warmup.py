@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from typing import Dict
+
+from django.conf import settings
+from django.db import connection, connections
+from django.test import RequestFactory
+from django.urls import resolve
+
+from classification.models import TaxonNode
+
+from ..models import PlantAlias, PlantDossier
+from .catalogue import CATALOGUE_COUNTS
+from .dossier import SLUG_INDEX
+from .facets import FACET_INDEX
+from .fuzzy import TRIGRAM_INDEX
+from .plantbot import KNOWLEDGE_BASE
+from .resolve import DATASET_MODELS
+from .suggest import PREFIX_INDEX
+from .versioning import VersionedIndex
+
+logger = logging.getLogger("pages.warmup")
+
+# Pages rendered once so their templates are compiled and, where the view
+# caches its response, the cache is filled. The hottest dossier is added
+# at warm-up time.
+WARM_PATHS = [
+    "/home.html",
+    "/intro.html",
+    "/basic.html",
+    "/classification.html",
+    "/genomes.html",
+    "/proteome.html",
+    "/transcriptom.html",
+    "/metabolites.html",
+    "/taxonomy.html",
+    "/stats.html",
+    "/compare.html",
+    "/plantbot.html",
+]
+# Tables read end to end so their pages are in the OS page cache (and the
+# read-only mmap) before the first search scans them.
+WARM_MODELS = [*DATASET_MODELS, PlantDossier, PlantAlias, TaxonNode]
+FETCH_SIZE = 2000
+
+_ready = threading.Event()
+_lock = threading.Lock()
+_state = {"thread": None, "stages": {}}
+
+
+def indexes() -> Dict[str, VersionedIndex]:
+    """
+    The in-process indexes every worker serves from, by name.
+    """
+    return {
+        "plantbot-aliases": KNOWLEDGE_BASE.aliases,
+        "slugs": SLUG_INDEX,
+        "trigrams": TRIGRAM_INDEX,
+        "prefixes": PREFIX_INDEX,
+        "facets": FACET_INDEX,
+        "catalogue": CATALOGUE_COUNTS,
+    }
+
+
+def warm_indexes():
+    """
+    Build every index for the current dataset version. Run in the server's
+    master process before forking, so workers start with them in shared
+    memory instead of each building its own copy on first use.
+    """
+    for index in indexes().values():
+        index.get()
+
+
+def warm_database():
+    with connection.cursor() as cursor:
+        for model in WARM_MODELS:
+            cursor.execute(f'SELECT * FROM "{model._meta.db_table}"')
+            while cursor.fetchmany(FETCH_SIZE):
+                pass
+
+
+def warm_pages():
+    """
+    Render ``WARM_PATHS`` and the first dossier straight through their
+    views, skipping the middleware so warm-up is not counted as traffic.
+    """
+    paths = list(WARM_PATHS)
+    slug = PlantDossier.objects.order_by("slug").values_list("slug", flat=True).first()
+    if slug:
+        paths.append(f"/plant/{slug}/")
+    host = next((host for host in settings.ALLOWED_HOSTS if "*" not in host), "localhost")
+    factory = RequestFactory(HTTP_HOST=host)
+    for path in paths:
+        match = resolve(path)
+        response = match.func(factory.get(path), *match.args, **match.kwargs)
+        if hasattr(response, "render") and not response.is_rendered:
+            response.render()
+
+
+STAGES = [
+    ("indexes", warm_indexes),
+    ("database", warm_database),
+    ("pages", warm_pages),
+]
+
+
+def warm_up():
+    """
+    Everything a cold worker would otherwise do on its first requests.
+    Marks the process ready once every stage has run.
+    """
+    for name, stage in STAGES:
+        started = time.perf_counter()
+        stage()
+        _state["stages"][name] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info("Warm-up %s: %.1f ms", name, _state["stages"][name])
+    _ready.set()
+
+
+def _warm_up_in_background():
+    try:
+        warm_up()
+    except Exception:
+        logger.exception("Warm-up failed; the next readiness check retries it.")
+        with _lock:
+            _state["thread"] = None
+    finally:
+        connections.close_all()
+
+
+def start_warm_up():
+    """
+    Run ``warm_up`` in a background thread unless it is running or done.
+    """
+    with _lock:
+        if _ready.is_set() or _state["thread"] is not None:
+            return
+        _state["thread"] = threading.Thread(
+            target=_warm_up_in_background, name="warm-up", daemon=True
+        )
+        _state["thread"].start()
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def warm_up_stages() -> Dict[str, float]:
+    """
+    Milliseconds spent in each finished warm-up stage.
+    """
+    return dict(_state["stages"])
@@ -0,0 +1,46 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from ..services.assets import load_variant_manifest
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_variant(path, width, fmt="webp"):
+    """
+    URL of the largest built variant of ``path`` no wider than ``width``,
+    or of its canonical image when no variant has been built.
+    """
+    entry = load_variant_manifest().get(path)
+    variants = entry["formats"].get(fmt) if entry else None
+    if not variants:
+        return static(entry.get("source", path) if entry else path)
+    fitting = [int(w) for w in variants if int(w) <= int(width)]
+    chosen = max(fitting) if fitting else min(int(w) for w in variants)
+    return static(variants[str(chosen)])
+
+
+@register.simple_tag
+def responsive_image(path, alt="", sizes="100vw", **attrs):
+    """
+    ``<picture>`` with AVIF and WebP ``srcset`` sources for every built width,
+    falling back to the canonical image.
+    """
+    entry = load_variant_manifest().get(path)
+    sources = []
+    for fmt, variants in (entry["formats"].items() if entry else ()):
+        srcset = ", ".join(
+            f"{static(name)} {width}w"
+            for width, name in sorted(variants.items(), key=lambda item: int(item[0]))
+        )
+        sources.append((f"image/{fmt}", srcset, sizes))
+    extra = format_html_join("", ' {}="{}"', attrs.items())
+    return format_html(
+        '<picture>{}<img src="{}" alt="{}" loading="lazy"{} /></picture>',
+        format_html_join("", '<source type="{}" srcset="{}" sizes="{}" />', sources),
+        static(entry.get("source", path) if entry else path),
+        alt,
+        extra,
+    )
@@ -0,0 +1,22 @@
+from django.template.backends.django import DjangoTemplates, Template
+
+from .services.timing import phase
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with phase("template"):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    Django template backend that reports render time to the request timer.
+    Installed instead of ``DjangoTemplates`` when ``REQUEST_TIMING`` is set.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
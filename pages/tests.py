@@ -1,3 +1,1525 @@
-from django.test import TestCase
+import importlib
+import io
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import types
+from array import array
+from collections import Counter, defaultdict
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.template import Context, Template
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from basic.models import med_basic
+from classification.models import TaxonNode, med_class
+from classification.taxonomy import rebuild_taxonomy_tree
+from geno.models import med_geno
+from phytochem.models import med_phytochem
+from proteom.models import med_proteom
+from transcriptom.models import med_transcriptom
+
+from .models import DatasetVersion, EncyclopediaSummary, PlantDossier
+from .services import assets, plantbot, warmup
+from .services.benchmark import (
+    LOADERS,
+    Measurement,
+    compare,
+    load_csv,
+    missing_from_baseline,
+)
+from .services.compare import compare_plants
+from .services.dossier import (
+    DOSSIER_DATASETS,
+    LEGACY_DOSSIERS,
+    LEGACY_PAGES,
+    rebuild_plant_dossiers,
+)
+from .services.enrichment import record_miss, run_enrichment, stored_summary
+from .services.facets import rebuild_facets
+from .services.fuzzy import PLANT, TRIGRAM_INDEX, did_you_mean
+from .services.loadtest import Sample, WikipediaStub, percentile, summarize
+from .services.memory import deep_size
+from .services.metrics import (
+    REQUEST_QUERIES,
+    REQUESTS,
+    REQUESTS_IN_PROGRESS,
+    MmapValues,
+    exposition,
+)
+from .services.omics import rebuild_omics_summary
+from .services.plantbot import NO_MATCH_REPLY, generate_answer, lookup_wiki_summary
+from .services.query_plans import CASES, PLAN_DIR, capture, problems, render
+from .services.releases import publish_release, reopen_if_republished
+from .services.resolve import (
+    INPUT_BINOMIAL_CONFIDENCE,
+    MAX_RESOLVE_NAMES,
+    match_names,
+    rebuild_alias_table,
+    resolve_names,
+)
+from .services.sequences import (
+    SeqIO,
+    SequenceRecord,
+    build_store,
+    match_fasta_organisms,
+    read_fasta,
+    search_sequences,
+)
+from .services.suggest import PREFIX_INDEX
+from .services.synthetic import DATASET_FILES, generate
+from .services.throttling import SingleFlight, Throttled, take_token
+from .services.timing import phase
+from .services.versioning import VersionedIndex, bump_dataset_version, dataset_version
+from .services.warmup import indexes, warm_indexes
+from .storage import AssetStorage
+
+
+LOCMEM_CACHES = {
+    alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": alias}
+    for alias in ("default", "plantbot", "responses")
+}
+
+# Every test class rolls the version row back, but the in-process indexes
+# and the response cache keyed by its number outlive the class.
+_VERSION_BLOCKS = itertools.count(1000, 1000)
+
+
+def _bump_dataset_version():
+    """
+    ``bump_dataset_version`` past any number an earlier test class used.
+    """
+    DatasetVersion.objects.update_or_create(pk=1, defaults={"version": next(_VERSION_BLOCKS)})
+    return bump_dataset_version()
+
+
+def _create_plant(index):
+    plant_name = f"Testplant {index}"
+    scientific_name = f"Plantago testensis{index}"
+    med_class.objects.create(
+        Plant_Name=plant_name,
+        Scientific_Name=scientific_name,
+        NCBI_Taxonomy_ID=str(900000 + index),
+        Order="Lamiales",
+        Family="Plantaginaceae",
+        Genus="Plantago",
+        Species=f"testensis{index}",
+    )
+    med_basic.objects.create(
+        Plant_Name=plant_name,
+        Scientific_Name=scientific_name,
+        Description="",
+        Parts_Used="Leaves",
+        Weather_Conditions_Required_to_Grow="",
+        Chemical_Properties="",
+        Morphological_Features="",
+        Medicinal_Value="",
+        Worldwide_regions_Support_their_Growth="",
+    )
+    med_geno.objects.create(
+        Plant_Name=plant_name,
+        Scientific_Name=scientific_name,
+        Nucleotide=index,
+        Genome_Sequence=index,
+        mRNA_Sequence=index,
+    )
+    med_proteom.objects.create(
+        Plant_Name=plant_name,
+        Scientific_Name=scientific_name,
+        Protein_Seq=index,
+        Identical_Protein_Groups=index,
+        Protein=index,
+    )
+    med_transcriptom.objects.create(
+        Plant_Name=plant_name,
+        Scientific_Name=scientific_name,
+        SRA=index,
+        BioProject=index,
+        BioSample=index,
+    )
+    for compound in ("Aucubin", "Verbascoside"):
+        med_phytochem.objects.create(
+            Plant_Name=plant_name,
+            Scientific_Name=scientific_name,
+            Phytochemicals=compound,
+            Activity_Count=index,
+        )
+    return scientific_name
+
+
+class CompareQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.names = [_create_plant(index) for index in range(1, 9)]
+        rebuild_alias_table()
+        rebuild_plant_dossiers()
+
+    def test_query_count_is_constant_in_plant_count(self):
+        with self.assertNumQueries(2):
+            single = compare_plants(self.names[:1])
+        with self.assertNumQueries(2):
+            many = compare_plants(self.names)
+
+        self.assertEqual(len(single["plants"]), 1)
+        self.assertEqual(len(many["plants"]), 8)
+        genome_row = many["matrix"][0]
+        self.assertEqual(genome_row["metric"], "Nucleotide")
+        self.assertEqual(genome_row["values"], list(range(1, 9)))
+        self.assertEqual(
+            [compound["name"] for compound in many["plants"][0]["top_compounds"]],
+            ["Aucubin", "Verbascoside"],
+        )
+
+    def test_taxonomy_ids_resolve_through_the_alias_table(self):
+        with self.assertNumQueries(2):
+            result = compare_plants(["900001", "900002", "900003"])
+        self.assertEqual(
+            [plant["taxonomy"]["Genus"] for plant in result["plants"]],
+            ["Plantago"] * 3,
+        )
+
+    def test_unknown_plant_is_reported_unmatched(self):
+        result = compare_plants(["Nonexistent plantus"])
+        self.assertFalse(result["plants"][0]["matched"])
+        self.assertIsNone(result["plants"][0]["genome"])
+
+
+class ResolveApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(1, 4):
+            _create_plant(index)
+        rebuild_alias_table()
+        rebuild_plant_dossiers()
+
+    def _post(self, body):
+        return self.client.post("/api/resolve/", body, content_type="application/json")
+
+    def test_one_row_per_input_in_order(self):
+        names = ["Testplant 2", "nothing here", "Testplant 2", "900001"]
+        response = self._post({"names": names})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([row["input"] for row in results], names)
+        self.assertEqual([row["matched"] for row in results], [True, False, True, True])
+        self.assertEqual(results[0]["scientific_name"], "Plantago testensis2")
+        self.assertEqual(results[0], results[2])
+        self.assertEqual((results[1]["confidence"], results[1]["match_type"]), (0.0, None))
+
+    def test_confidence_per_match_type(self):
+        matches = match_names(
+            ["900003", "Plantago Testensis1", "Testplant 2", "Plantago testensis3 L.", "900999"]
+        )
+        self.assertEqual(
+            [match and (match[0], match[2], match[3]) for match in matches],
+            [
+                ("plantago testensis3", 1.0, "taxonomy_id"),
+                ("plantago testensis1", 1.0, "scientific"),
+                ("plantago testensis2", 1.0, "common"),
+                # Only the binomial matches once the authority is dropped.
+                ("plantago testensis3", INPUT_BINOMIAL_CONFIDENCE, "binomial"),
+                None,
+            ],
+        )
+
+    def test_query_count_is_constant_past_one_chunk(self):
+        known = ["Testplant 1", "900002", "Plantago testensis3"]
+        for size in (600, MAX_RESOLVE_NAMES):
+            names = known + [f"unknownplant{index}" for index in range(size - len(known))]
+            # Two chunked alias lookups and one dossier query.
+            with self.assertNumQueries(3):
+                results = resolve_names(names)
+            self.assertEqual(len(results), size)
+            self.assertEqual(sum(row["matched"] for row in results), 3)
+
+    def test_bad_requests_are_rejected(self):
+        too_many = {"names": ["Testplant 1"] * (MAX_RESOLVE_NAMES + 1)}
+        for body in (["Testplant 1"], {"names": "Testplant 1"}, {"names": []}, too_many):
+            with self.subTest(body=str(body)[:40]):
+                self.assertEqual(self._post(body).status_code, 400)
+        response = self.client.post("/api/resolve/", "{", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get("/api/resolve/").status_code, 405)
+
+
+class OmicsSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(1, 11):
+            _create_plant(index)
+        # A genome-only plant reporting no nucleotide records.
+        med_geno.objects.create(
+            Plant_Name="Genome only",
+            Scientific_Name="Solus genomicus",
+            Nucleotide=0,
+            Genome_Sequence=0,
+            mRNA_Sequence=7,
+        )
+        rebuild_omics_summary()
+
+    def test_parse_count_reads_grouped_digits(self):
+        for app, migration in (
+            ("geno", "0003_integer_counts"),
+            ("proteom", "0004_integer_counts"),
+            ("transcriptom", "0004_integer_counts"),
+        ):
+            parse_count = importlib.import_module(f"{app}.migrations.{migration}").parse_count
+            with self.subTest(app=app):
+                self.assertEqual(parse_count("4,64,380"), 464380)
+                self.assertEqual(parse_count(" 74,640 "), 74640)
+                self.assertEqual(parse_count(12), 12)
+                for blank in ("", None, "  ", "n/a", "1.5", "-3"):
+                    self.assertEqual(parse_count(blank), 0)
+
+    def test_percentiles_top_plants_and_coverage(self):
+        response = self.client.get("/api/stats/")
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        nucleotide = next(row for row in payload["metrics"] if row["metric"] == "Nucleotide")
+        # Nearest rank over 0, 1, ..., 10.
+        keys = ("total", "plants_reported", "p50", "p90", "p99", "max")
+        self.assertEqual(
+            {key: nucleotide[key] for key in keys},
+            {"total": 55, "plants_reported": 10, "p50": 5, "p90": 9, "p99": 10, "max": 10},
+        )
+        self.assertEqual(nucleotide["mean"], 5.0)
+        self.assertEqual(
+            [plant["plant_name"] for plant in nucleotide["top_plants"][:3]],
+            ["Testplant 10", "Testplant 9", "Testplant 8"],
+        )
+        self.assertEqual(len(nucleotide["top_plants"]), 10)
+
+        coverage = {
+            (row["genome"], row["proteome"], row["transcript"]): row["plants"]
+            for row in payload["coverage"]
+        }
+        self.assertEqual(len(coverage), 8)
+        self.assertEqual(coverage[(True, True, True)], 10)
+        self.assertEqual(coverage[(True, False, False)], 1)
+        self.assertEqual(sum(coverage.values()), 11)
+
+    def test_stats_api_reads_only_the_summary_tables(self):
+        # The first request reads the dataset version; later ones reuse it.
+        self.client.get("/api/stats/")
+        with CaptureQueriesContext(connection) as queries, self.assertNumQueries(2):
+            self.assertEqual(self.client.get("/api/stats/").status_code, 200)
+        self.assertIn("pages_omicsmetricsummary", queries[0]["sql"])
+        self.assertIn("pages_omicscoverage", queries[1]["sql"])
+
+
+class BenchmarkBaselineTests(TestCase):
+    def setUp(self):
+        self.baseline = json.loads((settings.BASE_DIR / "benchmarks" / "baseline.json").read_text())
+        self.case = "view.basic.exact"
+        self.base = self.baseline[self.case]
+
+    def _run(self, results, **options):
+        stdout = io.StringIO()
+        with mock.patch.multiple(
+            "pages.management.commands.benchmark",
+            run_suite=mock.Mock(return_value=results),
+            setup_test_environment=mock.DEFAULT,
+            teardown_test_environment=mock.DEFAULT,
+        ), mock.patch.object(connection.creation, "create_test_db"), mock.patch.object(
+            connection.creation, "destroy_test_db"
+        ):
+            call_command("benchmark", stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def _result(self, time_ms, queries=None, name=None):
+        return Measurement(
+            name or self.case,
+            time_ms,
+            self.base["queries"] if queries is None else queries,
+            self.base["size"],
+        )
+
+    def test_result_past_the_threshold_fails(self):
+        slow = self._result(self.base["time_ms"] * 1.5 + 10)
+        self.assertEqual(len(compare([slow], self.baseline, 0.25)), 1)
+        with self.assertRaisesMessage(CommandError, f"{self.case}: time"):
+            self._run([slow], threshold=0.25)
+        with self.assertRaisesMessage(CommandError, f"{self.case}: queries"):
+            self._run([self._result(self.base["time_ms"], queries=self.base["queries"] + 1)])
+
+    def test_result_within_the_threshold_passes(self):
+        within = self._result(self.base["time_ms"] * 1.2)
+        self.assertEqual(compare([within], self.baseline, 0.25), [])
+        self.assertIn("No regressions beyond 25%", self._run([within], threshold=0.25))
+
+    def test_case_missing_from_the_baseline_is_reported(self):
+        results = [self._result(self.base["time_ms"]), self._result(5.0, name="view.new.exact")]
+        self.assertEqual(missing_from_baseline(results, self.baseline), ["view.new.exact"])
+        self.assertEqual(compare(results, self.baseline, 0.25), [])
+        output = self._run(results)
+        self.assertIn("Not in the baseline, so not compared: view.new.exact", output)
+        self.assertIn("No regressions", output)
+
+
+class DossierRebuildTests(TestCase):
+    def test_authority_variants_fold_into_one_dossier(self):
+        _create_plant(1)
+        _create_plant(2)
+        med_proteom.objects.filter(Plant_Name="Testplant 1").update(
+            Scientific_Name="Plantago testensis1 L."
+        )
+        med_phytochem.objects.filter(Plant_Name="Testplant 1").update(
+            Scientific_Name="Plantago testensis1 Linn. var. minor"
+        )
+        rebuild_alias_table()
+
+        self.assertEqual(rebuild_plant_dossiers(), 2)
+        payload = PlantDossier.objects.get(scientific_key="plantago testensis1").payload
+        for dataset, _, _ in DOSSIER_DATASETS:
+            self.assertIsNotNone(payload[dataset], dataset)
+        self.assertEqual(len(payload["compounds"]), 2)
+        self.assertEqual(
+            payload["scientific_names"],
+            [
+                "Plantago testensis1",
+                "Plantago testensis1 L.",
+                "Plantago testensis1 Linn. var. minor",
+            ],
+        )
+        self.assertEqual(match_names(["Plantago testensis1 L."])[0][0], "plantago testensis1")
+
+
+class FacetedSearchTests(TestCase):
+    # More matching rows than SQLite accepts bound variables in one query.
+    ROWS = 33000
+
+    @classmethod
+    def setUpTestData(cls):
+        _create_plant(1)
+        _create_plant(2)
+        med_basic.objects.bulk_create(
+            med_basic(
+                Plant_Name="Testplant 1",
+                Scientific_Name="Plantago testensis1",
+                Parts_Used="Leaves",
+            )
+            for _ in range(cls.ROWS - 1)
+        )
+        med_basic.objects.filter(Plant_Name="Testplant 2").update(Parts_Used="Root")
+        rebuild_alias_table()
+        rebuild_plant_dossiers()
+        rebuild_facets()
+        _bump_dataset_version()
+
+    def test_narrows_large_results(self):
+        response = self.client.get("/basic.html", {"q": "testplant"})
+        self.assertEqual(response.context["result_count"], self.ROWS + 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/basic.html", {"q": "testplant", "part": "Leaf"})
+        self.assertEqual(response.status_code, 200)
+        # One query reads the results; narrowing adds none and binds no ids.
+        searches = [query for query in queries if 'FROM "basic_med_basic"' in query["sql"]]
+        self.assertEqual(len(searches), 1)
+        self.assertEqual(response.context["result_count"], self.ROWS)
+        self.assertEqual(len(response.context["object_list"]), self.ROWS)
+        parts = response.context["facets"][0]["values"]
+        parts = {value["value"]: value["count"] for value in parts}
+        self.assertEqual(parts, {"Leaf": self.ROWS})
+
+
+class SpellingSuggestionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _create_plant(1)
+        rebuild_alias_table()
+        _bump_dataset_version()
+
+    def _suggestions(self, path, query):
+        response = self.client.get(path, {"q": query})
+        self.assertEqual(response.context["result_count"], 0)
+        return [(item["label"], item["kind"]) for item in response.context["suggestions"]]
+
+    def test_empty_searches_suggest_corrections(self):
+        self.assertIn(("Testplant 1", "plant"), self._suggestions("/basic.html", "testplnt 1"))
+        self.assertIn(
+            ("Aucubin", "compound"), self._suggestions("/metabolites.html", "aucubn")
+        )
+        # Only the metabolite search suggests compounds.
+        self.assertEqual(self._suggestions("/basic.html", "aucubn"), [])
+        self.assertEqual(did_you_mean("zz"), [])
+
+    def test_index_rebuilt_per_dataset_version(self):
+        builder = mock.Mock(side_effect=lambda: object())
+        index = VersionedIndex(builder)
+        first = index.get()
+        self.assertIs(index.get(), first)
+        bump_dataset_version()
+        self.assertIsNot(index.get(), first)
+        self.assertEqual(builder.call_count, 2)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _create_plant(1)
+        _bump_dataset_version()
+
+    def test_unchanged_pages_answer_304(self):
+        response = self.client.get("/basic.html", {"q": "testplant", "part": "Leaf"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("public", response["Cache-Control"])
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        # The same query with parameters reordered and spaces collapsed.
+        response = self.client.get(
+            "/basic.html?part=Leaf&q=testplant%20%20", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(
+            self.client.get("/basic.html", HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304
+        )
+        self.assertEqual(
+            self.client.get("/basic.html", {"q": "other"}, HTTP_IF_NONE_MATCH=etag).status_code,
+            200,
+        )
+
+        _bump_dataset_version()
+        response = self.client.get(
+            "/basic.html", {"q": "testplant", "part": "Leaf"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ResponseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _create_plant(1)
+        rebuild_alias_table()
+        rebuild_plant_dossiers()
+        _bump_dataset_version()
+
+    def _search(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/metabolites.html", {"q": "testplant"})
+        self.assertEqual(response.status_code, 200)
+        reads = [query for query in queries if 'FROM "phytochem_med_phytochem"' in query["sql"]]
+        return response.content, len(reads)
+
+    def test_search_pages_cached_per_dataset_version(self):
+        content, reads = self._search()
+        self.assertGreater(reads, 0)
+        self.assertIn(b"Aucubin", content)
+        self.assertEqual(self._search(), (content, 0))
+
+        med_phytochem.objects.filter(Phytochemicals="Aucubin").update(Phytochemicals="Catalpol")
+        self.assertEqual(self._search(), (content, 0))
+        _bump_dataset_version()
+        content, reads = self._search()
+        self.assertGreater(reads, 0)
+        self.assertIn(b"Catalpol", content)
+
+        with mock.patch("pages.decorators.RESPONSE_CACHE_MAX_BYTES", 100):
+            _bump_dataset_version()
+            self._search()
+            self.assertGreater(self._search()[1], 0)
+
+    def test_plantbot_answers_cached_per_dataset_version(self):
+        with mock.patch(
+            "pages.services.plantbot._curated_answer", wraps=plantbot._curated_answer
+        ) as curated:
+            answer = generate_answer("Tell me about testplant 1")
+            self.assertEqual(generate_answer("tell me  about Testplant 1"), answer)
+            self.assertEqual(curated.call_count, 1)
+            # Another focus is another answer.
+            generate_answer("Tell me about testplant 1", focus="genome")
+            self.assertEqual(curated.call_count, 2)
+
+            med_phytochem.objects.filter(Phytochemicals="Aucubin").update(Phytochemicals="Catalpol")
+            rebuild_plant_dossiers()
+            _bump_dataset_version()
+            self.assertIn("Catalpol", generate_answer("Tell me about testplant 1")[0])
+            self.assertEqual(curated.call_count, 3)
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    REQUEST_TIMING=True,
+    TEMPLATES=[{**settings.TEMPLATES[0], "BACKEND": "pages.templating.TimedDjangoTemplates"}],
+)
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _create_plant(1)
+        _bump_dataset_version()
+
+    def setUp(self):
+        caches["responses"].clear()
+
+    def _timing(self):
+        with self.assertLogs("pages.timing", "INFO") as logs:
+            response = self.client.get("/metabolites.html", {"q": "testplant"})
+        self.assertEqual(response.status_code, 200)
+        metrics = {
+            metric.split(";")[0]: metric for metric in response["Server-Timing"].split(", ")
+        }
+        return metrics, json.loads(logs.records[-1].getMessage())
+
+    def test_phases_reported(self):
+        metrics, record = self._timing()
+        self.assertEqual(set(metrics), {"catalogue", "db", "template", "cache", "total"})
+        self.assertIn(f'desc="queries={record["queries"]}"', metrics["db"])
+        self.assertIn('desc="metabolites-misses=1"', metrics["cache"])
+        self.assertEqual(
+            (record["path"], record["status"], record["counters"]),
+            ("/metabolites.html", 200, {"metabolites-misses": 1}),
+        )
+        self.assertGreater(record["queries"], 0)
+        self.assertGreaterEqual(record["total_ms"], record["db_ms"])
+
+        # A cached page skips the view: no template, no catalogue.
+        metrics, record = self._timing()
+        self.assertNotIn("template", metrics)
+        self.assertIn('desc="metabolites-hits=1"', metrics["cache"])
+
+    @override_settings(REQUEST_TIMING=False)
+    def test_disabled(self):
+        response = self.client.get("/metabolites.html", {"q": "testplant"})
+        self.assertFalse(response.has_header("Server-Timing"))
+        self.assertIs(phase("template"), phase("db"))
+
+
+class CompactIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _create_plant(1)
+        _create_plant(2)
+        rebuild_alias_table()
+        rebuild_plant_dossiers()
+        rebuild_facets()
+        _bump_dataset_version()
+
+    def test_indexes_are_compact(self):
+        aliases = plantbot.KNOWLEDGE_BASE.alias_index
+        by_key = defaultdict(set)
+        for alias, scientific_key in aliases.items():
+            by_key[scientific_key].add(id(scientific_key))
+        self.assertEqual(len(aliases), len(aliases.aliases))
+        # Every alias of a plant shares one interned key string.
+        self.assertEqual({len(ids) for ids in by_key.values()}, {1})
+        self.assertIn("plantago testensis1", by_key)
+
+        trigrams = TRIGRAM_INDEX.get()
+        self.assertTrue(all(isinstance(ids, array) for ids in trigrams.postings.values()))
+        self.assertEqual(trigrams.suggest("testplnt 2", kinds=(PLANT,))[0]["label"], "Testplant 2")
+
+        prefixes = PREFIX_INDEX.get()
+        self.assertTrue(all(isinstance(ids, array) for ids in prefixes.top.values()))
+        self.assertEqual(
+            prefixes.complete("te", kind=PLANT), prefixes.complete("tes", kind=PLANT)
+        )
+
+    def test_warm_indexes_builds_everything(self):
+        _bump_dataset_version()
+        warm_indexes()
+        with self.assertNumQueries(0), mock.patch(
+            "pages.services.versioning.dataset_version", return_value=dataset_version()
+        ):
+            for index in indexes().values():
+                index.get()
+
+    def test_deep_size_counts_shared_objects_once(self):
+        label = "Plantago testensis1" * 10
+        self.assertEqual(
+            deep_size([label, label]), sys.getsizeof([label, label]) + sys.getsizeof(label)
+        )
+
+
+class ReadinessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _create_plant(1)
+        rebuild_alias_table()
+        rebuild_plant_dossiers()
+        _bump_dataset_version()
+
+    def setUp(self):
+        self.addCleanup(self._reset)
+        self._reset()
+
+    @staticmethod
+    def _reset():
+        warmup._ready.clear()
+        warmup._state.update(thread=None, stages={})
+
+    def _probe(self):
+        response = self.client.get("/ready")
+        self.assertEqual(response["Cache-Control"], "no-store")
+        return response.status_code, response.json()
+
+    def test_ready_after_warm_up(self):
+        release = threading.Event()
+        stages = [
+            ("slow", lambda: release.wait(5)),
+            ("failing", mock.Mock(side_effect=[OSError, None])),
+        ]
+        with mock.patch.object(warmup, "STAGES", stages), mock.patch.object(
+            warmup.logger, "info"
+        ) as info:
+            self.assertEqual(self._probe(), (503, {"ready": False, "stages_ms": {}}))
+            first = warmup._state["thread"]
+            self.assertEqual(self._probe()[0], 503)
+            self.assertIs(warmup._state["thread"], first)
+
+            # A failed warm-up is retried by the next probe.
+            with self.assertLogs("pages.warmup", "ERROR"):
+                release.set()
+                first.join(5)
+            self.assertEqual(self._probe()[0], 503)
+            warmup._state["thread"].join(5)
+
+            status, body = self._probe()
+        self.assertEqual(status, 200)
+        self.assertTrue(body["ready"])
+        self.assertEqual(set(body["stages_ms"]), {"slow", "failing"})
+        self.assertEqual(
+            [call.args[1] for call in info.call_args_list], ["slow", "slow", "failing"]
+        )
+
+    def test_warm_up_runs_every_stage(self):
+        with mock.patch.object(warmup.logger, "info"):
+            warmup.warm_up()
+        self.assertTrue(warmup.is_ready())
+        self.assertEqual(set(warmup.warm_up_stages()), {"indexes", "database", "pages"})
+
+
+class SuggestApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(1, 4):
+            _create_plant(index)
+        # Plant 2 has the most curated rows, so it ranks first.
+        med_phytochem.objects.create(
+            Plant_Name="Testplant 2",
+            Scientific_Name="Plantago testensis2",
+            Phytochemicals="Apigenin",
+            Activity_Count=1,
+        )
+        _bump_dataset_version()
+
+    def _suggest(self, **params):
+        response = self.client.get("/api/suggest/", params)
+        self.assertEqual(response.status_code, 200)
+        suggestions = response.json()["suggestions"]
+        return [(item["label"], item["kind"], item["detail"]) for item in suggestions]
+
+    def test_completions_ranked_by_records(self):
+        # Two-letter prefixes are served from the precomputed rankings.
+        for query in ("te", "testp"):
+            with self.subTest(query=query):
+                self.assertEqual(
+                    self._suggest(q=query)[:3],
+                    [
+                        ("Testplant 2", "plant", "Plantago testensis2"),
+                        ("Testplant 1", "plant", "Plantago testensis1"),
+                        ("Testplant 3", "plant", "Plantago testensis3"),
+                    ],
+                )
+        self.assertEqual(
+            self._suggest(q="Plantago testensis3"), [("Plantago testensis3", "plant", "")]
+        )
+
+    def test_kinds(self):
+        self.assertEqual(
+            self._suggest(q="a", kind="compound"),
+            [("Aucubin", "compound", ""), ("Apigenin", "compound", "")],
+        )
+        self.assertEqual(self._suggest(q="a", kind="plant"), [])
+        self.assertEqual(self._suggest(q=" "), [])
+        response = self.client.get("/api/suggest/", {"q": "a", "kind": "gene"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TaxonomyBrowserTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _create_plant(1)
+        _create_plant(2)
+        # Both plants lack a family, under different orders.
+        med_class.objects.filter(Plant_Name="Testplant 1").update(Family="")
+        med_class.objects.filter(Plant_Name="Testplant 2").update(Order="Asterales", Family="")
+        rebuild_taxonomy_tree()
+        _bump_dataset_version()
+
+    def _plants(self, params):
+        response = self.client.get("/api/taxonomy/", params)
+        self.assertEqual(response.status_code, 200)
+        return [plant["scientific_name"] for plant in response.json()["plants"]]
+
+    def test_repeated_names(self):
+        for node in TaxonNode.objects.filter(rank="Family", name="Unclassified"):
+            order = node.parent.name
+            expected = "Plantago testensis1" if order == "Lamiales" else "Plantago testensis2"
+            self.assertEqual(self._plants({"node": node.lft}), [expected])
+            self.assertEqual(self._plants({"order": order, "family": ""}), [expected])
+
+    def test_unknown_node(self):
+        for params in ({"node": "x"}, {"node": 999}, {"order": "Lamiales", "family": "Rosaceae"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get("/api/taxonomy/", params).status_code, 404)
+
+
+class LegacyPageTests(TransactionTestCase):
+    """
+    The old hand-written pages against the shipped datasets. pandas commits
+    its own transaction, so the CSVs are loaded outside TestCase's.
+    """
+
+    def setUp(self):
+        for spec in LOADERS:
+            load_csv(settings.BASE_DIR, *spec)
+        call_command("refresh_derived", stdout=io.StringIO())
+
+    def test_legacy_pages(self):
+        for legacy in LEGACY_DOSSIERS:
+            with self.subTest(legacy=legacy):
+                response = self.client.get(f"/{legacy}.html")
+                self.assertEqual(response.status_code, 301)
+                self.assertEqual(self.client.get(response["Location"]).status_code, 200)
+        for legacy in LEGACY_PAGES:
+            with self.subTest(legacy=legacy):
+                self.assertEqual(self.client.get(f"/{legacy}.html").status_code, 200)
+
+
+class SyntheticDatasetTests(TransactionTestCase):
+    """
+    ``generate`` output loaded through the loaders; pandas commits its own
+    transaction, as in ``LegacyPageTests``.
+    """
+
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.workdir = Path(workdir.name)
+
+    def test_same_seed_writes_identical_files(self):
+        first = generate(self.workdir / "first", 1.5, seed=7)
+        second = generate(self.workdir / "second", 1.5, seed=7)
+        other = generate(self.workdir / "other", 1.5, seed=8)
+        self.assertEqual(first, second)
+        self.assertEqual(sorted(first), sorted(DATASET_FILES.values()))
+        for filename in DATASET_FILES.values():
+            with self.subTest(filename=filename):
+                self.assertEqual(
+                    (self.workdir / "first" / filename).read_bytes(),
+                    (self.workdir / "second" / filename).read_bytes(),
+                )
+        self.assertNotEqual(
+            (self.workdir / "first" / "class.csv").read_bytes(),
+            (self.workdir / "other" / "class.csv").read_bytes(),
+        )
+
+    def test_output_loads_through_the_loaders(self):
+        written = generate(self.workdir, 1.5, seed=7)
+        for spec in LOADERS:
+            with self.subTest(filename=spec[1]):
+                self.assertEqual(load_csv(self.workdir, *spec), written[spec[1]])
+        self.assertEqual(med_class.objects.count(), written["class.csv"])
+        self.assertEqual(med_phytochem.objects.count(), written["phyto.csv"])
+        self.assertGreater(med_geno.objects.filter(Nucleotide__gt=0).count(), 0)
+
+
+class LoadTestReportTests(TestCase):
+    # 100 search requests at 1..100 ms, five of them failed, and two Plant
+    # Bot requests, one failed, over ten seconds.
+    SAMPLES = [Sample("search", float(ms), ms % 20 != 0) for ms in range(1, 101)] + [
+        Sample("plantbot", 400.0, True),
+        Sample("plantbot", 200.0, False),
+    ]
+
+    def test_nearest_rank_percentiles(self):
+        values = list(range(1, 11))
+        self.assertEqual(
+            [percentile(values, pct) for pct in (1, 50, 90, 91, 100)], [1, 5, 9, 10, 10]
+        )
+        self.assertEqual(percentile([], 50), 0)
+
+    def test_summary_overall_and_per_endpoint(self):
+        summary = summarize(self.SAMPLES, 10.0)
+        overall = {key: value for key, value in summary.items() if key != "endpoints"}
+        self.assertEqual(
+            overall,
+            {
+                "requests": 102,
+                "throughput_rps": 10.2,
+                "errors": 6,
+                "error_rate": 0.0588,
+                "p50_ms": 51.0,
+                "p95_ms": 97.0,
+                "p99_ms": 200.0,
+            },
+        )
+        self.assertEqual(sorted(summary["endpoints"]), ["plantbot", "search"])
+        search = summary["endpoints"]["search"]
+        self.assertEqual(
+            (search["requests"], search["errors"], search["p50_ms"], search["p95_ms"]),
+            (100, 5, 50.0, 95.0),
+        )
+        self.assertEqual(summary["endpoints"]["plantbot"]["p50_ms"], 200.0)
+
+    def test_command_writes_the_json_report(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        output, previous = Path(workdir.name, "run.json"), Path(workdir.name, "before.json")
+        level = {"concurrency": 4, "throughput_rps": 8.0, "p95_ms": 120.0, "error_rate": 0.1}
+        previous.write_text(json.dumps({"levels": [level]}))
+
+        def run_level(url, mix, concurrency, duration, seed=0):
+            summary = summarize(self.SAMPLES, 10.0)
+            return {"concurrency": concurrency, "duration_s": 10.0, **summary}
+
+        stdout = io.StringIO()
+        with mock.patch.multiple(
+            "pages.management.commands.loadtest", run_level=run_level, RequestMix=mock.DEFAULT
+        ):
+            call_command(
+                "loadtest",
+                concurrency="1,4",
+                stub_port=0,
+                label="gunicorn -w 2",
+                output=output,
+                compare=previous,
+                stdout=stdout,
+            )
+        report = json.loads(output.read_text())
+        self.assertEqual(
+            sorted(report),
+            ["label", "levels", "mix", "seed", "started_at", "stub_latency_ms", "target"],
+        )
+        self.assertEqual((report["label"], report["stub_latency_ms"]), ("gunicorn -w 2", None))
+        self.assertEqual([level["concurrency"] for level in report["levels"]], [1, 4])
+        self.assertEqual(report["levels"][1]["p95_ms"], 97.0)
+        self.assertEqual(
+            set(report["levels"][0]),
+            {"concurrency", "duration_s", "endpoints", "requests", "throughput_rps"}
+            | {"errors", "error_rate", "p50_ms", "p95_ms", "p99_ms"},
+        )
+        self.assertIn(
+            "c=4: 8.0 -> 10.2 req/s, p95 120.0 -> 97.0 ms, errors 10.0% -> 5.9%", stdout.getvalue()
+        )
+
+
+class QueryPlanTests(TestCase):
+    """
+    ``EXPLAIN QUERY PLAN`` for the SQL behind every search page and API,
+    compared with the golden files in ``pages/query_plans``. Set
+    ``MPMDB_UPDATE_QUERY_PLANS=1`` to rewrite them after an intended change.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(1, 9):
+            _create_plant(index)
+        rebuild_taxonomy_tree()
+        rebuild_omics_summary()
+        rebuild_alias_table()
+        rebuild_plant_dossiers()
+        rebuild_facets()
+        _bump_dataset_version()
+
+    def test_plans_match_golden_files(self):
+        update = os.environ.get("MPMDB_UPDATE_QUERY_PLANS") == "1"
+        for case in CASES:
+            with self.subTest(case=case.name):
+                plan = render(capture(self.client, case))
+                self.assertEqual(problems(case, plan), [], plan)
+                golden = PLAN_DIR / f"{case.name}.txt"
+                if update:
+                    PLAN_DIR.mkdir(exist_ok=True)
+                    golden.write_text(plan)
+                    continue
+                self.assertTrue(golden.exists(), f"No golden plan for {case.name}")
+                self.assertEqual(plan, golden.read_text())
+
+
+class ReleaseTests(TestCase):
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.dir = Path(workdir.name)
+        self.source = self.dir / "ingest.sqlite3"
+        releases = self.dir / "releases"
+        settings_patch = override_settings(
+            SQLITE_RELEASES_DIR=releases, SQLITE_PUBLISHED_DB=releases / "current.sqlite3"
+        )
+        settings_patch.enable()
+        self.addCleanup(settings_patch.disable)
+
+    def _publish(self, value, keep=2):
+        with sqlite3.connect(self.source) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS t (value TEXT)")
+            conn.execute("DELETE FROM t")
+            conn.execute("INSERT INTO t VALUES (?)", (value,))
+        conn.close()
+        return publish_release(self.source, keep=keep)
+
+    def _published_value(self):
+        with sqlite3.connect(settings.SQLITE_PUBLISHED_DB) as conn:
+            (value,) = conn.execute("SELECT value FROM t").fetchone()
+        conn.close()
+        return value
+
+    def test_publish_swaps_symlink_and_prunes(self):
+        link = Path(settings.SQLITE_PUBLISHED_DB)
+        releases = [self._publish(value) for value in ("one", "two", "three")]
+        self.assertTrue(link.is_symlink())
+        self.assertEqual(Path(os.path.realpath(link)), releases[-1])
+        self.assertEqual(self._published_value(), "three")
+        self.assertEqual(sorted(link.parent.glob("db-*.sqlite3")), releases[1:])
+        self.assertEqual(list(link.parent.glob(".*")) + list(link.parent.glob("*.partial")), [])
+
+    def test_reopen_if_republished(self):
+        connection = connections["default"]
+        self.addCleanup(vars(connection).pop, "published_release", None)
+        self._publish("one")
+        with mock.patch.object(connection, "close") as close, mock.patch(
+            "pages.services.releases.expire_dataset_version"
+        ) as expire:
+            # The first request only records the release it opened.
+            reopen_if_republished(None)
+            reopen_if_republished(None)
+            close.assert_not_called()
+
+            release = self._publish("two")
+            reopen_if_republished(None)
+            close.assert_called_once()
+            expire.assert_called_once()
+            self.assertEqual(connection.published_release, str(release))
+
+
+class MetricsTests(TestCase):
+    # Above the largest pid_max, so never a live process.
+    EXITED_PID = 4194305
+
+    def test_exposition_sums_worker_files(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        labels = ("metrics-test", "GET", "2xx")
+        workers = ((os.getpid(), 2, 1, 3), (self.EXITED_PID, 3, 4, 50))
+        for pid, requests, in_progress, queries in workers:
+            values = MmapValues(Path(workdir.name) / f"metrics-{pid}.db")
+            values.inc(REQUESTS._key("_total", labels), requests)
+            values.set(REQUESTS_IN_PROGRESS._key("", ()), in_progress)
+            values.inc(REQUEST_QUERIES._key("_bucket", ("metrics-test",), (("le", queries),)), 1)
+            values.inc(REQUEST_QUERIES._key("_count", ("metrics-test",)), 1)
+
+        with mock.patch("pages.services.metrics.METRICS_DIR", workdir.name):
+            lines = exposition().splitlines()
+        self.assertIn('mpmdb_requests_total{view="metrics-test",method="GET",status="2xx"} 5', lines)
+        # The gauge of the exited worker is dropped.
+        self.assertIn("mpmdb_requests_in_progress 1", lines)
+        self.assertIn('mpmdb_request_queries_bucket{view="metrics-test",le="3.0"} 1', lines)
+        self.assertIn('mpmdb_request_queries_bucket{view="metrics-test",le="50.0"} 2', lines)
+        self.assertIn('mpmdb_request_queries_count{view="metrics-test"} 2', lines)
+
+    def test_endpoint_is_restricted(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+        with self.settings(METRICS_ALLOWED_IPS=["10.0.0.1"]):
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+        with self.settings(METRICS_ENABLED=False):
+            self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        caches["plantbot"].clear()
+
+    def test_token_bucket_refills(self):
+        def take(bucket="test"):
+            return take_token("plantbot", bucket, capacity=2, refill_per_second=1)
+
+        with mock.patch("pages.services.throttling.time.time", return_value=1000.0) as now:
+            self.assertEqual([take(), take(), take()], [True, True, False])
+            now.return_value = 1001.5
+            self.assertEqual([take(), take()], [True, False])
+            self.assertTrue(take("other"))
+
+    def test_single_flight_coalesces_calls(self):
+        flight = SingleFlight(
+            "plantbot", "test", result_timeout=60, empty_timeout=60, wait_timeout=5
+        )
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "summary"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("fern", fetch)))
+            for _ in range(4)
+        ]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(results, ["summary"] * 4)
+        self.assertEqual(len(calls), 1)
+        # Later calls, empty results included, are answered from the cache.
+        self.assertEqual(flight.do("fern", fetch), "summary")
+        self.assertIsNone(flight.do("moss", lambda: calls.append(1)))
+        self.assertIsNone(flight.do("moss", lambda: calls.append(1)))
+        self.assertEqual(len(calls), 2)
+
+    def test_throttled_call_is_not_cached(self):
+        flight = SingleFlight(
+            "plantbot", "test", result_timeout=60, empty_timeout=60, wait_timeout=5
+        )
+
+        def throttled():
+            raise Throttled()
+
+        self.assertIsNone(flight.do("fern", throttled))
+        self.assertEqual(flight.do("fern", lambda: "summary"), "summary")
+
+    @mock.patch("pages.services.plantbot.record_miss")
+    @mock.patch("pages.services.plantbot.CLIENT_BURST", 1)
+    def test_throttled_client_still_gets_cached_summaries(self, _record_miss):
+        summary = ("Fern is a plant.", "https://example.org/wiki/Fern")
+        with mock.patch("pages.services.plantbot._wiki_summary", return_value=summary) as fetch:
+            self.assertEqual(plantbot._fallback_summary("fern", "10.0.0.9"), summary)
+            # The one token is spent; cached summaries need none.
+            self.assertEqual(plantbot._fallback_summary("fern", "10.0.0.9"), summary)
+            self.assertEqual(plantbot._fallback_summary("Fern", "10.0.0.9"), summary)
+            self.assertIsNone(plantbot._fallback_summary("moss", "10.0.0.9"))
+            self.assertEqual(plantbot._fallback_summary("moss", "10.0.0.10"), summary)
+        self.assertEqual([call.args[0] for call in fetch.call_args_list], ["fern", "moss"])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PlantBotApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _create_plant(1)
+        rebuild_alias_table()
+        rebuild_plant_dossiers()
+        _bump_dataset_version()
+
+    def _stream(self, question):
+        response = self.client.post(
+            "/api/plantbot/stream/",
+            json.dumps({"question": question}),
+            content_type="application/json",
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = b"".join(response.streaming_content).decode("utf-8")
+        comment, *blocks = body.strip().split("\n\n")
+        self.assertEqual(comment, ": plantbot")
+        events = []
+        for block in blocks:
+            event, data = block.split("\n")
+            events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+        return events
+
+    def test_stream_events(self):
+        events = self._stream("Testplant 1")
+        self.assertEqual({event for event, _ in events[:-1]}, {"section"})
+        self.assertEqual(
+            [payload["key"] for _, payload in events[:-1]],
+            # The basic section is empty for the test plant and not sent.
+            ["general", "classification", "genome", "proteome", "transcript", "phyto"],
+        )
+        self.assertEqual(events[-1][0], "done")
+
+        with mock.patch("pages.services.enrichment.MISS_LOG", None), mock.patch(
+            "pages.services.plantbot._wiki_summary", return_value=None
+        ):
+            events = self._stream("Unknownia")
+        self.assertEqual(
+            [event for event, _ in events], ["status", "section", "done"]
+        )
+        self.assertEqual(events[1][1], {"key": "none", "text": NO_MATCH_REPLY})
+        self.assertEqual(events[2][1], {"source": None})
+
+    def test_invalid_payloads(self):
+        for body in (
+            b"\xff\xfe",
+            b"{question",
+            b"[]",
+            b"42",
+            b'{"question": 42}',
+            b'{"question": ["Testplant 1"]}',
+            b'{"question": "  "}',
+            b"{}",
+        ):
+            for url in ("/api/plantbot/", "/api/plantbot/stream/"):
+                with self.subTest(url=url, body=body):
+                    response = self.client.post(url, body, content_type="application/json")
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn("error", response.json())
+        self.assertEqual(self.client.get("/api/plantbot/stream/").status_code, 405)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class EnrichmentTests(TestCase):
+    """
+    ``run_enrichment`` against the local Wikipedia stub, and the Plant Bot
+    fallback answering from what it stored.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(1, 3):
+            _create_plant(index)
+        rebuild_alias_table()
+        rebuild_plant_dossiers()
+        _bump_dataset_version()
+
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.miss_log = Path(workdir.name) / "misses.jsonl"
+        patcher = mock.patch("pages.services.enrichment.MISS_LOG", self.miss_log)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _enrich(self, stub, **options):
+        with mock.patch.multiple(
+            "pages.services.plantbot",
+            WIKI_SEARCH_URL=f"{stub.url}/w/api.php",
+            WIKI_SUMMARY_URL=f"{stub.url}/api/rest_v1/page/summary/{{title}}",
+        ):
+            return run_enrichment(lookup_wiki_summary, workers=2, backoff=0, **options)
+
+    def test_aliases_and_frequent_misses_are_stored(self):
+        record_miss("mystery fern", "Mystery fern?")
+        record_miss("mystery fern", "mystery fern")
+        record_miss("unknownia", "Unknownia")
+
+        with WikipediaStub(latency=0, unknown=["unknownia"]) as stub:
+            outcomes = self._enrich(stub)
+            self.assertEqual(self._enrich(stub), {})
+
+        self.assertEqual(outcomes, {"found": 5, "missing": 1})
+        self.assertFalse(self.miss_log.exists())
+        fern = EncyclopediaSummary.objects.get(topic="mystery fern")
+        self.assertEqual(fern.query, "Mystery fern?")
+        self.assertIn("Mystery Fern", fern.summary)
+        # Aliases are looked up by scientific name.
+        self.assertEqual(
+            EncyclopediaSummary.objects.get(topic="testplant 1").query, "Plantago testensis1"
+        )
+        self.assertEqual(stored_summary("unknownia"), (False, "", None))
+
+    def test_failed_fetches_are_retried_then_rescheduled(self):
+        with WikipediaStub(latency=0, fail_first=2) as stub:
+            self.assertEqual(self._enrich(stub, retries=2), {"found": 4})
+
+        EncyclopediaSummary.objects.all().delete()
+        with WikipediaStub(latency=0, fail_first=100) as stub:
+            with self.assertLogs("pages.enrichment", "WARNING"):
+                self.assertEqual(self._enrich(stub, retries=1), {"failed": 4})
+        row = EncyclopediaSummary.objects.get(topic="testplant 1")
+        self.assertEqual((row.status, row.attempts), ("failed", 1))
+        self.assertGreater(row.refresh_after, timezone.now() + timedelta(minutes=10))
+        self.assertIsNone(stored_summary("testplant 1"))
+
+    def test_fallback_answers_from_stored_summaries(self):
+        now = timezone.now()
+        for topic, status, summary in (
+            ("mystery fern", "found", "The mystery fern is a fern."),
+            ("unknownia", "missing", ""),
+        ):
+            EncyclopediaSummary.objects.create(
+                topic=topic,
+                query=topic,
+                status=status,
+                summary=summary,
+                url="https://example.org/wiki/Mystery_fern" if summary else "",
+                fetched_at=now,
+                refresh_after=now + timedelta(days=1),
+            )
+
+        with mock.patch("pages.services.plantbot._wiki_summary") as live:
+            answer, source = generate_answer("Mystery fern?")
+            self.assertIn("The mystery fern is a fern.", answer)
+            self.assertEqual(source, "https://example.org/wiki/Mystery_fern")
+            self.assertEqual(generate_answer("Unknownia"), (NO_MATCH_REPLY, None))
+            live.assert_not_called()
+            self.assertFalse(self.miss_log.exists())
+
+            live.return_value = None
+            generate_answer("Another fern")
+            live.assert_called_once()
+        self.assertIn('"topic": "another fern"', self.miss_log.read_text())
+
+
+class SequenceStoreTests(TestCase):
+    """
+    The k-mer sequence store and its search API, on a store written to a
+    temporary directory.
+    """
+
+    PEPTIDE = "MKTAYIAKQRQISFVKSHFSRQ"
+
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(1, 4):
+            _create_plant(index)
+        rebuild_alias_table()
+        rebuild_plant_dossiers()
+        _bump_dataset_version()
+
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.store_dir = Path(workdir.name)
+        patcher = mock.patch("pages.services.sequences.SEQUENCE_STORE_DIR", self.store_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _record(self, index, accession, sequence):
+        return SequenceRecord(
+            accession,
+            f"protein {accession}",
+            f"plantago testensis{index}",
+            f"Testplant {index}",
+            sequence.encode("ascii"),
+        )
+
+    def _build(self):
+        return build_store(
+            "protein",
+            [
+                self._record(3, "P3", "GGGGWWWWPPPPHHHHCCCC"),
+                self._record(1, "P1a", "MSEEL" + self.PEPTIDE + "LLKAA"),
+                self._record(1, "P1b", "MKTAYIAK"),
+                # Two substitutions: most k-mers survive, the substring does not.
+                self._record(2, "P2", "AAAMKTAYIAKQRQLSFVKSHFDRQ"),
+            ],
+        )
+
+    def test_search_ranks_plants_by_shared_kmers(self):
+        _, count = self._build()
+        self.assertEqual(count, 4)
+
+        response = self.client.get("/api/sequences/search/", {"q": self.PEPTIDE.lower()})
+        self.assertEqual(response.status_code, 200)
+        hits = response.json()["hits"]
+        self.assertEqual([hit["scientific_key"] for hit in hits], ["plantago testensis1", "plantago testensis2"])
+        best, close = hits
+        self.assertEqual((best["score"], best["record"]["accession"]), (1.0, "P1a"))
+        self.assertTrue(best["record"]["exact"])
+        self.assertEqual(best["slug"], "testplant-1")
+        self.assertLess(close["score"], 1.0)
+        self.assertFalse(close["record"]["exact"])
+
+        strict = search_sequences("protein", self.PEPTIDE, min_score=0.9)
+        self.assertEqual(len(strict["hits"]), 1)
+
+    def test_rebuild_switches_the_open_store(self):
+        self._build()
+        self.assertEqual(len(search_sequences("protein", "GGGGWWWW")["hits"]), 1)
+        build_store("protein", [self._record(2, "Q2", "CCCCDDDDEEEE")])
+        self.assertEqual(search_sequences("protein", "GGGGWWWW")["hits"], [])
+        self._build()
+
+        self.assertEqual(search_sequences("protein", "GGGGWWWW")["records"], 4)
+        builds = sorted(path.name for path in self.store_dir.glob("build-protein-*"))
+        self.assertEqual(len(builds), 2)
+
+    def test_search_api_rejects_bad_queries(self):
+        self.assertEqual(self.client.get("/api/sequences/search/", {"q": self.PEPTIDE}).status_code, 404)
+        self._build()
+        for params in ({"q": "MKT"}, {"q": "MKT1AYIA"}, {"q": self.PEPTIDE, "kind": "rna"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get("/api/sequences/search/", params).status_code, 400)
+        fasta = ">sp|P1 test\nMKTAYIAK\nQRQISF"
+        response = self.client.get("/api/sequences/search/", {"q": fasta})
+        self.assertEqual(response.json()["query"], "MKTAYIAKQRQISF")
+
+    def _parse_fasta(self, path, _format):
+        # Enough of ``SeqIO.parse`` to run without Biopython installed.
+        for block in Path(path).read_text().split(">")[1:]:
+            header, *lines = block.splitlines()
+            yield mock.Mock(id=header.split()[0], description=header, seq="".join(lines))
+
+    def _write_fasta(self):
+        if SeqIO is None:
+            stub = mock.Mock(parse=self._parse_fasta)
+            for module in ("pages.services.sequences", "pages.management.commands.import_sequences"):
+                patcher = mock.patch(f"{module}.SeqIO", stub)
+                patcher.start()
+                self.addCleanup(patcher.stop)
+        fasta = self.store_dir / "proteins.fasta"
+        fasta.write_text(
+            ">XP_1.1 chalcone synthase [Plantago testensis1]\nMKTAYIAK\nQRQISF\n"
+            ">XP_2.1 chalcone synthase [Quercus robur]\nMKTAYIAK\n"
+        )
+        return fasta
+
+    def test_fasta_records_are_matched_to_curated_plants(self):
+        fasta = self._write_fasta()
+        matches = match_fasta_organisms([fasta])
+        self.assertEqual(set(matches), {"Plantago testensis1", "Quercus robur"})
+        self.assertIsNone(matches["Quercus robur"])
+        skipped = Counter()
+        records = read_fasta([fasta], matches, skipped)
+        self.assertEqual(
+            [(record.accession, record.scientific_key, record.sequence) for record in records],
+            [("XP_1.1", "plantago testensis1", b"MKTAYIAKQRQISF")],
+        )
+        self.assertEqual(skipped, {"Quercus robur": 1})
+
+        matches = match_fasta_organisms([fasta], plant="Testplant 2")
+        records = read_fasta([fasta], matches, Counter(), plant="Testplant 2")
+        self.assertEqual({record.scientific_key for record in records}, {"plantago testensis2"})
+
+    def test_import_streams_records_into_the_store(self):
+        fasta = self._write_fasta()
+        stdout = io.StringIO()
+        with mock.patch(
+            "pages.management.commands.import_sequences.build_store", wraps=build_store
+        ) as build:
+            call_command("import_sequences", str(fasta), stdout=stdout)
+        self.assertIsInstance(build.call_args.args[1], types.GeneratorType)
+        self.assertIn("1 records of 1 plants", stdout.getvalue())
+        self.assertIn("Skipped 1 records of uncurated plant Quercus robur", stdout.getvalue())
+        self.assertEqual(search_sequences("protein", "MKTAYIAKQRQISF")["records"], 1)
+
+        with self.assertRaises(CommandError):
+            call_command("import_sequences", str(fasta), plant="Quercus robur", stdout=io.StringIO())
+        self.assertEqual(search_sequences("protein", "MKTAYIAKQRQISF")["records"], 1)
+
+
+class AssetBuildTests(TestCase):
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.static_dir = Path(workdir.name)
+        (self.static_dir / "images").mkdir()
+        variant_dir = self.static_dir / "variants"
+        for module in ("pages.services.assets", "pages.management.commands.build_assets"):
+            patcher = mock.patch.multiple(
+                module, APP_STATIC_DIR=self.static_dir, IMAGE_DIR=self.static_dir / "images"
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.multiple(
+            "pages.services.assets",
+            VARIANT_DIR=variant_dir,
+            VARIANT_MANIFEST=variant_dir / "manifest.json",
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        assets._manifest_cache.clear()
+        self.addCleanup(assets._manifest_cache.clear)
+
+        picture = Image.new("RGB", (800, 400), "white")
+        draw = ImageDraw.Draw(picture)
+        draw.rectangle((0, 0, 399, 399), fill=(20, 120, 40))
+        draw.ellipse((500, 100, 700, 300), fill=(200, 30, 30))
+        picture.save(self.static_dir / "images/leaf.png")
+        (self.static_dir / "images/leaf2.png").write_bytes(
+            (self.static_dir / "images/leaf.png").read_bytes()
+        )
+        # The same picture in another format, and a larger file.
+        picture.save(self.static_dir / "images/leaf.jpg", quality=95)
+        Image.new("RGB", (200, 100), (0, 0, 255)).save(self.static_dir / "images/sky.png")
+
+    def test_variants_are_built_per_width_without_upscaling(self):
+        manifest = assets.build_variants(["images/leaf.png", "images/sky.png"])
+        formats = assets.variant_formats()
+        self.assertTrue(formats)
+        leaf, sky = manifest["images/leaf.png"], manifest["images/sky.png"]
+        self.assertEqual((leaf["source"], leaf["width"]), ("images/leaf.png", 800))
+        self.assertEqual(sorted(leaf["formats"]), sorted(formats))
+        self.assertEqual(sorted(leaf["formats"]["webp"], key=int), ["320", "640", "800"])
+        self.assertEqual(list(sky["formats"]["webp"]), ["200"])
+        with Image.open(self.static_dir / leaf["formats"]["webp"]["320"]) as variant:
+            self.assertEqual(variant.size, (320, 160))
+        self.assertEqual(json.loads(assets.VARIANT_MANIFEST.read_text()), manifest)
+
+    def test_duplicates_collapse_to_one_canonical_file(self):
+        groups = assets.duplicate_groups()
+        self.assertEqual(groups, [["images/leaf.jpg", "images/leaf.png", "images/leaf2.png"]])
+        canonical = assets.canonical_images(groups)
+        self.assertEqual(set(canonical.values()), {"images/leaf.png"})
+
+        manifest = assets.build_variants(["images/leaf2.png", "images/leaf.jpg"], canonical)
+        copy, jpeg = manifest["images/leaf2.png"], manifest["images/leaf.jpg"]
+        self.assertEqual((copy["source"], jpeg["source"]), ("images/leaf.png", "images/leaf.png"))
+        self.assertEqual(copy["formats"], jpeg["formats"])
+        self.assertEqual(len(list(assets.VARIANT_DIR.glob("*.webp"))), 3)
+
+    def test_build_ships_only_canonical_referenced_images(self):
+        referenced = ["images/leaf2.png", "images/leaf.jpg"]
+        stdout = io.StringIO()
+        with mock.patch(
+            "pages.management.commands.build_assets.referenced_images", return_value=referenced
+        ), mock.patch("pages.management.commands.build_assets.call_command") as collect:
+            call_command("build_assets", stdout=stdout)
+        ignored = collect.call_args.kwargs["ignore_patterns"]
+        self.assertEqual(
+            sorted(ignored), ["images/leaf.jpg", "images/leaf2.png", "images/sky.png"]
+        )
+        self.assertIn(
+            "Duplicate image images/leaf.jpg: served as images/leaf.png", stdout.getvalue()
+        )
+
+    def test_template_tags_resolve_to_the_canonical_image(self):
+        canonical = assets.canonical_images(assets.duplicate_groups())
+        assets.build_variants(["images/leaf.jpg"], canonical)
+        variants = assets.load_variant_manifest()["images/leaf.jpg"]["formats"]["webp"]
+
+        url = Template("{% load assets %}{% image_variant 'images/leaf.jpg' 700 %}")
+        self.assertEqual(url.render(Context()), f"{settings.STATIC_URL}{variants['640']}")
+        markup = Template(
+            "{% load assets %}"
+            "{% responsive_image 'images/leaf.jpg' alt='Leaf' sizes='50vw' class='hero' %}"
+        ).render(Context())
+        srcset = ", ".join(
+            f"{settings.STATIC_URL}{variants[width]} {width}w" for width in ("320", "640", "800")
+        )
+        self.assertIn(f'<source type="image/webp" srcset="{srcset}" sizes="50vw" />', markup)
+        self.assertIn(
+            f'<img src="{settings.STATIC_URL}images/leaf.png" alt="Leaf" loading="lazy"'
+            ' class="hero" />',
+            markup,
+        )
+
+        # Images outside the manifest fall back to their own file.
+        markup = Template("{% load assets %}{% responsive_image 'images/sky.png' %}")
+        self.assertEqual(
+            markup.render(Context()),
+            f'<picture><img src="{settings.STATIC_URL}images/sky.png" alt="" loading="lazy" />'
+            "</picture>",
+        )
+
+    def test_asset_storage_falls_back_without_a_manifest(self):
+        storage = AssetStorage(location=self.static_dir, base_url="/static/")
+        self.assertEqual(storage.url("css/site.css"), "/static/css/site.css")
+
+        (self.static_dir / "staticfiles.json").write_text(
+            json.dumps({"paths": {"css/site.css": "css/site.0123abcd.css"}, "version": "1.1"})
+        )
+        storage = AssetStorage(location=self.static_dir, base_url="/static/")
+        self.assertEqual(storage.url("css/site.css"), "/static/css/site.0123abcd.css")
@@ -1,11 +1,33 @@
 import json
-from django.http import JsonResponse
+from django.conf import settings
+from django.core.cache import caches
+from django.http import Http404, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 
-from django.shortcuts import render
-from django.views.decorators.csrf import ensure_csrf_cookie
-from django.views.decorators.http import require_POST
+from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_GET, require_POST
 
-from .services.plantbot import generate_answer
+from .decorators import dataset_conditional
+from .models import OmicsCoverage, OmicsMetricSummary, PlantDossier
+from .services.compare import MAX_COMPARE_PLANTS, compare_plants
+from .services.dossier import LEGACY_DOSSIERS, page_context, resolve_slug
+from .services.fuzzy import did_you_mean
+from .services.metrics import CACHE_REQUESTS, exposition
+from .services.plantbot import generate_answer, stream_answer
+from .services.resolve import MAX_RESOLVE_NAMES, resolve_names
+from .services.sequences import (
+    MAX_SEQUENCE_HITS,
+    MAX_SEQUENCE_QUERY,
+    SEQUENCE_KINDS,
+    search_sequences,
+)
+from .services.suggest import KINDS, MAX_SUGGESTIONS, suggest
+from .services.throttling import cache_key
+from .services.timing import count
+from .services.versioning import dataset_version
+from .services.warmup import is_ready, start_warm_up, warm_up_stages
 from django.http import HttpResponse
 from django.shortcuts import render
 
@@ -16,78 +38,325 @@ def home_view(request, *args, **kwargs):
 def intro_view(request, *args, **kwargs):
     return render (request, "intro.html", {})
 
-def aloevera_view(request, *args, **kwargs):
-    return render (request, "aloevera.html", {})
+def _dossier_cache():
+    return caches[getattr(settings, "DOSSIER_CACHE_ALIAS", "default")]
+
+
+def _dossier_or_redirect(slug, view_name):
+    """
+    ``(dossier, response)`` for a slug: the plant's dossier row, or a
+    permanent redirect for an alias slug, or ``(None, None)`` when unknown.
+    """
+    dossier = PlantDossier.objects.filter(slug=slug).first()
+    if dossier is not None:
+        return dossier, None
+    _, canonical = resolve_slug(slug)
+    if canonical is None or canonical == slug:
+        return None, None
+    return None, redirect(view_name, slug=canonical, permanent=True)
+
+
+@dataset_conditional
+def plant_view(request, slug, *args, **kwargs):
+    """
+    Dossier for any curated plant, rendered from its precomputed
+    ``PlantDossier`` row. The page is cached per dataset version, so a
+    re-ingest never serves stale dossiers.
+    """
+    key = cache_key("dossier", dataset_version().number, slug)
+    cache = _dossier_cache()
+    html = cache.get(key)
+    count("dossier-misses" if html is None else "dossier-hits")
+    CACHE_REQUESTS.inc("dossier", "miss" if html is None else "hit")
+    if html is not None:
+        return HttpResponse(html)
+
+    dossier, response = _dossier_or_redirect(slug, "plant")
+    if response is not None:
+        return response
+    if dossier is None:
+        context = {
+            "slug": slug,
+            "suggestions": did_you_mean(slug.replace("-", " ")),
+        }
+        return render(request, "plant.html", context, status=404)
+
+    html = render_to_string(
+        "plant.html", {"plant": page_context(dossier.payload)}, request=request
+    )
+    cache.set(key, html, getattr(settings, "DOSSIER_CACHE_SECONDS", 24 * 60 * 60))
+    return HttpResponse(html)
+
+
+@require_GET
+@dataset_conditional
+def plant_api(request, slug, *args, **kwargs):
+    """
+    JSON dossier for one plant: the same row the dossier page renders.
+    """
+    dossier, response = _dossier_or_redirect(slug, "plant_api")
+    if response is not None:
+        return response
+    if dossier is None:
+        return JsonResponse({"error": f"No curated plant matches {slug!r}."}, status=404)
+    return JsonResponse({"slug": dossier.slug, **dossier.payload})
+
+
+def legacy_dossier_view(request, legacy, *args, **kwargs):
+    # Redirect straight to the canonical slug, even if the plant's slug has
+    # changed since the mapping was written, so the cached 301 is never one
+    # hop of a chain.
+    slug = LEGACY_DOSSIERS[legacy]
+    _, canonical = resolve_slug(slug)
+    return redirect("plant", slug=canonical or slug, permanent=True)
 
-def amla_view(request, *args, **kwargs):
-    return render (request, "amla.html", {})
 
-def ashwagandha_view(request, *args, **kwargs):
-    return render (request, "ashwagandha.html", {})
+def legacy_page_view(request, legacy, *args, **kwargs):
+    return render(request, f"{legacy}.html", {})
 
-def babool_view(request, *args, **kwargs):
-    return render (request, "babool.html", {})
 
-def bhringraj_view(request, *args, **kwargs):
-    return render (request, "bhringraj.html", {})
+def _stats_payload():
+    """
+    Dashboard data, read only from the summary tables built at ingest.
+    """
+    metrics = [
+        {
+            "layer": summary.layer,
+            "metric": summary.metric,
+            "total": summary.total,
+            "plants_reported": summary.plants_reported,
+            "mean": round(summary.mean, 1),
+            "p50": summary.p50,
+            "p90": summary.p90,
+            "p99": summary.p99,
+            "max": summary.maximum,
+            "top_plants": summary.top_plants,
+        }
+        for summary in OmicsMetricSummary.objects.all()
+    ]
+    coverage = [
+        {
+            "genome": row.has_genome,
+            "proteome": row.has_proteome,
+            "transcript": row.has_transcript,
+            "plants": row.plant_count,
+        }
+        for row in OmicsCoverage.objects.all()
+    ]
+    return {"metrics": metrics, "coverage": coverage}
 
-def cinnamon_view(request, *args, **kwargs):
-    return render (request, "cinnamon.html", {})
 
-def clove_view(request, *args, **kwargs):
-    return render (request, "clove.html", {})
+@dataset_conditional
+def stats_view(request, *args, **kwargs):
+    return render(request, "stats.html", _stats_payload())
 
-def cumin_view(request, *args, **kwargs):
-    return render (request, "cumin.html", {})
 
-def curry_view(request, *args, **kwargs):
-    return render (request, "curry.html", {})
+@dataset_conditional
+def stats_api(request, *args, **kwargs):
+    return JsonResponse(_stats_payload())
 
-def eucalyptus_view(request, *args, **kwargs):
-    return render (request, "eucalyptus.html", {})
 
-def ginger_view(request, *args, **kwargs):
-    return render (request, "ginger.html", {})
+def _compare_identifiers(request):
+    raw = request.GET.get("plants", "")
+    identifiers = [item.strip() for item in raw.split(",") if item.strip()]
+    identifiers += [item.strip() for item in request.GET.getlist("plant") if item.strip()]
+    return identifiers
 
-def lavender_view(request, *args, **kwargs):
-    return render (request, "lavender.html", {})
 
-def mehndi_view(request, *args, **kwargs):
-    return render (request, "mehndi.html", {})
+@dataset_conditional
+def compare_view(request, *args, **kwargs):
+    identifiers = _compare_identifiers(request)
+    context = compare_plants(identifiers) if identifiers else {"plants": [], "matrix": []}
+    context["query"] = ", ".join(identifiers)
+    context["max_plants"] = MAX_COMPARE_PLANTS
+    return render(request, "compare.html", context)
 
-def neem_view(request, *args, **kwargs):
-    return render (request, "neem.html", {})
 
-def peppermint_view(request, *args, **kwargs):
-    return render (request, "peppermint.html", {})
+@dataset_conditional
+def compare_api(request, *args, **kwargs):
+    identifiers = _compare_identifiers(request)
+    if not identifiers:
+        return JsonResponse({"error": "Pass ?plants=name,name,..."}, status=400)
+    if len(identifiers) > MAX_COMPARE_PLANTS:
+        return JsonResponse(
+            {"error": f"Compare at most {MAX_COMPARE_PLANTS} plants at once."},
+            status=400,
+        )
+    return JsonResponse(compare_plants(identifiers))
 
-def tulsi_view(request, *args, **kwargs):
-    return render (request, "tulsi.html", {})
 
-def turmeric_view(request, *args, **kwargs):
-    return render (request, "turmeric.html", {})
+@csrf_exempt
+@require_POST
+def resolve_api(request, *args, **kwargs):
+    """
+    Bulk resolver for pipelines: POST {"names": [...]} with plant names or
+    NCBI taxonomy IDs, get one row per input with a match confidence.
+    """
+    try:
+        payload = json.loads(request.body.decode("utf-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({"error": "Invalid payload."}, status=400)
+
+    names = payload.get("names") if isinstance(payload, dict) else None
+    if not isinstance(names, list) or not names:
+        return JsonResponse({"error": "Please include a list of names."}, status=400)
+    if len(names) > MAX_RESOLVE_NAMES:
+        return JsonResponse(
+            {"error": f"Resolve at most {MAX_RESOLVE_NAMES} names per call."},
+            status=400,
+        )
+
+    results = resolve_names([str(name) for name in names])
+    return JsonResponse({"results": results})
+
+
+@require_GET
+@dataset_conditional
+def suggest_api(request, *args, **kwargs):
+    """
+    Search-box completions: GET ?q=prefix[&kind=plant|compound].
+    """
+    kind = request.GET.get("kind") or None
+    if kind not in KINDS:
+        return JsonResponse({"error": "kind must be plant or compound."}, status=400)
+    query = request.GET.get("q", "").strip()
+    response = JsonResponse(
+        {"query": query, "suggestions": suggest(query, kind=kind, limit=MAX_SUGGESTIONS)}
+    )
+    patch_cache_control(
+        response, public=True, max_age=getattr(settings, "SUGGEST_CACHE_SECONDS", 300)
+    )
+    return response
+
+
+@require_GET
+def sequence_search_api(request, *args, **kwargs):
+    """
+    Plants with a sequence resembling a peptide or nucleotide query:
+    GET ?q=SEQUENCE[&kind=protein|nucleotide][&limit=n]. A pasted FASTA
+    header line is ignored.
+    """
+    kind = request.GET.get("kind") or "protein"
+    if kind not in SEQUENCE_KINDS:
+        return JsonResponse({"error": "kind must be protein or nucleotide."}, status=400)
+    lines = request.GET.get("q", "").strip().splitlines()
+    if lines and lines[0].startswith(">"):
+        lines = lines[1:]
+    query = "".join("".join(lines).split()).upper()
+    k = SEQUENCE_KINDS[kind].k
+    valid = query.isascii() and query.isalpha()
+    if not valid or not k <= len(query) <= MAX_SEQUENCE_QUERY:
+        return JsonResponse(
+            {"error": f"Pass ?q= with {k} to {MAX_SEQUENCE_QUERY} residue letters."}, status=400
+        )
+    try:
+        limit = min(max(int(request.GET.get("limit", 10)), 1), MAX_SEQUENCE_HITS)
+    except ValueError:
+        limit = 10
+
+    result = search_sequences(kind, query, limit=limit)
+    if result is None:
+        return JsonResponse({"error": f"No {kind} sequences have been imported."}, status=404)
+    return JsonResponse({"query": query, **result})
 
 
 @ensure_csrf_cookie
 def plantbot_view(request, *args, **kwargs):
     return render(request, "plantbot.html", {})
 
-@require_POST
-def plantbot_api(request, *args, **kwargs):
+def _parse_plantbot_payload(request):
+    """
+    Return ``(question, focus, error_response)`` for a Plant Bot POST body.
+    """
     try:
         payload = json.loads(request.body.decode("utf-8"))
-    except json.JSONDecodeError:
-        return JsonResponse({"error": "Invalid payload."}, status=400)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None, None, JsonResponse({"error": "Invalid payload."}, status=400)
 
-    question = payload.get("question", "").strip()
+    question = payload.get("question") if isinstance(payload, dict) else None
+    question = question.strip() if isinstance(question, str) else ""
     if not question:
-        return JsonResponse({"error": "Please include a question."}, status=400)
+        return None, None, JsonResponse(
+            {"error": "Please include a question."}, status=400
+        )
 
     focus = payload.get("focus")
     if isinstance(focus, str):
         focus = focus.strip().lower() or None
     else:
         focus = None
+    return question, focus, None
+
+
+def _client_ip(request):
+    if getattr(settings, "PLANTBOT_TRUST_X_FORWARDED_FOR", False):
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
 
-    answer, source = generate_answer(question, focus=focus)
+
+@require_POST
+def plantbot_api(request, *args, **kwargs):
+    question, focus, error = _parse_plantbot_payload(request)
+    if error:
+        return error
+
+    answer, source = generate_answer(
+        question, focus=focus, client_id=_client_ip(request)
+    )
     return JsonResponse({"answer": answer, "source": source})
+
+
+def _sse_events(events):
+    # An initial comment flushes the headers before any lookup work starts.
+    yield ": plantbot\n\n"
+    for event, payload in events:
+        yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@require_POST
+def plantbot_stream_api(request, *args, **kwargs):
+    question, focus, error = _parse_plantbot_payload(request)
+    if error:
+        return error
+
+    response = StreamingHttpResponse(
+        _sse_events(
+            stream_answer(question, focus=focus, client_id=_client_ip(request))
+        ),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@require_GET
+def metrics_view(request, *args, **kwargs):
+    """
+    Prometheus text exposition of the app metrics, summed across the
+    workers sharing ``METRICS_DIR``. Only ``METRICS_ALLOWED_IPS`` may read
+    it, and it is gone when ``METRICS_ENABLED`` is off.
+    """
+    if not getattr(settings, "METRICS_ENABLED", True):
+        raise Http404("Metrics are disabled.")
+    allowed = {address.strip() for address in getattr(settings, "METRICS_ALLOWED_IPS", ())}
+    if _client_ip(request) not in allowed:
+        return HttpResponseForbidden("Metrics are not available to this client.")
+    return HttpResponse(exposition(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@require_GET
+def ready_view(request, *args, **kwargs):
+    """
+    Readiness probe for the load balancer: 503 until this worker has warmed
+    up. A probe reaching a cold worker starts its warm-up.
+    """
+    if is_ready():
+        response = JsonResponse({"ready": True, "stages_ms": warm_up_stages()})
+    else:
+        start_warm_up()
+        response = JsonResponse({"ready": False, "stages_ms": warm_up_stages()}, status=503)
+    patch_cache_control(response, no_store=True)
+    return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('phytochem', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='med_phytochem',
+            name='Scientific_Name',
+            field=models.TextField(db_index=True),
+        ),
+    ]
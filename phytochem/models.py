@@ -4,7 +4,7 @@ from django.db import connections
 # Create your models here.
 class med_phytochem(models.Model):
     Plant_Name = models.TextField()
-    Scientific_Name = models.TextField()
+    Scientific_Name = models.TextField(db_index=True)
     Phytochemicals = models.TextField()
     Activity_Count = models.IntegerField()
     Formula = models.TextField()
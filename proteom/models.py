@@ -4,10 +4,10 @@ from django.db import connections
 # Create your models here.
 class med_proteom(models.Model):
     Plant_Name = models.TextField()
-    Scientific_Name = models.TextField(default="")
-    Protein_Seq = models.TextField(default="")
-    Identical_Protein_Groups = models.TextField()
-    Protein = models.TextField()
+    Scientific_Name = models.TextField(default="", db_index=True)
+    Protein_Seq = models.IntegerField(default=0, db_index=True)
+    Identical_Protein_Groups = models.IntegerField(default=0, db_index=True)
+    Protein = models.IntegerField(default=0, db_index=True)
     NCBI_link = models.URLField()
 
 
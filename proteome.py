@@ -1,8 +1,11 @@
 import sqlite3
+
 import pandas as pd
 
-# Load the CSV data into a DataFrame
-df1 = pd.read_csv('proteome.csv')
+# Load the CSV data into a DataFrame; counts use digit grouping ("2,05,153")
+df1 = pd.read_csv('proteome.csv', thousands=',')
+count_columns = ['Protein_Seq', 'Identical_Protein_Groups', 'Protein']
+df1[count_columns] = df1[count_columns].fillna(0).astype(int)
 
 # Connect to the SQLite database
 conn = sqlite3.connect("db.sqlite3")
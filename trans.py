@@ -1,8 +1,11 @@
 import sqlite3
+
 import pandas as pd
 
-# Load the CSV data into a DataFrame
-df1 = pd.read_csv('trans.csv')
+# Load the CSV data into a DataFrame; counts use digit grouping ("1,02,463")
+df1 = pd.read_csv('trans.csv', thousands=',')
+count_columns = ['SRA', 'DNA', 'RNA', 'BioProject', 'BioSample']
+df1[count_columns] = df1[count_columns].fillna(0).astype(int)
 
 # Handle missing values in the 'NCBI_link' column
 df1['NCBI_link'] = df1['NCBI_link'].fillna('N/A')  # Replaces missing values with 'N/A'
@@ -0,0 +1,58 @@
+from django.db import migrations, models
+
+
+COUNT_FIELDS = ('SRA', 'DNA', 'RNA', 'BioProject', 'BioSample')
+
+
+def parse_count(value):
+    """
+    NCBI counts were loaded as text with Western or Indian digit grouping
+    ('74,640', '4,64,380'); anything unparseable becomes 0.
+    """
+    digits = str(value or '').replace(',', '').strip()
+    return int(digits) if digits.isdigit() else 0
+
+
+def counts_to_integers(apps, schema_editor):
+    model = apps.get_model('transcriptom', 'med_transcriptom')
+    rows = list(model.objects.all())
+    for row in rows:
+        for field in COUNT_FIELDS:
+            setattr(row, field, parse_count(getattr(row, field)))
+    model.objects.bulk_update(rows, COUNT_FIELDS, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcriptom', '0003_rename_bioproject_med_transcriptom_bioproject_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(counts_to_integers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='med_transcriptom',
+            name='SRA',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name='med_transcriptom',
+            name='DNA',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name='med_transcriptom',
+            name='RNA',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name='med_transcriptom',
+            name='BioProject',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name='med_transcriptom',
+            name='BioSample',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+    ]
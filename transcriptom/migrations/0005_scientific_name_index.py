@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transcriptom', '0004_integer_counts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='med_transcriptom',
+            name='Scientific_Name',
+            field=models.TextField(db_index=True, default=''),
+        ),
+    ]
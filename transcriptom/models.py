@@ -4,10 +4,10 @@ from django.db import connections
 # Create your models here.
 class med_transcriptom(models.Model):
     Plant_Name = models.TextField()
-    Scientific_Name = models.TextField(default="")
-    SRA = models.TextField()
-    DNA = models.TextField(default="")
-    RNA = models.TextField(default="")
-    BioProject = models.TextField()
-    BioSample = models.TextField()
+    Scientific_Name = models.TextField(default="", db_index=True)
+    SRA = models.IntegerField(default=0, db_index=True)
+    DNA = models.IntegerField(default=0, db_index=True)
+    RNA = models.IntegerField(default=0, db_index=True)
+    BioProject = models.IntegerField(default=0, db_index=True)
+    BioSample = models.IntegerField(default=0, db_index=True)
     NCBI_link = models.URLField()